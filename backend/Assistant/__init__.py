@@ -3,8 +3,13 @@
 from __future__ import annotations
 
 import logging
+from typing import AsyncIterator
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from database import get_database
+from sse import format_sse, sse_response
 
 from .chains import AssistantChains
 from .schemas import AssistantRequest, AssistantResponse, Message, VerseReference
@@ -37,7 +42,7 @@ def get_conversation_service() -> ConversationService:
     global _conversation_service
     if _conversation_service is None:
         try:
-            _conversation_service = ConversationService()
+            _conversation_service = ConversationService(get_database())
             logger.info("✅ ConversationService initialisé avec succès")
         except Exception as e:
             logger.error(f"❌ Erreur lors de l'initialisation de ConversationService: {e}")
@@ -45,6 +50,62 @@ def get_conversation_service() -> ConversationService:
     return _conversation_service
 
 
+# Réponse de fallback si Ollama n'est pas disponible
+FALLBACK_RESPONSE = (
+    "Je comprends votre préoccupation. 🙏 "
+    "Pourriez-vous vérifier que Ollama est démarré avec le modèle Mistral 7B ? "
+    "Je suis là pour vous accompagner spirituellement avec la Parole de Dieu."
+)
+
+
+async def _start_turn(request: AssistantRequest) -> tuple[str, list[dict]]:
+    """Récupère ou crée la conversation, enregistre le message utilisateur et retourne l'historique."""
+    conversation_service = get_conversation_service()
+
+    # Récupérer ou créer la conversation
+    conversation_id = await conversation_service.get_or_create_conversation(
+        request.user_id, request.conversation_id
+    )
+
+    # Ajouter le message utilisateur à l'historique
+    await conversation_service.add_message(
+        conversation_id, "user", request.message
+    )
+
+    # Récupérer l'historique pour le contexte
+    history = await conversation_service.get_conversation_history(conversation_id)
+    return conversation_id, history
+
+
+async def _finish_turn(
+    request: AssistantRequest, conversation_id: str, response_text: str
+) -> AssistantResponse:
+    """Extrait verset et mots-clés de la réponse, l'enregistre dans la conversation et construit la réponse."""
+    chains = get_chains()
+
+    # Extraire le verset de la réponse
+    verse = chains.extract_verse_from_response(response_text)
+
+    # Extraire les mots-clés
+    keywords = chains.extract_keywords(request.message)
+
+    # Ajouter la réponse de l'assistant à l'historique
+    verse_dict = None
+    if verse:
+        verse_dict = {"text": verse.text, "reference": verse.reference}
+
+    await get_conversation_service().add_message(
+        conversation_id, "assistant", response_text, verse_dict
+    )
+
+    return AssistantResponse(
+        response=response_text,
+        verse=verse,
+        conversation_id=conversation_id,
+        keywords=keywords,
+    )
+
+
 @router.post("/chat", response_model=AssistantResponse)
 async def chat(request: AssistantRequest) -> AssistantResponse:
     """
@@ -61,20 +122,7 @@ async def chat(request: AssistantRequest) -> AssistantResponse:
 
         # Initialiser les services
         chains = get_chains()
-        conversation_service = get_conversation_service()
-
-        # Récupérer ou créer la conversation
-        conversation_id = await conversation_service.get_or_create_conversation(
-            request.user_id, request.conversation_id
-        )
-
-        # Ajouter le message utilisateur à l'historique
-        await conversation_service.add_message(
-            conversation_id, "user", request.message
-        )
-
-        # Récupérer l'historique pour le contexte
-        history = await conversation_service.get_conversation_history(conversation_id)
+        conversation_id, history = await _start_turn(request)
 
         # Générer la réponse avec l'assistant
         try:
@@ -83,35 +131,9 @@ async def chat(request: AssistantRequest) -> AssistantResponse:
             )
         except Exception as e:
             logger.exception(f"❌ Erreur lors de la génération de réponse: {e}")
-            # Réponse de fallback si Ollama n'est pas disponible
-            response_text = (
-                "Je comprends votre préoccupation. 🙏 "
-                "Pourriez-vous vérifier que Ollama est démarré avec le modèle Mistral 7B ? "
-                "Je suis là pour vous accompagner spirituellement avec la Parole de Dieu."
-            )
-
-        # Extraire le verset de la réponse
-        verse = chains.extract_verse_from_response(response_text)
-
-        # Extraire les mots-clés
-        keywords = chains.extract_keywords(request.message)
-
-        # Ajouter la réponse de l'assistant à l'historique
-        verse_dict = None
-        if verse:
-            verse_dict = {"text": verse.text, "reference": verse.reference}
+            response_text = FALLBACK_RESPONSE
 
-        await conversation_service.add_message(
-            conversation_id, "assistant", response_text, verse_dict
-        )
-
-        # Construire la réponse
-        response = AssistantResponse(
-            response=response_text,
-            verse=verse,
-            conversation_id=conversation_id,
-            keywords=keywords,
-        )
+        response = await _finish_turn(request, conversation_id, response_text)
 
         logger.info(f"✅ Réponse envoyée pour la conversation {conversation_id}")
         return response
@@ -126,6 +148,72 @@ async def chat(request: AssistantRequest) -> AssistantResponse:
         ) from e
 
 
+@router.post("/chat/stream")
+async def chat_stream(request: AssistantRequest) -> StreamingResponse:
+    """
+    Variante de ``/chat`` qui transmet la réponse au fil de sa génération (Server-Sent Events).
+
+    Événements émis, dans l'ordre :
+    - ``start`` : ``{"conversation_id": ...}`` dès que la conversation est prête ;
+    - ``token`` : ``{"delta": ...}`` pour chaque fragment produit par le modèle ;
+    - ``done`` : la réponse complète (même contenu que ``/chat``), une fois le message
+      de l'assistant enregistré dans la conversation ;
+    - ``error`` : ``{"detail": ...}`` si le traitement échoue en cours de flux, avec
+      ``"partial": true`` si la génération s'est interrompue après le premier fragment
+      (remplace alors ``done``).
+
+    Si le modèle est indisponible avant le premier fragment, la réponse de fallback
+    de ``/chat`` est envoyée en un seul fragment. Une réponse partielle (génération
+    interrompue, client déconnecté) n'est pas enregistrée dans la conversation.
+    """
+    try:
+        logger.info(f"📥 Message reçu de {request.user_id} (streaming): {request.message[:50]}...")
+        chains = get_chains()
+        conversation_id, history = await _start_turn(request)
+    except Exception as e:
+        logger.exception("❌ Erreur lors du traitement du message")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors du traitement du message: {str(e)}",
+        ) from e
+
+    return sse_response(_chat_events(chains, request, conversation_id, history))
+
+
+async def _chat_events(
+    chains: AssistantChains,
+    request: AssistantRequest,
+    conversation_id: str,
+    history: list[dict],
+) -> AsyncIterator[str]:
+    yield format_sse("start", {"conversation_id": conversation_id})
+
+    parts: list[str] = []
+    try:
+        async for delta in chains.stream_response(request.message, history, request.language):
+            parts.append(delta)
+            yield format_sse("token", {"delta": delta})
+    except Exception as e:
+        if parts:
+            # Réponse interrompue : ni enregistrée comme un message complet, ni finalisée
+            logger.error(f"❌ Génération interrompue après {len(parts)} fragments: {e}")
+            yield format_sse("error", {"detail": "La génération de la réponse a été interrompue.", "partial": True})
+            return
+        logger.exception(f"❌ Erreur lors de la génération de réponse: {e}")
+        parts.append(FALLBACK_RESPONSE)
+        yield format_sse("token", {"delta": FALLBACK_RESPONSE})
+
+    try:
+        response = await _finish_turn(request, conversation_id, "".join(parts).strip())
+    except Exception as e:
+        logger.exception("❌ Erreur lors de l'enregistrement de la réponse")
+        yield format_sse("error", {"detail": f"Erreur lors du traitement du message: {str(e)}"})
+        return
+
+    logger.info(f"✅ Réponse envoyée (streaming) pour la conversation {conversation_id}")
+    yield format_sse("done", response)
+
+
 @router.get("/conversations/{user_id}")
 async def get_user_conversations(user_id: str) -> dict:
     """
@@ -4,13 +4,16 @@ from __future__ import annotations
 
 import logging
 import os
+import time
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Optional, Tuple
 
 from dotenv import load_dotenv
-from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 
+from http_client import get_llm_http_client, llm_http_timeout
+
+from .prompts import get_prompt_registry
 from .schemas import AssistantResponse, VerseReference
 
 logger = logging.getLogger(__name__)
@@ -31,36 +34,8 @@ else:
 
 
 def load_assistant_prompt() -> str:
-    """Charge le prompt de l'assistant depuis le fichier prompt_assistant."""
-    prompt_file = backend_dir.parent / "prompt_assistant"
-    if prompt_file.exists():
-        with open(prompt_file, "r", encoding="utf-8") as f:
-            return f.read().strip()
-    else:
-        # Prompt par défaut si le fichier n'existe pas
-        return """Tu es un assistant spirituel chrétien bienveillant appelé "Shalom".
-
-🎯 Ta mission :
-- Apporter du réconfort, de la sagesse et de l'espérance à toute personne qui te parle.
-- Répondre avec douceur, empathie et amour, selon les principes bibliques.
-- Quand quelqu'un exprime une émotion (tristesse, peur, colère, solitude…), propose un verset biblique approprié et une brève explication.
-- Encourage toujours à la prière, à la foi, et à la confiance en Dieu.
-
-📖 Tes réponses doivent :
-- Être courtes, simples et claires.
-- Inclure au moins un verset biblique adapté (exemple : *Psaume 34:18*).
-- Ne jamais juger, ni imposer une croyance : tu accompagnes avec bienveillance.
-- Si la demande ne concerne pas la foi, tu peux répondre poliment que ton rôle est spirituel et orienté vers la Parole.
-
-🧘 MÉDITATION SUR UN VERSET :
-Quand l'utilisateur te demande de méditer ensemble sur un verset spécifique (par exemple : "Méditons ensemble sur ce verset: [verset]"), tu dois :
-1. Reconnaître le verset mentionné et sa référence biblique
-2. Fournir une méditation spirituelle approfondie sur ce verset
-3. Expliquer le contexte et le sens du verset
-4. Relier ce verset à la vie quotidienne et aux défis spirituels
-5. Offrir des pistes de réflexion et d'application pratique
-6. Inclure une prière ou une pensée de méditation si approprié
-NE demande PAS plus de précisions, mais engage-toi directement dans la méditation sur le verset fourni."""
+    """Retourne le prompt de l'assistant (fichier prompt_assistant, relu seulement s'il a changé)."""
+    return get_prompt_registry().get().text
 
 
 class AssistantChains:
@@ -83,7 +58,9 @@ class AssistantChains:
                 base_url=ollama_url,
                 api_key="ollama",  # Clé factice pour Ollama (non utilisée)
                 temperature=0.7,  # Température modérée pour équilibrer créativité et cohérence
-                timeout=60.0,  # Timeout plus long pour les modèles locaux
+                # Client HTTP partagé (pool, keep-alive) ; LLM_HTTP_READ_TIMEOUT (60 s) pour les modèles locaux
+                http_async_client=get_llm_http_client(),
+                timeout=llm_http_timeout(),
             )
             logger.info(f"✅ LLM Ollama initialisé avec succès - Modèle: {model_name}")
         except Exception as e:
@@ -91,21 +68,9 @@ class AssistantChains:
             logger.exception("Détails de l'erreur:")
             raise
 
-        # Charger le prompt de l'assistant
-        assistant_prompt_text = load_assistant_prompt()
-
-        # Créer le template de prompt avec historique de conversation
-        self._conversation_prompt = ChatPromptTemplate.from_messages(
-            [
-                ("system", assistant_prompt_text),
-                (
-                    "system",
-                    "Historique de la conversation (pour contexte) :\n{history}\n\n"
-                    "Réponds maintenant au message suivant en français, avec bienveillance et en incluant un verset biblique approprié.",
-                ),
-                ("user", "{user_message}"),
-            ]
-        )
+        # Charger et compiler les prompts de l'assistant (rechargés si le fichier change)
+        self._prompt_registry = get_prompt_registry()
+        self._prompt_registry.get()
 
     async def generate_response(
         self,
@@ -125,60 +90,10 @@ class AssistantChains:
             Réponse de l'assistant
         """
         try:
-            # Détecter si c'est une demande de méditation sur un verset
-            is_meditation_request = self._is_meditation_request(user_message)
-            verse_info = None
-            if is_meditation_request:
-                verse_info = self._extract_verse_from_user_message(user_message)
-            
-            # Formater l'historique pour le prompt
-            history_text = ""
-            if conversation_history:
-                history_messages = []
-                for msg in conversation_history[-6:]:  # Garder les 6 derniers messages pour le contexte
-                    role = msg.get("role", "user")
-                    content = msg.get("content", "")
-                    if role == "user":
-                        history_messages.append(f"Utilisateur: {content}")
-                    elif role == "assistant":
-                        history_messages.append(f"Assistant: {content}")
-                history_text = "\n".join(history_messages)
-
-            logger.info(f"📝 Génération de réponse pour: {user_message[:50]}...")
-            if is_meditation_request and verse_info:
-                logger.info(f"🧘 Demande de méditation détectée sur: {verse_info['reference']}")
-
-            # Charger le prompt de l'assistant pour l'utiliser dans le template
-            assistant_prompt_text = load_assistant_prompt()
-
-            # Construire le message système avec contexte supplémentaire si méditation
-            if is_meditation_request and verse_info:
-                # Créer un prompt spécialisé pour la méditation
-                meditation_prompt = ChatPromptTemplate.from_messages(
-                    [
-                        ("system", assistant_prompt_text),
-                        (
-                            "system",
-                            f"""L'utilisateur demande de méditer ensemble sur le verset suivant :
-Verset : "{verse_info['text']}"
-Référence : {verse_info['reference']}
-
-Engage-toi directement dans une méditation spirituelle approfondie sur ce verset. Explique son contexte, son sens, et comment l'appliquer dans la vie quotidienne. Ne demande pas plus de précisions.
-
-Historique de la conversation (pour contexte) :\n{history_text if history_text else "Aucun historique."}""",
-                        ),
-                        ("user", "{user_message}"),
-                    ]
-                )
-                messages = meditation_prompt.format_messages(user_message=user_message)
-            else:
-                # Créer le prompt avec l'historique et invoquer le LLM
-                messages = self._conversation_prompt.format_messages(
-                    history=history_text if history_text else "Aucun historique.",
-                    user_message=user_message,
-                )
+            messages, prompt_version = self._build_messages(user_message, conversation_history)
 
             # Générer la réponse
+            started = time.perf_counter()
             response = await self._llm.ainvoke(messages)
 
             # Extraire le texte de la réponse
@@ -187,13 +102,88 @@ Historique de la conversation (pour contexte) :\n{history_text if history_text e
             else:
                 response_text = str(response)
 
-            logger.info(f"✅ Réponse générée: {len(response_text)} caractères")
+            logger.info(
+                f"✅ Réponse générée: {len(response_text)} caractères en "
+                f"{time.perf_counter() - started:.2f}s (prompt {prompt_version})"
+            )
             return response_text.strip()
 
         except Exception as e:
             logger.exception(f"❌ Erreur lors de la génération de réponse: {e}")
             raise
 
+    async def stream_response(
+        self,
+        user_message: str,
+        conversation_history: Optional[list[dict]] = None,
+        language: str = "fr",
+    ) -> AsyncIterator[str]:
+        """
+        Génère la réponse de l'assistant token par token (mêmes prompts que ``generate_response``).
+
+        Args:
+            user_message: Message de l'utilisateur
+            conversation_history: Historique de la conversation (liste de dict avec 'role' et 'content')
+            language: Langue de la réponse
+
+        Yields:
+            Fragments de texte, dans l'ordre de production par le modèle
+        """
+        messages, prompt_version = self._build_messages(user_message, conversation_history)
+        started = time.perf_counter()
+        first_token_at: Optional[float] = None
+        length = 0
+        async for chunk in self._llm.astream(messages):
+            text = chunk.content if hasattr(chunk, "content") else str(chunk)
+            if text:
+                if first_token_at is None:
+                    first_token_at = time.perf_counter() - started
+                length += len(text)
+                yield text
+        logger.info(
+            f"✅ Réponse générée (streaming): {length} caractères en {time.perf_counter() - started:.2f}s, "
+            f"premier fragment à {first_token_at or 0.0:.2f}s (prompt {prompt_version})"
+        )
+
+    def _build_messages(
+        self, user_message: str, conversation_history: Optional[list[dict]]
+    ) -> Tuple[list, str]:
+        """Construit les messages du prompt (conversation ou méditation sur un verset) et retourne la version du prompt."""
+        # Détecter si c'est une demande de méditation sur un verset
+        is_meditation_request = self._is_meditation_request(user_message)
+        verse_info = None
+        if is_meditation_request:
+            verse_info = self._extract_verse_from_user_message(user_message)
+        
+        # Formater l'historique pour le prompt
+        history_text = ""
+        if conversation_history:
+            history_messages = []
+            for msg in conversation_history[-6:]:  # Garder les 6 derniers messages pour le contexte
+                role = msg.get("role", "user")
+                content = msg.get("content", "")
+                if role == "user":
+                    history_messages.append(f"Utilisateur: {content}")
+                elif role == "assistant":
+                    history_messages.append(f"Assistant: {content}")
+            history_text = "\n".join(history_messages)
+
+        prompts = self._prompt_registry.get()
+        history = history_text if history_text else "Aucun historique."
+
+        logger.info(f"📝 Génération de réponse pour: {user_message[:50]}... (prompt {prompts.version})")
+        if is_meditation_request and verse_info:
+            logger.info(f"🧘 Demande de méditation détectée sur: {verse_info['reference']}")
+            messages = prompts.meditation.format_messages(
+                verse_text=verse_info["text"],
+                verse_reference=verse_info["reference"],
+                history=history,
+                user_message=user_message,
+            )
+        else:
+            messages = prompts.conversation.format_messages(history=history, user_message=user_message)
+        return messages, prompts.version
+
     def _is_meditation_request(self, user_message: str) -> bool:
         """Détecte si le message est une demande de méditation sur un verset."""
         lower_message = user_message.lower()
@@ -0,0 +1,187 @@
+"""Prompts de l'Assistant : chargés une fois, compilés, rechargés quand le fichier change."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from langchain_core.prompts import ChatPromptTemplate
+
+logger = logging.getLogger(__name__)
+
+# Fichier du prompt, à la racine du projet
+PROMPT_FILE = Path(__file__).parent.parent.parent / "prompt_assistant"
+
+# Intervalle minimal (secondes) entre deux vérifications de la date de modification du fichier
+DEFAULT_CHECK_INTERVAL_SECONDS = 2.0
+
+# Prompt par défaut si le fichier n'existe pas
+DEFAULT_ASSISTANT_PROMPT = """Tu es un assistant spirituel chrétien bienveillant appelé "Shalom".
+
+🎯 Ta mission :
+- Apporter du réconfort, de la sagesse et de l'espérance à toute personne qui te parle.
+- Répondre avec douceur, empathie et amour, selon les principes bibliques.
+- Quand quelqu'un exprime une émotion (tristesse, peur, colère, solitude…), propose un verset biblique approprié et une brève explication.
+- Encourage toujours à la prière, à la foi, et à la confiance en Dieu.
+
+📖 Tes réponses doivent :
+- Être courtes, simples et claires.
+- Inclure au moins un verset biblique adapté (exemple : *Psaume 34:18*).
+- Ne jamais juger, ni imposer une croyance : tu accompagnes avec bienveillance.
+- Si la demande ne concerne pas la foi, tu peux répondre poliment que ton rôle est spirituel et orienté vers la Parole.
+
+🧘 MÉDITATION SUR UN VERSET :
+Quand l'utilisateur te demande de méditer ensemble sur un verset spécifique (par exemple : "Méditons ensemble sur ce verset: [verset]"), tu dois :
+1. Reconnaître le verset mentionné et sa référence biblique
+2. Fournir une méditation spirituelle approfondie sur ce verset
+3. Expliquer le contexte et le sens du verset
+4. Relier ce verset à la vie quotidienne et aux défis spirituels
+5. Offrir des pistes de réflexion et d'application pratique
+6. Inclure une prière ou une pensée de méditation si approprié
+NE demande PAS plus de précisions, mais engage-toi directement dans la méditation sur le verset fourni."""
+
+_CONVERSATION_INSTRUCTIONS = (
+    "Historique de la conversation (pour contexte) :\n{history}\n\n"
+    "Réponds maintenant au message suivant en français, avec bienveillance et en incluant un verset biblique approprié."
+)
+
+_MEDITATION_INSTRUCTIONS = """L'utilisateur demande de méditer ensemble sur le verset suivant :
+Verset : "{verse_text}"
+Référence : {verse_reference}
+
+Engage-toi directement dans une méditation spirituelle approfondie sur ce verset. Explique son contexte, son sens, et comment l'appliquer dans la vie quotidienne. Ne demande pas plus de précisions.
+
+Historique de la conversation (pour contexte) :\n{history}"""
+
+
+@dataclass(frozen=True)
+class AssistantPrompts:
+    """
+    Une version du prompt de l'assistant et ses templates compilés.
+
+    ``version`` est une empreinte courte du texte : elle apparaît dans les logs de
+    génération pour rapprocher une variation de latence d'un changement de prompt.
+    """
+
+    text: str
+    version: str
+    source: str
+    conversation: ChatPromptTemplate
+    meditation: ChatPromptTemplate
+
+    @classmethod
+    def compile(cls, text: str, source: str) -> "AssistantPrompts":
+        # Le texte du prompt est littéral : ses accolades ne sont pas des variables
+        system_text = text.replace("{", "{{").replace("}", "}}")
+        return cls(
+            text=text,
+            version=hashlib.sha256(text.encode("utf-8")).hexdigest()[:12],
+            source=source,
+            conversation=ChatPromptTemplate.from_messages(
+                [
+                    ("system", system_text),
+                    ("system", _CONVERSATION_INSTRUCTIONS),
+                    ("user", "{user_message}"),
+                ]
+            ),
+            meditation=ChatPromptTemplate.from_messages(
+                [
+                    ("system", system_text),
+                    ("system", _MEDITATION_INSTRUCTIONS),
+                    ("user", "{user_message}"),
+                ]
+            ),
+        )
+
+
+class PromptRegistry:
+    """
+    Prompts de l'assistant, rechargés uniquement quand le fichier change.
+
+    La date de modification du fichier est vérifiée au plus toutes les
+    ``check_interval`` secondes ; le fichier n'est relu (et les templates
+    recompilés) que si elle a changé. Si la relecture échoue, la version
+    précédente reste en service.
+    """
+
+    def __init__(self, path: Path = PROMPT_FILE, check_interval: float = DEFAULT_CHECK_INTERVAL_SECONDS) -> None:
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._prompts: Optional[AssistantPrompts] = None
+        self._mtime: Optional[int] = None
+        self._checked_at = 0.0
+        self._reloads = 0
+
+    def _stat_mtime(self) -> Optional[int]:
+        try:
+            return self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def get(self) -> AssistantPrompts:
+        """Retourne la version courante des prompts (rechargée si le fichier a changé)."""
+        now = time.monotonic()
+        if self._prompts is not None and now - self._checked_at < self.check_interval:
+            return self._prompts
+
+        with self._lock:
+            if self._prompts is not None and now - self._checked_at < self.check_interval:
+                return self._prompts
+            self._checked_at = now
+            mtime = self._stat_mtime()
+            if self._prompts is None or mtime != self._mtime:
+                self._load(mtime)
+            return self._prompts
+
+    def _load(self, mtime: Optional[int]) -> None:
+        if mtime is None:
+            text, source = DEFAULT_ASSISTANT_PROMPT, "default"
+        else:
+            try:
+                text, source = self.path.read_text(encoding="utf-8").strip(), str(self.path)
+            except OSError as e:
+                if self._prompts is not None:
+                    logger.error(f"❌ Relecture du prompt impossible ({self.path}), version {self._prompts.version} conservée: {e}")
+                    return
+                logger.error(f"❌ Lecture du prompt impossible ({self.path}), prompt par défaut utilisé: {e}")
+                text, source = DEFAULT_ASSISTANT_PROMPT, "default"
+
+        previous = self._prompts
+        self._prompts = AssistantPrompts.compile(text, source)
+        self._mtime = mtime
+        if previous is None:
+            logger.info(f"📜 Prompt de l'assistant chargé: version {self._prompts.version} ({source})")
+        elif previous.version != self._prompts.version:
+            self._reloads += 1
+            logger.info(
+                f"📜 Prompt de l'assistant rechargé: version {previous.version} → {self._prompts.version} ({source})"
+            )
+
+    def stats(self) -> dict:
+        prompts = self._prompts
+        return {
+            "version": prompts.version if prompts else None,
+            "source": prompts.source if prompts else None,
+            "reloads": self._reloads,
+        }
+
+
+# Instance globale (singleton)
+_registry: Optional[PromptRegistry] = None
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """Retourne le registre des prompts (ASSISTANT_PROMPT_CHECK_INTERVAL pour l'intervalle de vérification)."""
+    global _registry
+    if _registry is None:
+        _registry = PromptRegistry(
+            check_interval=float(os.getenv("ASSISTANT_PROMPT_CHECK_INTERVAL", DEFAULT_CHECK_INTERVAL_SECONDS)),
+        )
+    return _registry
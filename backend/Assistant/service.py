@@ -3,13 +3,14 @@
 from __future__ import annotations
 
 import logging
-import os
 import uuid
 from datetime import datetime
 from typing import List, Optional
 
 from dotenv import load_dotenv
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+
+from database import get_database
 
 from .schemas import Message
 
@@ -21,23 +22,15 @@ load_dotenv()
 class ConversationService:
     """Service pour gérer les conversations dans MongoDB."""
 
-    def __init__(self) -> None:
-        mongo_url = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
-        mongo_db = os.getenv("MONGODB_DATABASE", "parole_du_moment_db")
-
-        logger.info(f"🔌 Connexion ConversationService à MongoDB: {mongo_url}")
-        logger.info(f"📚 Base de données: {mongo_db}")
+    def __init__(self, db: Optional[AsyncIOMotorDatabase] = None) -> None:
+        # Base sur le client MongoDB partagé par tous les services (voir database.py)
+        self._db = db if db is not None else get_database()
+        self._client = self._db.client
+        logger.info(f"📚 ConversationService sur la base: {self._db.name}")
 
-        try:
-            self._client = AsyncIOMotorClient(
-                mongo_url,
-                serverSelectionTimeoutMS=5000,
-            )
-            self._db = self._client[mongo_db]
-            logger.info("✅ Client MongoDB créé pour ConversationService")
-        except Exception as e:
-            logger.error(f"❌ Erreur lors de la connexion MongoDB: {e}")
-            raise
+    async def ping(self) -> None:
+        """Vérifie la connexion MongoDB (ouvre le pool de connexions)."""
+        await self._client.admin.command("ping")
 
     @property
     def conversations(self) -> AsyncIOMotorCollection:
@@ -2,13 +2,24 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional, Tuple
 
+import numpy as np
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 
-from .chains import HomeChains
-from .retriever import MongoVerseRetriever
-from .schemas import AnalysisResult, VerseMetadata, VerseRequest, VerseResponse
+from database import get_database
+from sse import format_sse, sse_response
+
+from .chains import SPIRITUAL_SECTIONS, HomeChains, StreamedContent
+from .content_store import get_content_store
+from .response_cache import CachedAnswer, get_response_cache
+from .retriever import MongoVerseRetriever, VerseDocument
+from .schemas import AnalysisResult, SpiritualContent, VerseMetadata, VerseRequest, VerseResponse
+from .verse_filters import VerseFilters
 
 
 logger = logging.getLogger(__name__)
@@ -25,7 +36,7 @@ def get_chains() -> HomeChains:
     global _chains
     if _chains is None:
         try:
-            _chains = HomeChains()
+            _chains = HomeChains(content_store=get_content_store())
         except Exception as e:
             logger.error(f"Erreur lors de l'initialisation de HomeChains: {e}")
             logger.warning("Les heuristiques locales seront utilisées à la place")
@@ -40,7 +51,7 @@ def get_retriever() -> MongoVerseRetriever:
     global _retriever
     if _retriever is None:
         try:
-            _retriever = MongoVerseRetriever()
+            _retriever = MongoVerseRetriever(get_database())
             logger.info("✅ MongoVerseRetriever initialisé avec succès")
         except Exception as e:
             logger.error(f"❌ Erreur lors de l'initialisation de MongoVerseRetriever: {e}")
@@ -99,9 +110,54 @@ async def test_mongodb() -> dict:
         }
 
 
-@router.post("/search", response_model=VerseResponse)
-async def search_home(request: VerseRequest) -> VerseResponse:
-    """Analyse le texte utilisateur et renvoie un verset pertinent."""
+@router.get("/index", tags=["index"])
+async def vector_index_status() -> dict:
+    """Liste les index vectoriels résidents chargés en mémoire."""
+    retriever = get_retriever()
+    return {"indexes": retriever.vector_index_stats()}
+
+
+@router.post("/index/reload", tags=["index"])
+async def reload_vector_index(translation_id: Optional[str] = None) -> dict:
+    """
+    Recharge l'index vectoriel d'une traduction, ou invalide tous les index.
+
+    Sans ``translation_id``, les index sont simplement invalidés et seront
+    rechargés à la prochaine recherche sur chaque traduction.
+    """
+    retriever = get_retriever()
+    if translation_id is None:
+        retriever.invalidate_vector_index()
+        return {"status": "invalidated", "indexes": {}}
+
+    index = await retriever.reload_vector_index(translation_id.lower().strip())
+    if index is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Aucun verset avec embedding pour la traduction {translation_id}.",
+        )
+    return {"status": "reloaded", "indexes": retriever.vector_index_stats()}
+
+
+@dataclass
+class _SearchContext:
+    """Services et état d'une recherche, préparés avant l'analyse."""
+
+    chains: HomeChains
+    retriever: MongoVerseRetriever
+    filters: Optional[VerseFilters]
+    cache_partition: Optional[str] = None
+    query_embedding: Optional[np.ndarray] = None
+    cached: Optional[CachedAnswer] = None
+
+    @property
+    def cached_content(self) -> Optional[SpiritualContent]:
+        """Contenu partagé du cache, réutilisable sans appel au LLM."""
+        return self.cached.content if self.cached is not None else None
+
+
+async def _prepare_search(request: VerseRequest) -> _SearchContext:
+    """Valide la requête, initialise les services, construit les filtres et consulte le cache."""
 
     logger.info(f"📥 Requête reçue: text='{request.text[:50]}...', language={request.language}")
     
@@ -126,23 +182,85 @@ async def search_home(request: VerseRequest) -> VerseResponse:
             status_code=500, detail=f"Erreur de connexion MongoDB: {str(e)}"
         ) from e
 
-    analysis: AnalysisResult
+    try:
+        filters = await retriever.build_filters(
+            request.books, request.testament, request.emotions, request.themes
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    context = _SearchContext(chains=chains, retriever=retriever, filters=filters)
+
+    # Cache de réponses : même texte (hash), puis message quasi identique (embedding)
+    cache = get_response_cache()
+    if request.use_cache and cache.enabled:
+        try:
+            context.cache_partition = cache.partition_key(
+                MongoVerseRetriever._normalize_translation_id(request.translation_id, request.language, request.bible_version),
+                request.language,
+                await retriever.active_embedding_model(),
+                filters,
+            )
+            cached = cache.get_exact(context.cache_partition, request.text)
+            if cached is None:
+                context.query_embedding = await retriever.embed_query(request.text)
+                cached = cache.get_similar(context.cache_partition, context.query_embedding)
+            if cached is not None:
+                logger.info("✅ Verset servi depuis le cache")
+                context.cached = cached
+        except Exception as e:
+            logger.warning(f"⚠️ Cache de réponses indisponible: {e}")
+            context.cache_partition = None
+
+    return context
+
+
+async def _run_analysis(
+    context: _SearchContext, request: VerseRequest, pending: Optional[asyncio.Task] = None
+) -> AnalysisResult:
+    """Analyse le texte (LLM) ; annule ``pending`` et lève HTTPException en cas d'échec."""
     try:
         logger.info("🔍 Début de l'analyse du texte...")
-        analysis = await chains.run_analysis(request.text, request.language)
+        analysis = await context.chains.run_analysis(request.text, request.language)
         logger.info(f"✅ Analyse terminée: emotions={analysis.emotions}, themes={analysis.themes}, keywords={analysis.keywords[:3]}")
+        return analysis
     except ValueError as exc:
+        if pending is not None:
+            pending.cancel()
         logger.error(f"❌ Erreur de validation: {exc}")
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except Exception as exc:
+        if pending is not None:
+            pending.cancel()
         logger.exception("❌ Erreur d'analyse : %s", exc)
         raise HTTPException(
             status_code=500, detail="Impossible d'analyser le message pour le moment."
         ) from exc
 
+
+async def _analyse_and_retrieve(context: _SearchContext, request: VerseRequest) -> Tuple[AnalysisResult, VerseDocument]:
+    """Analyse le texte (LLM) et sélectionne le verset ; lève HTTPException en cas d'échec."""
+
+    if context.cached is not None:
+        # Verset déjà choisi pour ce message (ou un message quasi identique) : seule
+        # l'analyse, propre au message et jamais mise en cache, est refaite
+        return await _run_analysis(context, request), context.cached.verse
+
+    retriever = context.retriever
+
+    # La recherche vectorielle ne dépend que du texte : elle est lancée tout de suite et
+    # s'exécute pendant l'analyse par le LLM (le score hybride est appliqué ensuite)
+    vector_search = asyncio.create_task(
+        retriever.search_vector_candidates(
+            request.text, request.translation_id, request.language, request.bible_version, context.filters
+        )
+    )
+
+    analysis = await _run_analysis(context, request, vector_search)
+
     try:
         logger.info("🔍 Recherche du verset dans MongoDB...")
-        verse_doc = await retriever.get_best_verse(analysis, request.translation_id, request.language, request.bible_version, request.text)
+        verse_doc = await retriever.get_best_verse(analysis, request.translation_id, request.language, request.bible_version, request.text, context.filters, vector_search)
         if verse_doc is None:
             logger.warning("⚠️ Aucun verset trouvé dans MongoDB")
             raise HTTPException(
@@ -158,9 +276,70 @@ async def search_home(request: VerseRequest) -> VerseResponse:
             status_code=500, detail=f"Erreur lors de la récupération du verset: {str(exc)}"
         ) from exc
 
+    return analysis, verse_doc
+
+
+def _build_response(
+    context: _SearchContext,
+    request: VerseRequest,
+    verse_doc: VerseDocument,
+    analysis: Optional[AnalysisResult],
+    spiritual_content: SpiritualContent,
+) -> VerseResponse:
+    """
+    Assemble la réponse de la requête et met en cache ce qui est réutilisable par
+    d'autres (voir ``CachedAnswer``), sauf si l'analyse ou le contenu sont des
+    replis locaux (Groq indisponible).
+    """
+    response = VerseResponse(
+        text=verse_doc.text,
+        reference=verse_doc.reference,
+        explanation=spiritual_content.explanation,
+        meditation=spiritual_content.meditation,
+        prayer=spiritual_content.prayer,
+        keywords=verse_doc.keywords or (analysis.keywords if analysis is not None else []),
+        metadata=_verse_metadata(verse_doc),
+        analysis=analysis if request.include_analysis else None,
+    )
+    if context.cached is not None or context.cache_partition is None or context.query_embedding is None:
+        return response
+    if (analysis is not None and analysis.degraded) or spiritual_content.degraded:
+        logger.info("ℹ️ Réponse de repli (Groq indisponible) : non mise en cache")
+        return response
+    shared_content = spiritual_content if context.chains.shares_content else None
+    get_response_cache().put(
+        context.cache_partition, request.text, context.query_embedding, CachedAnswer(verse_doc, shared_content)
+    )
+    return response
+
+
+def _verse_metadata(verse_doc: VerseDocument) -> VerseMetadata:
+    return VerseMetadata(
+        translation=verse_doc.translation,
+        book=verse_doc.book,
+        chapter=verse_doc.chapter,
+        verse=verse_doc.verse,
+    )
+
+
+@router.post("/search", response_model=VerseResponse)
+async def search_home(request: VerseRequest) -> VerseResponse:
+    """Analyse le texte utilisateur et renvoie un verset pertinent."""
+
+    context = await _prepare_search(request)
+    if context.cached_content is not None and not request.include_analysis:
+        # Verset et contenu partagé en cache : aucun appel au LLM
+        return _build_response(context, request, context.cached.verse, None, context.cached_content)
+
+    analysis, verse_doc = await _analyse_and_retrieve(context, request)
+    if context.cached_content is not None:
+        response = _build_response(context, request, verse_doc, analysis, context.cached_content)
+        logger.info("✅ Réponse envoyée avec succès (contenu en cache)")
+        return response
+
     try:
         logger.info("🔍 Génération du contenu spirituel...")
-        spiritual_content = await chains.generate_spiritual_content(
+        spiritual_content = await context.chains.generate_spiritual_content(
             verse_doc.text,
             verse_doc.reference,
             analysis,
@@ -174,24 +353,78 @@ async def search_home(request: VerseRequest) -> VerseResponse:
             status_code=500, detail="Erreur lors de la génération du contenu spirituel."
         ) from exc
 
-    response = VerseResponse(
-        text=verse_doc.text,
-        reference=verse_doc.reference,
-        explanation=spiritual_content.explanation,
-        meditation=spiritual_content.meditation,
-        prayer=spiritual_content.prayer,
-        keywords=verse_doc.keywords or analysis.keywords,
-        metadata=VerseMetadata(
-            translation=verse_doc.translation,
-            book=verse_doc.book,
-            chapter=verse_doc.chapter,
-            verse=verse_doc.verse,
-        ),
-    )
-
-    if request.include_analysis:
-        response.analysis = analysis
+    response = _build_response(context, request, verse_doc, analysis, spiritual_content)
 
     logger.info("✅ Réponse envoyée avec succès")
     return response
 
+
+@router.post("/search/stream")
+async def search_home_stream(request: VerseRequest) -> StreamingResponse:
+    """
+    Variante de ``/search`` en Server-Sent Events.
+
+    Événements, dans l'ordre :
+    - ``analysis`` : résultat de l'analyse (si ``include_analysis``) ;
+    - ``verse`` : verset et métadonnées, dès la fin de la recherche ;
+    - ``content`` : ``{"section": "explanation" | "meditation" | "prayer", "delta": "..."}``,
+      au fil de la génération ;
+    - ``done`` : réponse complète (identique à ``/search``) ;
+    - ``error`` : ``{"status_code": ..., "detail": ...}`` si une étape échoue, avec
+      ``"partial": true`` si la génération s'est interrompue après le début du contenu
+      (remplace alors ``done``).
+
+    Les erreurs de validation (texte vide, testament inconnu...) sont renvoyées avant
+    l'ouverture du flux, avec leur code HTTP.
+    """
+    context = await _prepare_search(request)
+    return sse_response(_search_events(context, request))
+
+
+async def _search_events(context: _SearchContext, request: VerseRequest) -> AsyncIterator[str]:
+    try:
+        analysis: Optional[AnalysisResult] = None
+        if context.cached_content is not None and not request.include_analysis:
+            # Verset et contenu partagé en cache : aucun appel au LLM
+            verse_doc = context.cached.verse
+        else:
+            analysis, verse_doc = await _analyse_and_retrieve(context, request)
+            if request.include_analysis:
+                yield format_sse("analysis", analysis)
+        keywords = verse_doc.keywords or (analysis.keywords if analysis is not None else [])
+        yield format_sse("verse", _verse_event(verse_doc.text, verse_doc.reference, keywords, _verse_metadata(verse_doc)))
+
+        if context.cached_content is not None:
+            for section in SPIRITUAL_SECTIONS:
+                text = getattr(context.cached_content, section)
+                if text:
+                    yield format_sse("content", {"section": section, "delta": text})
+            yield format_sse("done", _build_response(context, request, verse_doc, analysis, context.cached_content))
+            return
+
+        streamed = StreamedContent()
+        async for section, delta in context.chains.stream_spiritual_content(
+            verse_doc.text, verse_doc.reference, analysis, request.language, request.text, streamed
+        ):
+            yield format_sse("content", {"section": section, "delta": delta})
+
+        if streamed.interrupted:
+            # Contenu partiel : ni réponse complète, ni mise en cache
+            yield format_sse(
+                "error",
+                {"status_code": 502, "detail": "La génération du contenu spirituel a été interrompue.", "partial": True},
+            )
+            return
+
+        response = _build_response(context, request, verse_doc, analysis, streamed.content())
+        yield format_sse("done", response)
+        logger.info("✅ Réponse envoyée avec succès (streaming)")
+    except HTTPException as exc:
+        yield format_sse("error", {"status_code": exc.status_code, "detail": exc.detail})
+    except Exception as exc:
+        logger.exception("❌ Erreur lors de la recherche en streaming: %s", exc)
+        yield format_sse("error", {"status_code": 500, "detail": "Erreur lors de la génération de la réponse."})
+
+
+def _verse_event(text: str, reference: str, keywords: List[str], metadata: Optional[VerseMetadata]) -> dict:
+    return {"text": text, "reference": reference, "keywords": keywords, "metadata": metadata}
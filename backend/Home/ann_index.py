@@ -0,0 +1,199 @@
+"""Index approximatif (IVF-flat) pour la recherche vectorielle des versets."""
+
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Nombre de lignes traitées à la fois lors de l'affectation aux centroïdes
+_ASSIGN_CHUNK_SIZE = 8192
+
+
+def _assign(data: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Affecte chaque ligne au centroïde le plus proche (produit scalaire)."""
+    assignments = np.empty(len(data), dtype=np.int32)
+    for start in range(0, len(data), _ASSIGN_CHUNK_SIZE):
+        chunk = np.asarray(data[start : start + _ASSIGN_CHUNK_SIZE], dtype=np.float32)
+        assignments[start : start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return assignments
+
+
+def _spherical_kmeans(
+    data: np.ndarray, n_lists: int, n_iter: int, rng: np.random.Generator
+) -> np.ndarray:
+    """K-means sphérique : centroïdes normalisés, adapté à la similarité cosinus."""
+    centroids = np.array(data[rng.choice(len(data), n_lists, replace=False)], dtype=np.float32)
+
+    for _ in range(n_iter):
+        assignments = _assign(data, centroids)
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=n_lists)
+        non_empty = np.flatnonzero(counts)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[non_empty]
+
+        sums = np.zeros_like(centroids)
+        sums[non_empty] = np.add.reduceat(np.asarray(data[order], dtype=np.float32), starts, axis=0)
+
+        # Les listes vides sont réensemencées avec des lignes tirées au hasard
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            sums[empty] = data[rng.choice(len(data), len(empty), replace=False)]
+
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+
+    return centroids
+
+
+@dataclass
+class IVFFlatIndex:
+    """
+    Index IVF-flat : les lignes sont regroupées en listes autour de centroïdes,
+    et seules les ``nprobe`` listes les plus proches de la requête sont comparées.
+
+    ``list_rows[list_offsets[i]:list_offsets[i + 1]]`` contient les lignes de la
+    matrice d'embeddings affectées à la liste ``i``.
+    """
+
+    centroids: np.ndarray
+    list_offsets: np.ndarray
+    list_rows: np.ndarray
+    nprobe: int = 8
+
+    @property
+    def n_lists(self) -> int:
+        return int(self.centroids.shape[0])
+
+    @property
+    def n_rows(self) -> int:
+        return int(self.list_rows.shape[0])
+
+    @classmethod
+    def build(
+        cls,
+        embeddings: np.ndarray,
+        n_lists: Optional[int] = None,
+        nprobe: int = 8,
+        n_iter: int = 20,
+        sample_size: Optional[int] = None,
+        seed: int = 0,
+    ) -> "IVFFlatIndex":
+        """
+        Construit l'index hors ligne à partir de la matrice d'embeddings normalisés.
+
+        Args:
+            embeddings: Matrice (n, dim) des embeddings
+            n_lists: Nombre de listes (défaut: 4 * sqrt(n))
+            nprobe: Nombre de listes explorées par défaut à la recherche
+            n_iter: Nombre d'itérations du k-means
+            sample_size: Nombre de lignes utilisées pour l'entraînement (défaut: 64 par liste)
+            seed: Graine aléatoire (construction reproductible)
+        """
+        n_rows = len(embeddings)
+        if n_lists is None:
+            n_lists = max(1, int(4 * np.sqrt(n_rows)))
+        n_lists = min(n_lists, n_rows)
+
+        rng = np.random.default_rng(seed)
+        sample_size = min(n_rows, sample_size or n_lists * 64)
+        sample_rows = np.sort(rng.choice(n_rows, sample_size, replace=False))
+        centroids = _spherical_kmeans(
+            np.asarray(embeddings[sample_rows], dtype=np.float32), n_lists, n_iter, rng
+        )
+
+        assignments = _assign(embeddings, centroids)
+        list_rows = np.argsort(assignments, kind="stable").astype(np.int32)
+        counts = np.bincount(assignments, minlength=n_lists)
+        list_offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+        return cls(
+            centroids=centroids,
+            list_offsets=list_offsets,
+            list_rows=list_rows,
+            nprobe=min(nprobe, n_lists),
+        )
+
+    def candidate_rows(self, query: np.ndarray, nprobe: Optional[int] = None) -> np.ndarray:
+        """Lignes appartenant aux ``nprobe`` listes les plus proches de la requête."""
+        nprobe = min(nprobe or self.nprobe, self.n_lists)
+        centroid_scores = self.centroids @ query
+        if nprobe < self.n_lists:
+            probes = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        else:
+            probes = np.arange(self.n_lists)
+        return np.concatenate(
+            [self.list_rows[self.list_offsets[p] : self.list_offsets[p + 1]] for p in probes]
+        )
+
+    def search(
+        self,
+        embeddings: np.ndarray,
+        query_embedding: np.ndarray,
+        top_k: int = 20,
+        nprobe: Optional[int] = None,
+        mask: Optional[np.ndarray] = None,
+    ) -> List[tuple[int, float]]:
+        """
+        Recherche approximative des lignes les plus proches de la requête.
+
+        Args:
+            embeddings: Matrice d'embeddings sur laquelle l'index a été construit
+            query_embedding: Embedding normalisé de la requête (dim,)
+            top_k: Nombre de résultats à retourner
+            nprobe: Nombre de listes explorées (défaut: valeur choisie à la construction)
+            mask: Tableau booléen (n,) des lignes autorisées (optionnel)
+
+        Returns:
+            Liste de tuples (ligne, score_similarité) triés par score décroissant
+        """
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        rows = self.candidate_rows(query, nprobe)
+        if mask is not None:
+            rows = rows[mask[rows]]
+        if len(rows) == 0:
+            return []
+
+        rows.sort()  # accès séquentiel à la matrice (utile en mémoire mappée)
+        similarities = np.asarray(embeddings[rows], dtype=np.float32) @ query
+        top_k = min(top_k, len(rows))
+        best = np.argpartition(-similarities, top_k - 1)[:top_k]
+        best = best[np.argsort(-similarities[best])]
+        return [(int(rows[i]), float(similarities[i])) for i in best]
+
+    def save(self, path: str | Path) -> Path:
+        """Écrit l'index dans un fichier ``.npz`` (écriture atomique)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                centroids=self.centroids,
+                list_offsets=self.list_offsets,
+                list_rows=self.list_rows,
+                nprobe=np.int64(self.nprobe),
+            )
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path) -> Optional["IVFFlatIndex"]:
+        """Charge l'index depuis un fichier ``.npz`` ; None s'il est absent."""
+        path = Path(path)
+        if not path.exists():
+            return None
+        with np.load(path) as data:
+            return cls(
+                centroids=data["centroids"].astype(np.float32),
+                list_offsets=data["list_offsets"],
+                list_rows=data["list_rows"],
+                nprobe=int(data["nprobe"]),
+            )
@@ -0,0 +1,153 @@
+"""Embeddings canoniques : un vecteur par verset (livre, chapitre, numéro), partagé par toutes les traductions."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from .embedding_codec import decode_embeddings, embedding_projection
+from .embedding_versions import EmbeddingVersion, default_embedding_version
+from .vector_index import VerseVectorIndex
+
+logger = logging.getLogger(__name__)
+
+# Collection des embeddings canoniques, remplie par scripts/compute_canonical_embeddings.py
+CANONICAL_COLLECTION = "versets_canoniques"
+
+# Stratégies de calcul : texte d'une traduction pivot, ou moyenne des embeddings des traductions
+CANONICAL_STRATEGIES = ("pivot", "mean")
+
+
+def canonical_key(livre_id: Optional[str], chapitre: Optional[int], numero: Optional[int]) -> str:
+    """Clé canonique d'un verset, indépendante de la traduction (ex: ``gn.1.1``)."""
+    return f"{livre_id}.{int(chapitre or 0)}.{int(numero or 0)}"
+
+
+@dataclass
+class CanonicalEmbeddings:
+    """Matrice des embeddings canoniques et correspondance clé canonique → ligne."""
+
+    keys: List[str]
+    embeddings: np.ndarray
+    version: EmbeddingVersion
+    loaded_at: float = field(default_factory=time.time)
+    _rows: Dict[str, int] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self) -> None:
+        self._rows = {key: row for row, key in enumerate(self.keys)}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def rows_for(self, documents: List[dict]) -> np.ndarray:
+        """Ligne canonique de chaque document ``versets`` (-1 si le verset n'a pas d'embedding canonique)."""
+        return np.fromiter(
+            (
+                self._rows.get(canonical_key(doc.get("livre_id"), doc.get("chapitre"), doc.get("numero")), -1)
+                for doc in documents
+            ),
+            dtype=np.int64,
+            count=len(documents),
+        )
+
+    @classmethod
+    async def load(
+        cls, canonical: AsyncIOMotorCollection, version: Optional[EmbeddingVersion] = None
+    ) -> Optional["CanonicalEmbeddings"]:
+        """Charge tous les embeddings canoniques produits par le modèle de ``version``."""
+        version = version or default_embedding_version()
+        started = time.perf_counter()
+        cursor = canonical.find(version.embedded_filter(), {"_id": 1, **embedding_projection(version.field)})
+        documents = await cursor.to_list(length=None)
+        if not documents:
+            logger.warning(
+                f"⚠️ Aucun embedding canonique ({version.field}, {version.model}). "
+                "Exécutez scripts/compute_canonical_embeddings.py."
+            )
+            return None
+
+        embeddings = decode_embeddings(documents, version.field)
+        logger.info(
+            f"📦 Embeddings canoniques chargés: {len(documents)} versets, "
+            f"{embeddings.nbytes / 1e6:.1f} Mo en {time.perf_counter() - started:.2f}s"
+        )
+        return cls(keys=[doc["_id"] for doc in documents], embeddings=embeddings, version=version)
+
+
+async def load_index_from_canonical(
+    verses: AsyncIOMotorCollection,
+    translation_id: str,
+    canonical: CanonicalEmbeddings,
+) -> Optional[VerseVectorIndex]:
+    """
+    Construit l'index d'une traduction à partir des embeddings canoniques.
+
+    Les métadonnées (et donc les résultats de recherche) sont celles des versets de la
+    traduction ; les embeddings sont ceux de la matrice canonique, retrouvés par la
+    référence livre/chapitre/numéro. La matrice n'est pas copiée : l'index la partage
+    avec les autres traductions et ne garde que l'indirection verset → ligne canonique.
+    """
+    started = time.perf_counter()
+    cursor = verses.find(
+        {"traduction_id": translation_id},
+        {"ref_unique": 1, "livre_id": 1, "chapitre": 1, "numero": 1},
+    )
+    documents = await cursor.to_list(length=None)
+    if not documents:
+        logger.warning(f"⚠️ Aucun verset pour la traduction {translation_id}")
+        return None
+
+    rows = canonical.rows_for(documents)
+    found = np.flatnonzero(rows >= 0)
+    if len(found) < len(documents):
+        logger.warning(
+            f"⚠️ {len(documents) - len(found)} versets de {translation_id} sans embedding canonique "
+            "(versification différente de la traduction pivot ?), exclus de la recherche vectorielle"
+        )
+    if len(found) == 0:
+        return None
+
+    kept = [documents[i] for i in found]
+    index = VerseVectorIndex(
+        translation_id=translation_id,
+        embeddings=canonical.embeddings,
+        embedding_rows=rows[found],
+        ids=[doc["_id"] for doc in kept],
+        refs=[doc.get("ref_unique", "") for doc in kept],
+        livre_ids=[doc.get("livre_id") for doc in kept],
+        chapitres=np.asarray([doc.get("chapitre") or 0 for doc in kept], dtype=np.int32),
+        numeros=np.asarray([doc.get("numero") or 0 for doc in kept], dtype=np.int32),
+        version=canonical.version,
+    )
+    logger.info(
+        f"📦 Index vectoriel (canonique) chargé pour {translation_id}: {len(index)} versets "
+        f"en {time.perf_counter() - started:.2f}s"
+    )
+    return index
+
+
+class CanonicalEmbeddingsCache:
+    """Embeddings canoniques chargés une seule fois, partagés par les index de toutes les traductions."""
+
+    def __init__(self, canonical: AsyncIOMotorCollection, version: EmbeddingVersion) -> None:
+        self._canonical = canonical
+        self._version = version
+        self._embeddings: Optional[CanonicalEmbeddings] = None
+        self._lock = asyncio.Lock()
+
+    async def get(self) -> Optional[CanonicalEmbeddings]:
+        if self._embeddings is not None:
+            return self._embeddings
+        async with self._lock:
+            if self._embeddings is None:
+                self._embeddings = await CanonicalEmbeddings.load(self._canonical, self._version)
+            return self._embeddings
+
+    def invalidate(self) -> None:
+        self._embeddings = None
@@ -4,7 +4,9 @@ from __future__ import annotations
 
 import logging
 import os
-from typing import List, Optional
+import re
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
 from pathlib import Path
@@ -12,6 +14,10 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from openai import RateLimitError
 
+from http_client import get_llm_http_client, llm_http_timeout
+
+from .circuit_breaker import get_circuit_breaker
+from .content_store import SpiritualContentStore
 from .schemas import AnalysisResult, SpiritualContent
 
 # Groq utilise l'interface OpenAI compatible, donc on peut utiliser ChatOpenAI avec base_url
@@ -32,10 +38,104 @@ else:
     logger.warning(f"⚠️ Fichier .env non trouvé à {env_path}, utilisation du chargement par défaut")
 
 
+_SECTION_MARKER = re.compile(r"\[\s*(EXPLICATION|M[ÉE]DITATION|PRI[ÈE]RE)\s*\]", re.IGNORECASE)
+_SECTION_NAMES = {"explication": "explanation", "méditation": "meditation", "meditation": "meditation", "prière": "prayer", "priere": "prayer"}
+# Longueur maximale d'un marqueur, pour retenir un marqueur coupé entre deux tokens
+_SECTION_MARKER_MAX_LENGTH = 16
+
+# Sections du contenu spirituel, dans l'ordre de génération
+SPIRITUAL_SECTIONS = ("explanation", "meditation", "prayer")
+
+# Situation indiquée au LLM quand le message de la personne n'est pas transmis
+_GENERIC_SITUATION = "Recherche de guidance spirituelle"
+
+
+@dataclass
+class StreamedContent:
+    """
+    Sections produites par ``HomeChains.stream_spiritual_content``, remplies au fil du flux.
+
+    ``degraded`` indique un contenu de repli (heuristiques) au lieu de Groq, et
+    ``interrupted`` un flux Groq coupé après le premier token (sections partielles).
+    """
+
+    sections: Dict[str, str] = field(default_factory=lambda: dict.fromkeys(SPIRITUAL_SECTIONS, ""))
+    degraded: bool = False
+    interrupted: bool = False
+
+    def add(self, section: str, text: str) -> None:
+        self.sections[section] += text
+
+    @property
+    def complete(self) -> bool:
+        return all(text.strip() for text in self.sections.values())
+
+    def content(self) -> SpiritualContent:
+        content = SpiritualContent(
+            explanation=self.sections["explanation"].strip(),
+            meditation=self.sections["meditation"].strip() or None,
+            prayer=self.sections["prayer"].strip() or None,
+        )
+        return content.mark_degraded() if self.degraded else content
+
+
+class _SectionSplitter:
+    """Découpe un flux de texte en sections ``[EXPLICATION]`` / ``[MÉDITATION]`` / ``[PRIÈRE]``."""
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._section: Optional[str] = None
+        self._section_start = False
+        self._preamble = ""
+
+    def _emit(self, text: str) -> List[Tuple[str, str]]:
+        if self._section is None:
+            self._preamble += text
+            return []
+        if self._section_start:
+            text = text.lstrip()
+            if not text:
+                return []
+            self._section_start = False
+        return [(self._section, text)] if text else []
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        self._buffer += chunk
+        out: List[Tuple[str, str]] = []
+        while True:
+            match = _SECTION_MARKER.search(self._buffer)
+            if match is None:
+                break
+            out.extend(self._emit(self._buffer[: match.start()]))
+            self._section = _SECTION_NAMES[match.group(1).lower()]
+            self._section_start = True
+            self._buffer = self._buffer[match.end():]
+
+        # Garder en attente un éventuel début de marqueur
+        cut = self._buffer.rfind("[")
+        if cut != -1 and "]" not in self._buffer[cut:] and len(self._buffer) - cut < _SECTION_MARKER_MAX_LENGTH:
+            text, self._buffer = self._buffer[:cut], self._buffer[cut:]
+        else:
+            text, self._buffer = self._buffer, ""
+        out.extend(self._emit(text))
+        return out
+
+    def close(self) -> List[Tuple[str, str]]:
+        out = self._emit(self._buffer)
+        self._buffer = ""
+        if self._section is None and self._preamble.strip():
+            # Le modèle n'a pas suivi le format : tout le texte devient l'explication
+            out.append(("explanation", self._preamble.strip()))
+        return out
+
+
 class HomeChains:
     """Ensemble de chaînes LangChain (analyse + génération)."""
 
-    def __init__(self) -> None:
+    def __init__(self, content_store: Optional[SpiritualContentStore] = None) -> None:
+        # Contenu spirituel déjà généré, consulté avant Groq (voir content_store.py)
+        self._content_store = content_store
+
         # Utiliser GROQ_API_KEY au lieu de OPENAI_API_KEY
         api_key = os.getenv("GROQ_API_KEY")
 
@@ -44,6 +144,10 @@ class HomeChains:
         self._analysis_model_name = os.getenv("GROQ_MODEL_ANALYSIS", "llama-3.1-8b-instant")
         self._generation_model_name = os.getenv("GROQ_MODEL_GENERATION", "llama-3.1-8b-instant")
 
+        # Un disjoncteur par modèle (les quotas Groq sont comptés par modèle)
+        self._analysis_breaker = get_circuit_breaker(f"groq:{self._analysis_model_name}")
+        self._generation_breaker = get_circuit_breaker(f"groq:{self._generation_model_name}")
+
         # Log pour diagnostic
         logger.info(f"🔑 Vérification GROQ_API_KEY: {'✅ Présente' if api_key else '❌ Absente'}")
         if api_key:
@@ -56,6 +160,7 @@ class HomeChains:
             )
             self._analysis_llm = None
             self._generation_llm = None
+            self._generation_base_llm = None
         else:
             # Initialisation avec Groq (compatible OpenAI avec base_url)
             try:
@@ -65,6 +170,8 @@ class HomeChains:
                     model=self._analysis_model_name,
                     temperature=0.2,
                     base_url=GROQ_BASE_URL,
+                    http_async_client=get_llm_http_client(),
+                    timeout=llm_http_timeout(),
                 )
                 # Appliquer with_structured_output après
                 self._analysis_llm = self._analysis_llm.with_structured_output(AnalysisResult)
@@ -81,12 +188,15 @@ class HomeChains:
                 # Essayer différentes méthodes d'initialisation selon les versions
                 try:
                     # Méthode 1: Initialisation directe avec with_structured_output
-                    self._generation_llm = ChatOpenAI(
+                    self._generation_base_llm = ChatOpenAI(
                         api_key=api_key,
                         model=self._generation_model_name,
                         temperature=0.7,  # Température plus élevée pour plus de créativité
                         base_url=GROQ_BASE_URL,
-                    ).with_structured_output(SpiritualContent)
+                        http_async_client=get_llm_http_client(),
+                        timeout=llm_http_timeout(),
+                    )
+                    self._generation_llm = self._generation_base_llm.with_structured_output(SpiritualContent)
                 except Exception as e1:
                     logger.warning(f"⚠️ Première méthode d'initialisation échouée: {e1}")
                     try:
@@ -96,8 +206,11 @@ class HomeChains:
                             model=self._generation_model_name,
                             temperature=0.7,
                             base_url=GROQ_BASE_URL,
+                            http_async_client=get_llm_http_client(),
+                            timeout=llm_http_timeout(),
                         )
                         self._generation_llm = base_llm.with_structured_output(SpiritualContent)
+                        self._generation_base_llm = base_llm
                     except Exception as e2:
                         logger.error(f"❌ Deuxième méthode d'initialisation échouée: {e2}")
                         raise e2
@@ -108,6 +221,7 @@ class HomeChains:
                 logger.exception("Détails de l'erreur:")
                 logger.warning("⚠️ Utilisation des heuristiques locales pour la génération")
                 self._generation_llm = None
+                self._generation_base_llm = None
 
         self._analysis_prompt = ChatPromptTemplate.from_messages(
             [
@@ -123,30 +237,34 @@ class HomeChains:
             ]
         )
 
+        spiritual_system = (
+            "Tu es un pasteur et conseiller spirituel chrétien expérimenté. "
+            "Ta mission est de créer un contenu spirituel profondément ancré dans le verset biblique fourni, "
+            "tout en étant personnellement adapté aux besoins émotionnels et spirituels de la personne.\n\n"
+            "Instructions importantes :\n"
+            "- L'explication doit être spécifique au verset, expliquer son contexte biblique, son sens profond et son application pratique\n"
+            "- La méditation doit inviter à une réflexion personnelle basée sur les mots et le message du verset\n"
+            "- La prière doit être inspirée directement par le verset et les besoins exprimés\n"
+            "- Utilise un ton bienveillant, biblique, encourageant et authentique\n"
+            "- Sois précis et évite les généralités - chaque verset a un message unique\n"
+            "- Réponds en {language}"
+        )
+        spiritual_context = (
+            "Verset biblique : {verse_text}\n"
+            "Référence biblique : {verse_reference}\n"
+            "Message de la personne : {user_message}\n"
+            "Émotions détectées : {emotions}\n"
+            "Thèmes détectés : {themes}\n"
+            "Mots-clés : {keywords}\n\n"
+        )
+
         self._spiritual_prompt = ChatPromptTemplate.from_messages(
             [
-                (
-                    "system",
-                    "Tu es un pasteur et conseiller spirituel chrétien expérimenté. "
-                    "Ta mission est de créer un contenu spirituel profondément ancré dans le verset biblique fourni, "
-                    "tout en étant personnellement adapté aux besoins émotionnels et spirituels de la personne.\n\n"
-                    "Instructions importantes :\n"
-                    "- L'explication doit être spécifique au verset, expliquer son contexte biblique, son sens profond et son application pratique\n"
-                    "- La méditation doit inviter à une réflexion personnelle basée sur les mots et le message du verset\n"
-                    "- La prière doit être inspirée directement par le verset et les besoins exprimés\n"
-                    "- Utilise un ton bienveillant, biblique, encourageant et authentique\n"
-                    "- Sois précis et évite les généralités - chaque verset a un message unique\n"
-                    "- Réponds en {language}",
-                ),
+                ("system", spiritual_system),
                 (
                     "user",
-                    "Verset biblique : {verse_text}\n"
-                    "Référence biblique : {verse_reference}\n"
-                    "Message de la personne : {user_message}\n"
-                    "Émotions détectées : {emotions}\n"
-                    "Thèmes détectés : {themes}\n"
-                    "Mots-clés : {keywords}\n\n"
-                    "Génère maintenant :\n"
+                    spiritual_context
+                    + "Génère maintenant :\n"
                     "1. Une EXPLICATION approfondie du verset (2-3 phrases) qui explique le contexte, le sens et l'application\n"
                     "2. Une MÉDITATION personnelle (2-3 phrases) qui invite à réfléchir sur ce verset dans sa situation actuelle\n"
                     "3. Une PRIÈRE suggérée (2-3 phrases) inspirée par le verset et adaptée aux besoins exprimés",
@@ -154,6 +272,28 @@ class HomeChains:
             ]
         )
 
+        # Variante en texte libre pour le streaming : les sections sont introduites par
+        # des marqueurs fixes, découpés au fil des tokens (voir _SectionSplitter)
+        self._spiritual_stream_prompt = ChatPromptTemplate.from_messages(
+            [
+                ("system", spiritual_system),
+                (
+                    "user",
+                    spiritual_context
+                    + "Génère maintenant, en commençant chaque partie par son marqueur seul sur une ligne "
+                    "(garde les marqueurs tels quels, sans autre titre ni mise en forme) :\n"
+                    "[EXPLICATION] une explication approfondie du verset (2-3 phrases) : contexte, sens et application\n"
+                    "[MÉDITATION] une méditation personnelle (2-3 phrases) sur ce verset dans sa situation actuelle\n"
+                    "[PRIÈRE] une prière suggérée (2-3 phrases) inspirée par le verset et adaptée aux besoins exprimés",
+                ),
+            ]
+        )
+
+    @property
+    def shares_content(self) -> bool:
+        """Contenu généré sans le message de la personne, réutilisable pour d'autres (stockage actif)."""
+        return self._content_store is not None and self._content_store.enabled
+
     async def run_analysis(self, text: str, language: str) -> AnalysisResult:
         """Analyse le texte utilisateur via LangChain ou heuristiques locales."""
 
@@ -163,12 +303,19 @@ class HomeChains:
         if self._analysis_llm is None:
             return self._heuristic_analysis(text)
 
+        if not self._analysis_breaker.allow():
+            logger.warning(f"⚡ Groq en pause ({self._analysis_breaker.last_failure}) : analyse heuristique")
+            return self._heuristic_analysis(text)
+
         chain = self._analysis_prompt | self._analysis_llm
         try:
-            return await chain.ainvoke({"text": text, "language": language})
+            result = await chain.ainvoke({"text": text, "language": language})
         except Exception as exc:  # pragma: no cover - fallback heuristique
+            self._analysis_breaker.record_failure(exc)
             logger.error("Erreur lors de l'analyse LangChain: %s", exc)
             return self._heuristic_analysis(text)
+        self._analysis_breaker.record_success()
+        return result
 
     async def generate_spiritual_content(
         self, verse_text: str, verse_reference: str, analysis: AnalysisResult, language: str, user_message: Optional[str] = None
@@ -185,71 +332,234 @@ class HomeChains:
         """
 
         if self._generation_llm is None:
-            logger.error("❌ Groq non disponible pour la génération du contenu spirituel")
-            # Vérifier si la clé API existe
-            api_key_check = os.getenv("GROQ_API_KEY")
-            if not api_key_check:
-                raise ValueError(
-                    "GROQ_API_KEY n'est pas défini dans les variables d'environnement. "
-                    "Veuillez créer un fichier .env dans le dossier backend avec: GROQ_API_KEY=votre_cle_api"
-                )
-            else:
-                raise ValueError(
-                    f"Groq n'a pas pu être initialisé malgré la présence de GROQ_API_KEY. "
-                    f"Vérifiez les logs pour plus de détails. Longueur de la clé: {len(api_key_check)}"
-                )
+            self._raise_generation_unavailable()
+
+        store_key = self._content_store_key(verse_text, verse_reference, analysis, language)
+        if store_key is not None:
+            stored = await self._content_store.get(store_key)
+            if stored is not None:
+                logger.info(f"♻️ Contenu spirituel réutilisé pour le verset {verse_reference}")
+                return stored
+
+        breaker = self._generation_breaker
+        if not breaker.allow():
+            # Disjoncteur ouvert : pas d'appel à Groq tant que le délai n'est pas écoulé
+            logger.warning(f"⚡ Groq en pause ({breaker.last_failure}) : contenu heuristique pour le verset {verse_reference}")
+            return self._fallback_content(verse_text, verse_reference, analysis, breaker.last_failure == "rate_limit")
 
         chain = self._spiritual_prompt | self._generation_llm
         try:
             logger.info(f"🤖 Génération du contenu spirituel avec Groq pour le verset {verse_reference}...")
             result = await chain.ainvoke(
-                {
-                    "verse_text": verse_text,
-                    "verse_reference": verse_reference,
-                    "user_message": user_message or analysis.summary or "Recherche de guidance spirituelle",
-                    "emotions": ", ".join(analysis.emotions) or "aucune",
-                    "themes": ", ".join(analysis.themes) or "aucun",
-                    "keywords": ", ".join(analysis.keywords) or "aucun",
-                    "language": language,
-                }
+                self._spiritual_inputs(
+                    verse_text, verse_reference, analysis, language, user_message, shared=store_key is not None
+                )
             )
             logger.info("✅ Contenu spirituel généré avec succès par Groq")
+            breaker.record_success()
+            self._remember_content(store_key, result, verse_reference, analysis, language)
             return result
         except RateLimitError as exc:
             # Gérer spécifiquement les erreurs de quota/rate limit
+            breaker.record_failure(exc)
             logger.error(f"❌ Quota Groq dépassé ou rate limit atteint: {exc}")
             logger.warning("⚠️ Utilisation du fallback heuristique pour générer le contenu spirituel")
-            # Utiliser le fallback heuristique avec un message informatif
-            fallback_content = self._heuristic_content(verse_text, verse_reference, analysis)
-            # Ajouter une note dans l'explication pour indiquer que c'est un fallback
-            fallback_content.explanation = (
-                f"[Note: Groq temporairement indisponible - quota dépassé] {fallback_content.explanation}"
-            )
-            return fallback_content
+            return self._fallback_content(verse_text, verse_reference, analysis, quota_exceeded=True)
         except Exception as exc:
             # Gérer les autres erreurs Groq
+            breaker.record_failure(exc)
             error_str = str(exc).lower()
             if "429" in error_str or "insufficient_quota" in error_str or "rate limit" in error_str:
                 logger.error(f"❌ Quota Groq dépassé ou rate limit atteint: {exc}")
                 logger.warning("⚠️ Utilisation du fallback heuristique pour générer le contenu spirituel")
-                fallback_content = self._heuristic_content(verse_text, verse_reference, analysis)
-                fallback_content.explanation = (
-                    f"[Note: Groq temporairement indisponible - quota dépassé] {fallback_content.explanation}"
-                )
-                return fallback_content
+                return self._fallback_content(verse_text, verse_reference, analysis, quota_exceeded=True)
             else:
                 logger.exception(f"❌ Erreur lors de la génération du contenu spirituel avec Groq: {exc}")
                 # Pour les autres erreurs, utiliser aussi le fallback plutôt que de faire échouer
                 logger.warning("⚠️ Utilisation du fallback heuristique en raison d'une erreur Groq")
-                fallback_content = self._heuristic_content(verse_text, verse_reference, analysis)
-                fallback_content.explanation = (
-                    f"[Note: Groq temporairement indisponible] {fallback_content.explanation}"
+                return self._fallback_content(verse_text, verse_reference, analysis, quota_exceeded=False)
+
+    async def stream_spiritual_content(
+        self,
+        verse_text: str,
+        verse_reference: str,
+        analysis: AnalysisResult,
+        language: str,
+        user_message: Optional[str] = None,
+        streamed: Optional[StreamedContent] = None,
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Génère le contenu spirituel au fil des tokens.
+
+        Produit des couples ``(section, texte)`` où section vaut ``explanation``,
+        ``meditation`` ou ``prayer`` ; la concaténation des textes d'une section donne
+        la section complète. En cas d'erreur Groq avant le premier token, le contenu
+        heuristique est produit à la place (comme ``generate_spiritual_content``).
+        ``streamed``, s'il est fourni, reçoit les sections et l'issue du flux.
+        """
+
+        if self._generation_base_llm is None:
+            self._raise_generation_unavailable()
+        if streamed is None:
+            streamed = StreamedContent()
+
+        store_key = self._content_store_key(verse_text, verse_reference, analysis, language)
+        if store_key is not None:
+            stored = await self._content_store.get(store_key)
+            if stored is not None:
+                logger.info(f"♻️ Contenu spirituel réutilisé pour le verset {verse_reference}")
+                for section in SPIRITUAL_SECTIONS:
+                    text = getattr(stored, section)
+                    if text:
+                        streamed.add(section, text)
+                        yield section, text
+                return
+
+        breaker = self._generation_breaker
+        if not breaker.allow():
+            logger.warning(f"⚡ Groq en pause ({breaker.last_failure}) : contenu heuristique pour le verset {verse_reference}")
+            fallback_content = self._fallback_content(
+                verse_text, verse_reference, analysis, breaker.last_failure == "rate_limit"
+            )
+            for section, text in self._fallback_sections(fallback_content, streamed):
+                yield section, text
+            return
+
+        chain = self._spiritual_stream_prompt | self._generation_base_llm
+        splitter = _SectionSplitter()
+        emitted = False
+        try:
+            logger.info(f"🤖 Génération en streaming du contenu spirituel pour le verset {verse_reference}...")
+            async for chunk in chain.astream(
+                self._spiritual_inputs(
+                    verse_text, verse_reference, analysis, language, user_message, shared=store_key is not None
                 )
-                return fallback_content
+            ):
+                for section, text in splitter.feed(chunk.content or ""):
+                    emitted = True
+                    streamed.add(section, text)
+                    yield section, text
+            for section, text in splitter.close():
+                emitted = True
+                streamed.add(section, text)
+                yield section, text
+            logger.info("✅ Contenu spirituel généré (streaming)")
+        except Exception as exc:
+            breaker.record_failure(exc)
+            if emitted:
+                # Le texte déjà envoyé ne peut pas être remplacé : l'appelant signale l'interruption
+                logger.error(f"❌ Génération interrompue en cours de streaming: {exc}")
+                streamed.interrupted = True
+                return
+            logger.warning(f"⚠️ Utilisation du fallback heuristique en raison d'une erreur Groq: {exc}")
+            fallback_content = self._fallback_content(verse_text, verse_reference, analysis, quota_exceeded=False)
+            for section, text in self._fallback_sections(fallback_content, streamed):
+                yield section, text
+            return
+        breaker.record_success()
+
+        # Seul un contenu complet (les trois sections) est conservé
+        if streamed.complete:
+            self._remember_content(store_key, streamed.content(), verse_reference, analysis, language)
+
+    @staticmethod
+    def _fallback_sections(content: SpiritualContent, streamed: StreamedContent) -> List[Tuple[str, str]]:
+        """Sections du contenu de repli, enregistrées dans ``streamed`` (marqué comme dégradé)."""
+        streamed.degraded = True
+        sections = [(section, getattr(content, section) or "") for section in SPIRITUAL_SECTIONS]
+        for section, text in sections:
+            streamed.add(section, text)
+        return sections
+
+    def _fallback_content(
+        self, verse_text: str, verse_reference: str, analysis: AnalysisResult, quota_exceeded: bool
+    ) -> SpiritualContent:
+        """Contenu heuristique, avec une note indiquant que Groq est indisponible (marqué comme dégradé)."""
+        fallback_content = self._heuristic_content(verse_text, verse_reference, analysis)
+        reason = " - quota dépassé" if quota_exceeded else ""
+        fallback_content.explanation = (
+            f"[Note: Groq temporairement indisponible{reason}] {fallback_content.explanation}"
+        )
+        return fallback_content.mark_degraded()
+
+    def _content_store_key(
+        self, verse_text: str, verse_reference: str, analysis: AnalysisResult, language: str
+    ) -> Optional[str]:
+        if not self.shares_content:
+            return None
+        return self._content_store.key(
+            verse_text, verse_reference, language, analysis.emotions, analysis.themes, self._generation_model_name
+        )
+
+    def _remember_content(
+        self,
+        store_key: Optional[str],
+        content: SpiritualContent,
+        verse_reference: str,
+        analysis: AnalysisResult,
+        language: str,
+    ) -> None:
+        # Les contenus de repli (heuristiques) ne passent jamais par ici : seul Groq alimente le stockage
+        if store_key is None:
+            return
+        self._content_store.remember(
+            store_key,
+            content,
+            verse_reference,
+            language,
+            analysis.emotions,
+            analysis.themes,
+            self._generation_model_name,
+        )
+
+    @staticmethod
+    def _spiritual_inputs(
+        verse_text: str,
+        verse_reference: str,
+        analysis: AnalysisResult,
+        language: str,
+        user_message: Optional[str],
+        shared: bool = False,
+    ) -> dict:
+        """
+        Variables du prompt de génération.
+
+        Avec ``shared``, le contenu sera stocké et servi à d'autres personnes (même
+        verset, émotions et thèmes, voir content_store) : le message, le résumé et les
+        mots-clés, qui peuvent contenir des détails personnels, ne sont pas transmis.
+        """
+        if shared:
+            situation, keywords = _GENERIC_SITUATION, []
+        else:
+            situation, keywords = user_message or analysis.summary or _GENERIC_SITUATION, analysis.keywords
+        return {
+            "verse_text": verse_text,
+            "verse_reference": verse_reference,
+            "user_message": situation,
+            "emotions": ", ".join(analysis.emotions) or "aucune",
+            "themes": ", ".join(analysis.themes) or "aucun",
+            "keywords": ", ".join(keywords) or "aucun",
+            "language": language,
+        }
+
+    @staticmethod
+    def _raise_generation_unavailable() -> None:
+        logger.error("❌ Groq non disponible pour la génération du contenu spirituel")
+        # Vérifier si la clé API existe
+        api_key_check = os.getenv("GROQ_API_KEY")
+        if not api_key_check:
+            raise ValueError(
+                "GROQ_API_KEY n'est pas défini dans les variables d'environnement. "
+                "Veuillez créer un fichier .env dans le dossier backend avec: GROQ_API_KEY=votre_cle_api"
+            )
+        raise ValueError(
+            f"Groq n'a pas pu être initialisé malgré la présence de GROQ_API_KEY. "
+            f"Vérifiez les logs pour plus de détails. Longueur de la clé: {len(api_key_check)}"
+        )
 
     @staticmethod
     def _heuristic_analysis(text: str) -> AnalysisResult:
-        """Analyse simple basée sur des mots-clés si LangChain indisponible."""
+        """Analyse simple basée sur des mots-clés si LangChain indisponible (marquée comme dégradée)."""
 
         lowered = text.lower()
 
@@ -292,7 +602,7 @@ class HomeChains:
             themes=list(dict.fromkeys(themes)),
             keywords=list(dict.fromkeys(keywords)),
             summary=summary,
-        )
+        ).mark_degraded()
 
     @staticmethod
     def _heuristic_content(verse_text: str, verse_reference: str, analysis: Optional[AnalysisResult] = None) -> SpiritualContent:
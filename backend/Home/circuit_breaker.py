@@ -0,0 +1,195 @@
+"""Disjoncteur des appels Groq : après un quota dépassé ou des délais répétés, repli immédiat sur les heuristiques."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import httpx
+from openai import APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def _failure_kind(exc: BaseException) -> Optional[str]:
+    """Type d'échec qui compte pour le disjoncteur (None : erreur propre à la requête)."""
+    if isinstance(exc, RateLimitError) or (isinstance(exc, APIStatusError) and exc.status_code == 429):
+        return "rate_limit"
+    if isinstance(exc, (APITimeoutError, asyncio.TimeoutError, httpx.TimeoutException)):
+        return "timeout"
+    if isinstance(exc, APIConnectionError):
+        return "connection"
+    if isinstance(exc, APIStatusError) and exc.status_code >= 500:
+        return "server_error"
+    message = str(exc).lower()
+    if "429" in message or "insufficient_quota" in message or "rate limit" in message:
+        return "rate_limit"
+    return None
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Délai demandé par l'en-tête ``retry-after-ms`` ou ``Retry-After`` (secondes ou date HTTP)."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur à trois états autour d'un service LLM.
+
+    - fermé : les appels passent ; un quota dépassé (429) l'ouvre immédiatement,
+      ``failure_threshold`` délais ou erreurs serveur consécutifs aussi ;
+    - ouvert : les appels sont refusés (``allow`` renvoie False) pendant le délai
+      ``Retry-After`` s'il est fourni, sinon ``cooldown`` secondes (doublé à chaque
+      réouverture, plafonné à ``max_cooldown``) ;
+    - semi-ouvert : une seule requête de test passe ; son succès referme le
+      disjoncteur, son échec le rouvre. Une requête de test sans issue (annulée)
+      est remplacée après ``cooldown`` secondes.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        max_cooldown: float = 300.0,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._reopenings = 0
+        self._open_until = 0.0
+        self._probe_started: Optional[float] = None
+        self._last_failure: Optional[str] = None
+        self._opened = 0
+        self._short_circuited = 0
+        self._failures: Dict[str, int] = {}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() >= self._open_until:
+                return HALF_OPEN
+            return self._state
+
+    @property
+    def last_failure(self) -> Optional[str]:
+        return self._last_failure
+
+    def allow(self) -> bool:
+        """Indique si un appel peut être tenté (en semi-ouvert, un seul à la fois)."""
+        with self._lock:
+            now = time.monotonic()
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and now >= self._open_until:
+                self._state = HALF_OPEN
+                self._probe_started = None
+            if self._state == HALF_OPEN:
+                if self._probe_started is None or now - self._probe_started >= self.cooldown:
+                    self._probe_started = now
+                    logger.info(f"🔌 Disjoncteur {self.name}: requête de test")
+                    return True
+            self._short_circuited += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info(f"✅ Disjoncteur {self.name} refermé")
+            self._state = CLOSED
+            self._consecutive_failures = 0
+            self._reopenings = 0
+            self._probe_started = None
+
+    def record_failure(self, exc: BaseException) -> None:
+        """Enregistre l'échec d'un appel ; les erreurs propres à la requête sont ignorées."""
+        kind = _failure_kind(exc)
+        with self._lock:
+            if kind is None:
+                # L'appel a abouti côté service : la requête de test peut être rejouée
+                self._probe_started = None
+                return
+            self._failures[kind] = self._failures.get(kind, 0) + 1
+            self._last_failure = kind
+            self._consecutive_failures += 1
+            if self._state == HALF_OPEN or kind == "rate_limit" or self._consecutive_failures >= self.failure_threshold:
+                self._open(kind, retry_after_seconds(exc))
+
+    def _open(self, kind: str, retry_after: Optional[float]) -> None:
+        if retry_after is not None:
+            delay = min(retry_after, self.max_cooldown)
+        else:
+            delay = min(self.cooldown * (2 ** self._reopenings), self.max_cooldown)
+        self._reopenings += 1
+        self._state = OPEN
+        self._open_until = time.monotonic() + delay
+        self._probe_started = None
+        self._opened += 1
+        logger.warning(f"⚡ Disjoncteur {self.name} ouvert pour {delay:.1f}s ({kind})")
+
+    def stats(self) -> dict:
+        state = self.state
+        with self._lock:
+            return {
+                "state": state,
+                "retry_in": round(max(self._open_until - time.monotonic(), 0.0), 1) if state == OPEN else 0.0,
+                "consecutive_failures": self._consecutive_failures,
+                "last_failure": self._last_failure,
+                "failures": dict(self._failures),
+                "opened": self._opened,
+                "short_circuited": self._short_circuited,
+            }
+
+
+# Disjoncteurs partagés, un par service (ex: "groq:llama-3.1-8b-instant")
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Retourne le disjoncteur du service ``name`` (CIRCUIT_BREAKER_* pour les seuils)."""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(
+                name,
+                failure_threshold=int(os.getenv("CIRCUIT_BREAKER_FAILURE_THRESHOLD", "3")),
+                cooldown=float(os.getenv("CIRCUIT_BREAKER_COOLDOWN_SECONDS", "30")),
+                max_cooldown=float(os.getenv("CIRCUIT_BREAKER_MAX_COOLDOWN_SECONDS", "300")),
+            )
+        return breaker
+
+
+def circuit_breaker_stats() -> Dict[str, dict]:
+    """État des disjoncteurs, pour ``/metrics``."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
@@ -0,0 +1,237 @@
+"""Stockage MongoDB du contenu spirituel généré, par verset et contexte (émotions, thèmes, langue)."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Set
+
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+
+from database import get_database
+
+from .embedding_cache import normalize_query_text
+from .schemas import SpiritualContent
+
+logger = logging.getLogger(__name__)
+
+# Délai maximal (secondes) d'une lecture ou écriture : au-delà, le LLM est appelé comme sans stockage
+STORE_TIMEOUT_SECONDS = 2.0
+
+
+def normalize_labels(labels: Iterable[str]) -> List[str]:
+    """Émotions ou thèmes normalisés (minuscules, espaces compactés), dédoublonnés et triés."""
+    return sorted({normalize_query_text(label) for label in labels if label and label.strip()})
+
+
+class SpiritualContentStore:
+    """
+    Contenu spirituel (explication, méditation, prière) déjà généré pour un verset.
+
+    La clé combine le verset (référence et texte, donc la traduction), la langue,
+    les émotions et thèmes normalisés de l'analyse et le modèle de génération.
+    Chaque clé conserve jusqu'à ``variants`` contenus différents : tant qu'il en
+    manque, le LLM est appelé et sa réponse ajoutée ; ensuite les variantes sont
+    servies à tour de rôle. Le document expire ``ttl_seconds`` après sa création
+    (index TTL MongoDB), ce qui renouvelle les variantes.
+    """
+
+    def __init__(
+        self,
+        db: Optional[AsyncIOMotorDatabase] = None,
+        variants: int = 3,
+        ttl_seconds: float = 7 * 24 * 3600,
+        timeout: float = STORE_TIMEOUT_SECONDS,
+    ) -> None:
+        self._db = db if db is not None else get_database()
+        self.variants = variants
+        self.ttl_seconds = ttl_seconds
+        self.timeout = timeout
+        self._indexes_ready = False
+        self._pending: Set[asyncio.Task] = set()
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.variants > 0
+
+    @property
+    def contents(self) -> AsyncIOMotorCollection:
+        """Collection des contenus générés."""
+        return self._db["contenus_spirituels"]
+
+    @staticmethod
+    def key(
+        verse_text: str,
+        verse_reference: str,
+        language: str,
+        emotions: Iterable[str],
+        themes: Iterable[str],
+        model_name: str,
+    ) -> str:
+        raw = "\x00".join(
+            [
+                verse_reference.strip(),
+                normalize_query_text(verse_text),
+                language.lower(),
+                "|".join(normalize_labels(emotions)),
+                "|".join(normalize_labels(themes)),
+                model_name,
+            ]
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[SpiritualContent]:
+        """
+        Variante suivante du contenu stocké pour ``key``, ou None s'il manque encore
+        des variantes (le contenu doit alors être généré) ou si le stockage ne répond pas.
+        """
+        if not self.enabled:
+            return None
+        try:
+            doc = await asyncio.wait_for(
+                self.contents.find_one_and_update(
+                    {
+                        "_id": key,
+                        f"variants.{self.variants - 1}": {"$exists": True},
+                        "expires_at": {"$gt": datetime.utcnow()},
+                    },
+                    {"$inc": {"served": 1}},
+                    projection={"variants": 1, "served": 1},
+                    return_document=ReturnDocument.AFTER,
+                ),
+                timeout=self.timeout,
+            )
+        except Exception as e:
+            self._errors += 1
+            logger.warning(f"⚠️ Stockage du contenu spirituel indisponible: {e}")
+            return None
+
+        if doc is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        variants = doc["variants"]
+        variant = variants[(doc["served"] - 1) % len(variants)]
+        return SpiritualContent(
+            explanation=variant["explanation"],
+            meditation=variant.get("meditation"),
+            prayer=variant.get("prayer"),
+        )
+
+    def remember(
+        self,
+        key: str,
+        content: SpiritualContent,
+        reference: str,
+        language: str,
+        emotions: Iterable[str],
+        themes: Iterable[str],
+        model_name: str,
+    ) -> None:
+        """Ajoute le contenu aux variantes de ``key`` en arrière-plan (la réponse n'attend pas l'écriture)."""
+        if not self.enabled:
+            return
+        task = asyncio.create_task(
+            self.put(key, content, reference, language, list(emotions), list(themes), model_name)
+        )
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def put(
+        self,
+        key: str,
+        content: SpiritualContent,
+        reference: str,
+        language: str,
+        emotions: List[str],
+        themes: List[str],
+        model_name: str,
+    ) -> None:
+        now = datetime.utcnow()
+        try:
+            await asyncio.wait_for(self._ensure_indexes(), timeout=self.timeout)
+            await asyncio.wait_for(
+                self.contents.update_one(
+                    {"_id": key},
+                    {
+                        # Les variantes les plus récentes sont conservées
+                        "$push": {
+                            "variants": {
+                                "$each": [
+                                    {
+                                        "explanation": content.explanation,
+                                        "meditation": content.meditation,
+                                        "prayer": content.prayer,
+                                        "created_at": now,
+                                    }
+                                ],
+                                "$slice": -self.variants,
+                            }
+                        },
+                        "$set": {"updated_at": now},
+                        "$setOnInsert": {
+                            "reference": reference,
+                            "language": language,
+                            "emotions": normalize_labels(emotions),
+                            "themes": normalize_labels(themes),
+                            "model": model_name,
+                            "served": 0,
+                            "created_at": now,
+                            "expires_at": now + timedelta(seconds=self.ttl_seconds),
+                        },
+                    },
+                    upsert=True,
+                ),
+                timeout=self.timeout,
+            )
+            self._writes += 1
+        except Exception as e:
+            self._errors += 1
+            logger.warning(f"⚠️ Contenu spirituel non enregistré ({reference}): {e}")
+
+    async def _ensure_indexes(self) -> None:
+        if self._indexes_ready:
+            return
+        # Suppression automatique des documents expirés par MongoDB
+        await self.contents.create_index("expires_at", expireAfterSeconds=0)
+        self._indexes_ready = True
+
+    def stats(self) -> dict:
+        lookups = self._hits + self._misses
+        return {
+            "enabled": self.enabled,
+            "variants": self.variants,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self._hits,
+            "misses": self._misses,
+            "writes": self._writes,
+            "errors": self._errors,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Instance globale (singleton)
+_content_store: Optional[SpiritualContentStore] = None
+
+
+def get_content_store() -> SpiritualContentStore:
+    """
+    Retourne le stockage du contenu spirituel, désactivé par défaut : un contenu stocké
+    est généré sans le message de la personne (voir HomeChains._spiritual_inputs).
+    SPIRITUAL_CONTENT_VARIANTS > 0 pour l'activer.
+    """
+    global _content_store
+    if _content_store is None:
+        _content_store = SpiritualContentStore(
+            variants=int(os.getenv("SPIRITUAL_CONTENT_VARIANTS", "0")),
+            ttl_seconds=float(os.getenv("SPIRITUAL_CONTENT_TTL_SECONDS", str(7 * 24 * 3600))),
+        )
+    return _content_store
@@ -0,0 +1,124 @@
+"""Regroupement (micro-batching) asynchrone des encodages de requêtes concurrentes."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from .embeddings import EmbeddingService, get_embedding_service
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """
+    Front-end asynchrone d'``EmbeddingService.encode``.
+
+    Les textes reçus pendant ``max_wait_ms`` (ou jusqu'à ``max_batch_size`` textes)
+    sont encodés ensemble en un seul appel au modèle, exécuté dans un thread pour ne
+    pas bloquer la boucle d'événements. Chaque appelant récupère son propre vecteur.
+    """
+
+    def __init__(
+        self,
+        service: EmbeddingService,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+    ) -> None:
+        self._service = service
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._batches = 0
+        self._items = 0
+        self._cache_hits = 0
+        self._largest_batch = 0
+
+    async def encode(self, text: str, normalize: bool = True) -> np.ndarray:
+        """Retourne l'embedding (dim,) d'un texte, encodé avec les requêtes concurrentes."""
+        cached = self._service.get_cached(text, normalize)
+        if cached is not None:
+            self._cache_hits += 1
+            return cached
+
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run(self._queue))
+
+        future: asyncio.Future = loop.create_future()
+        await self._queue.put((text, normalize, future))
+        return await future
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        while True:
+            batch = [await queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Les appelants déjà annulés ne sont pas encodés
+            batch = [item for item in batch if not item[2].done()]
+            for normalize in (True, False):
+                items = [item for item in batch if bool(item[1]) == normalize]
+                if items:
+                    await self._encode_batch(items, normalize)
+
+    async def _encode_batch(self, items: List[tuple], normalize: bool) -> None:
+        texts = [text for text, _, _ in items]
+        try:
+            vectors = await asyncio.to_thread(self._service.encode, texts, normalize)
+        except Exception as e:
+            for _, _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self._batches += 1
+        self._items += len(items)
+        self._largest_batch = max(self._largest_batch, len(items))
+        for (_, _, future), vector in zip(items, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+    def stats(self) -> dict:
+        """Compteurs de regroupement (nombre de batches, taille moyenne)."""
+        return {
+            "batches": self._batches,
+            "items": self._items,
+            "cache_hits": self._cache_hits,
+            "average_batch_size": self._items / self._batches if self._batches else 0.0,
+            "largest_batch": self._largest_batch,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+        }
+
+
+# Instances globales, partagées par toutes les requêtes du worker (une par modèle)
+_embedding_batchers: dict[str, EmbeddingBatcher] = {}
+
+
+def get_embedding_batcher(model_name: Optional[str] = None) -> EmbeddingBatcher:
+    """Retourne le regroupeur d'encodages du modèle (défaut: EMBEDDING_MODEL), créé au premier appel."""
+    service = get_embedding_service(model_name)
+    batcher = _embedding_batchers.get(service.model_name)
+    if batcher is None:
+        batcher = EmbeddingBatcher(
+            service,
+            max_batch_size=int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32")),
+            max_wait_ms=float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "5")),
+        )
+        _embedding_batchers[service.model_name] = batcher
+    return batcher
@@ -0,0 +1,139 @@
+"""Cache à deux niveaux (mémoire LRU + disque SQLite) des embeddings de requêtes."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query_text(text: str) -> str:
+    """Normalise un texte pour la clé de cache (Unicode NFC, minuscules, espaces compactés)."""
+    text = unicodedata.normalize("NFC", text)
+    return _WHITESPACE_RE.sub(" ", text).strip().lower()
+
+
+class EmbeddingCache:
+    """
+    Cache des embeddings indexé par (modèle, normalisation, texte normalisé).
+
+    Le premier niveau est un LRU borné en mémoire ; le second, optionnel, est un
+    fichier SQLite qui survit aux redémarrages. Le nom du modèle fait partie de la
+    clé : changer de modèle ne renvoie jamais de vecteurs périmés.
+    """
+
+    def __init__(self, model_name: str, max_size: int = 10000, cache_dir: Optional[str] = None) -> None:
+        self.model_name = model_name
+        self.max_size = max_size
+        self._memory: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        if cache_dir:
+            try:
+                path = Path(cache_dir)
+                path.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(str(path / "embeddings.sqlite3"), check_same_thread=False)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings ("
+                    "key TEXT PRIMARY KEY, model TEXT NOT NULL, dtype TEXT NOT NULL, vector BLOB NOT NULL)"
+                )
+                self._db.commit()
+                logger.info(f"💾 Cache disque des embeddings: {path / 'embeddings.sqlite3'}")
+            except Exception as e:
+                logger.warning(f"⚠️ Cache disque des embeddings indisponible ({cache_dir}): {e}")
+                self._db = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 or self._db is not None
+
+    def _key(self, text: str, normalize: bool) -> str:
+        raw = f"{self.model_name}\x00{int(normalize)}\x00{normalize_query_text(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, text: str, normalize: bool = True, record_miss: bool = True) -> Optional[np.ndarray]:
+        """
+        Retourne l'embedding en cache pour ce texte, ou None.
+
+        ``record_miss=False`` évite de compter deux fois un miss lorsque l'appelant
+        retombe ensuite sur ``EmbeddingService.encode`` (qui consulte à nouveau le cache).
+        """
+        key = self._key(text, normalize)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self._memory_hits += 1
+                return vector
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT dtype, vector FROM embeddings WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    vector = np.frombuffer(row[1], dtype=np.dtype(row[0]))
+                    self._remember(key, vector)
+                    self._disk_hits += 1
+                    return vector
+
+            if record_miss:
+                self._misses += 1
+            return None
+
+    def put(self, text: str, vector: np.ndarray, normalize: bool = True) -> None:
+        """Enregistre l'embedding d'un texte dans les deux niveaux du cache."""
+        key = self._key(text, normalize)
+        vector = np.array(vector, copy=True)
+        vector.setflags(write=False)
+        with self._lock:
+            self._remember(key, vector)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO embeddings (key, model, dtype, vector) VALUES (?, ?, ?, ?)",
+                        (key, self.model_name, vector.dtype.str, vector.tobytes()),
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"⚠️ Écriture impossible dans le cache disque des embeddings: {e}")
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        if self.max_size <= 0:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Compteurs de hits/misses et taille du cache."""
+        with self._lock:
+            hits = self._memory_hits + self._disk_hits
+            total = hits + self._misses
+            return {
+                "model": self.model_name,
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": hits / total if total else 0.0,
+                "size": len(self._memory),
+                "max_size": self.max_size,
+                "disk_enabled": self._db is not None,
+            }
@@ -0,0 +1,143 @@
+"""Encodage compact des embeddings stockés dans la collection ``versets``."""
+
+from __future__ import annotations
+
+import hashlib
+import unicodedata
+from typing import Iterable, List, Optional
+
+import numpy as np
+from bson import Binary
+
+# Formats de stockage du champ ``embedding`` :
+# - "array"   : tableau BSON de doubles (format historique, ~3,5 Ko pour 384 dimensions)
+# - "float16" : BinData de float16 little-endian (768 octets pour 384 dimensions)
+# - "int8"    : BinData d'int8 + facteur d'échelle par vecteur (384 octets + 1 double)
+EMBEDDING_FORMATS = ("array", "float16", "int8")
+
+# Champ historique des embeddings. Une nouvelle version de modèle peut être stockée à côté
+# (ex: "embedding_v2") ; ses champs annexes suivent le même préfixe :
+# <champ>_format, <champ>_scale, <champ>_model (modèle) et <champ>_hash (hash du contenu).
+DEFAULT_EMBEDDING_FIELD = "embedding"
+
+_FLOAT16 = np.dtype("<f2")
+
+
+def content_hash(text: str) -> str:
+    """Empreinte du contenu d'un verset, stockée avec son embedding pour détecter les textes modifiés."""
+    normalized = unicodedata.normalize("NFC", text or "").strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def embedding_update(
+    vector: np.ndarray,
+    storage_format: str = "array",
+    field: str = DEFAULT_EMBEDDING_FIELD,
+    model_name: Optional[str] = None,
+    text_hash: Optional[str] = None,
+) -> dict:
+    """
+    Construit l'opération de mise à jour MongoDB qui stocke ``vector`` au format demandé.
+
+    Args:
+        vector: Embedding (dim,) à stocker
+        storage_format: Un des EMBEDDING_FORMATS
+        field: Champ de l'embedding (``embedding`` ou champ d'une autre version de modèle)
+        model_name: Modèle ayant produit l'embedding, stocké dans ``<champ>_model``
+        text_hash: Empreinte du contenu encodé (``content_hash``), stockée dans ``<champ>_hash``
+
+    Returns:
+        Document de mise à jour (``$set`` / ``$unset``) pour ``update_one``
+    """
+    vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+    format_field = f"{field}_format"
+    scale_field = f"{field}_scale"
+
+    if storage_format == "array":
+        update = {
+            "$set": {field: vector.tolist()},
+            "$unset": {format_field: "", scale_field: ""},
+        }
+    elif storage_format == "float16":
+        update = {
+            "$set": {
+                field: Binary(vector.astype(_FLOAT16).tobytes()),
+                format_field: "float16",
+            },
+            "$unset": {scale_field: ""},
+        }
+    elif storage_format == "int8":
+        max_abs = float(np.max(np.abs(vector))) if vector.size else 0.0
+        scale = max_abs / 127.0 if max_abs > 0 else 1.0
+        quantized = np.clip(np.rint(vector / scale), -127, 127).astype(np.int8)
+        update = {
+            "$set": {
+                field: Binary(quantized.tobytes()),
+                format_field: "int8",
+                scale_field: scale,
+            },
+        }
+    else:
+        raise ValueError(f"Format de stockage d'embedding inconnu: {storage_format} (attendu: {EMBEDDING_FORMATS})")
+
+    if model_name:
+        update["$set"][f"{field}_model"] = model_name
+    if text_hash:
+        update["$set"][f"{field}_hash"] = text_hash
+    return update
+
+
+def embedding_projection(field: str = DEFAULT_EMBEDDING_FIELD) -> dict:
+    """Projection MongoDB des champs nécessaires au décodage d'un embedding."""
+    return {field: 1, f"{field}_format": 1, f"{field}_scale": 1}
+
+
+def decode_embedding(document: dict, field: str = DEFAULT_EMBEDDING_FIELD) -> np.ndarray:
+    """Décode l'embedding d'un document ``versets``, quel que soit son format."""
+    return decode_embeddings([document], field)[0]
+
+
+def decode_embeddings(documents: Iterable[dict], field: str = DEFAULT_EMBEDDING_FIELD) -> np.ndarray:
+    """
+    Décode les embeddings d'une liste de documents en une matrice float32 (n, dim).
+
+    Les embeddings binaires sont concaténés puis décodés en un seul ``np.frombuffer``
+    par format, sans jamais passer par des floats Python. Les documents de formats
+    différents peuvent être mélangés (migration en cours).
+    """
+    documents = list(documents)
+    format_field = f"{field}_format"
+    scale_field = f"{field}_scale"
+    rows_by_format: dict[str, List[int]] = {"array": [], "float16": [], "int8": []}
+    for row, document in enumerate(documents):
+        rows_by_format[document.get(format_field) or "array"].append(row)
+
+    blocks: List[tuple[List[int], np.ndarray]] = []
+
+    rows = rows_by_format["array"]
+    if rows:
+        blocks.append((rows, np.asarray([documents[r][field] for r in rows], dtype=np.float32)))
+
+    rows = rows_by_format["float16"]
+    if rows:
+        buffer = b"".join(bytes(documents[r][field]) for r in rows)
+        block = np.frombuffer(buffer, dtype=_FLOAT16).reshape(len(rows), -1).astype(np.float32)
+        blocks.append((rows, block))
+
+    rows = rows_by_format["int8"]
+    if rows:
+        buffer = b"".join(bytes(documents[r][field]) for r in rows)
+        scales = np.asarray([documents[r].get(scale_field, 1.0) for r in rows], dtype=np.float32)
+        block = np.frombuffer(buffer, dtype=np.int8).reshape(len(rows), -1).astype(np.float32)
+        blocks.append((rows, block * scales[:, None]))
+
+    if not blocks:
+        return np.empty((0, 0), dtype=np.float32)
+    if len(blocks) == 1:
+        return np.ascontiguousarray(blocks[0][1])
+
+    dimension = blocks[0][1].shape[1]
+    matrix = np.empty((len(documents), dimension), dtype=np.float32)
+    for rows, block in blocks:
+        matrix[rows] = block
+    return matrix
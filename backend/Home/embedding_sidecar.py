@@ -0,0 +1,238 @@
+"""
+Processus annexe (sidecar) d'encodage partagé via un socket Unix.
+
+Le sidecar charge le modèle une seule fois et sert les demandes d'encodage de tous
+les workers de l'API (et des scripts) de la machine. Côté client,
+``get_embedding_service()`` renvoie un ``SidecarEmbeddingService`` dès que
+``EMBEDDING_SIDECAR_SOCKET`` pointe vers un socket existant.
+
+Lancement (depuis le dossier backend) :
+
+    python -m Home.embedding_sidecar --socket /run/pdm/embeddings.sock
+
+Protocole : chaque message est un entier de 4 octets (big-endian) donnant la taille
+d'un en-tête JSON, suivi de cet en-tête. Les réponses d'encodage sont suivies de la
+matrice float32 brute (``nbytes`` octets).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+from .embedding_batcher import EmbeddingBatcher
+from .embeddings import EmbeddingService
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">I")
+
+
+def _pack(message: dict) -> bytes:
+    payload = json.dumps(message).encode("utf-8")
+    return _HEADER.pack(len(payload)) + payload
+
+
+class SidecarMismatchError(Exception):
+    """Le sidecar sert un autre modèle ou backend que celui attendu par le client."""
+
+
+class SidecarEmbeddingService(EmbeddingService):
+    """
+    Client du sidecar : mêmes méthodes qu'``EmbeddingService``, mais l'inférence est
+    déléguée au processus annexe. Si le socket devient indisponible ou si le sidecar
+    répond par une erreur, l'encodage repasse en local (le modèle est alors chargé
+    dans ce processus).
+
+    À chaque connexion, le modèle et le backend du sidecar (opération ``info``) sont
+    comparés à ceux du client : en cas de différence, le sidecar n'est plus utilisé
+    par ce processus, ses vecteurs n'étant pas comparables à ceux de l'index.
+    """
+
+    def __init__(self, socket_path: str, model_name: Optional[str] = None, timeout: float = 30.0) -> None:
+        super().__init__(model_name)
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._dimension: Optional[int] = None
+        self._mismatch: Optional[str] = None
+        logger.info(f"🔌 Encodage délégué au sidecar: {socket_path}")
+
+    def _connection(self) -> socket.socket:
+        if self._mismatch is not None:
+            raise SidecarMismatchError(self._mismatch)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            conn.settimeout(self.timeout)
+            conn.connect(self.socket_path)
+            self._local.conn = conn
+            try:
+                self._check_sidecar(conn)
+            except Exception:
+                self._close_connection()
+                raise
+        return conn
+
+    def _check_sidecar(self, conn: socket.socket) -> None:
+        """Vérifie que le sidecar encode avec le même modèle et le même backend que ce client."""
+        header, _ = self._exchange(conn, {"op": "info"})
+        expected = (self.model_name, self.backend_label)
+        served = (header.get("model"), header.get("backend"))
+        if served != expected:
+            self._mismatch = (
+                f"le sidecar sert {served[0]} ({served[1]}), ce processus attend {expected[0]} ({expected[1]})"
+            )
+            logger.error(f"❌ Sidecar d'embeddings ignoré : {self._mismatch}. Encodage local jusqu'au redémarrage.")
+            raise SidecarMismatchError(self._mismatch)
+        self._dimension = int(header["dimension"])
+
+    def _close_connection(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            try:
+                conn.close()
+            finally:
+                self._local.conn = None
+
+    @staticmethod
+    def _recv_exactly(conn: socket.socket, size: int) -> bytes:
+        chunks = bytearray()
+        while len(chunks) < size:
+            chunk = conn.recv(size - len(chunks))
+            if not chunk:
+                raise ConnectionError("Connexion au sidecar fermée")
+            chunks.extend(chunk)
+        return bytes(chunks)
+
+    def _exchange(self, conn: socket.socket, message: dict) -> tuple[dict, bytes]:
+        try:
+            conn.sendall(_pack(message))
+            (size,) = _HEADER.unpack(self._recv_exactly(conn, _HEADER.size))
+            header = json.loads(self._recv_exactly(conn, size))
+            payload = self._recv_exactly(conn, header.get("nbytes", 0))
+        except Exception:
+            self._close_connection()
+            raise
+        if not header.get("ok"):
+            raise RuntimeError(header.get("error", "Erreur inconnue du sidecar"))
+        return header, payload
+
+    def _request(self, message: dict) -> tuple[dict, bytes]:
+        return self._exchange(self._connection(), message)
+
+    def _encode_uncached(self, texts: List[str], normalize: bool) -> np.ndarray:
+        try:
+            header, payload = self._request({"op": "encode", "texts": texts, "normalize": normalize})
+        except SidecarMismatchError:
+            return super()._encode_uncached(texts, normalize)
+        except (OSError, ConnectionError, RuntimeError) as e:
+            logger.warning(f"⚠️ Sidecar d'embeddings indisponible ({e}), encodage local")
+            return super()._encode_uncached(texts, normalize)
+        return np.frombuffer(payload, dtype=np.float32).reshape(header["shape"])
+
+    def get_embedding_dimension(self) -> int:
+        if self._dimension is None:
+            try:
+                # La connexion vérifie le sidecar et lit sa dimension
+                self._connection()
+            except SidecarMismatchError:
+                return super().get_embedding_dimension()
+            except (OSError, ConnectionError, RuntimeError) as e:
+                logger.warning(f"⚠️ Sidecar d'embeddings indisponible ({e}), dimension lue localement")
+                return super().get_embedding_dimension()
+        return self._dimension
+
+
+class EmbeddingSidecar:
+    """Serveur asynchrone du sidecar : un modèle, un regroupeur d'encodages, N clients."""
+
+    def __init__(self, socket_path: str, service: Optional[EmbeddingService] = None) -> None:
+        self.socket_path = socket_path
+        self._service = service or EmbeddingService()
+        self._batcher = EmbeddingBatcher(
+            self._service,
+            max_batch_size=int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32")),
+            max_wait_ms=float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "5")),
+        )
+
+    async def serve_forever(self) -> None:
+        # Charger le modèle avant d'accepter des connexions
+        dimension = self._service.get_embedding_dimension()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        os.chmod(self.socket_path, 0o660)
+        logger.info(f"✅ Sidecar d'embeddings prêt sur {self.socket_path} ({self._service.model_name}, dim={dimension})")
+        async with server:
+            await server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    (size,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+                    message = json.loads(await reader.readexactly(size))
+                except asyncio.IncompleteReadError:
+                    break
+                writer.write(await self._respond(message))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def _respond(self, message: dict) -> bytes:
+        try:
+            op = message.get("op")
+            if op == "info":
+                return _pack({
+                    "ok": True,
+                    "model": self._service.model_name,
+                    "backend": self._service.backend_label,
+                    "dimension": self._service.get_embedding_dimension(),
+                    "nbytes": 0,
+                })
+            if op == "encode":
+                normalize = bool(message.get("normalize", True))
+                vectors = await asyncio.gather(
+                    *(self._batcher.encode(text, normalize) for text in message.get("texts", []))
+                )
+                matrix = np.ascontiguousarray(np.stack(vectors), dtype=np.float32)
+                return _pack({"ok": True, "shape": list(matrix.shape), "nbytes": matrix.nbytes}) + matrix.tobytes()
+            return _pack({"ok": False, "error": f"Opération inconnue: {op}", "nbytes": 0})
+        except Exception as e:
+            logger.exception("❌ Erreur du sidecar d'embeddings")
+            return _pack({"ok": False, "error": str(e), "nbytes": 0})
+
+
+def main() -> None:
+    """Point d'entrée du sidecar."""
+    import argparse
+
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+    parser = argparse.ArgumentParser(description="Sidecar d'encodage partagé (socket Unix)")
+    parser.add_argument(
+        "--socket",
+        type=str,
+        default=os.getenv("EMBEDDING_SIDECAR_SOCKET"),
+        help="Chemin du socket Unix (défaut: EMBEDDING_SIDECAR_SOCKET)",
+    )
+    args = parser.parse_args()
+    if not args.socket:
+        parser.error("--socket est requis si EMBEDDING_SIDECAR_SOCKET n'est pas défini")
+
+    try:
+        asyncio.run(EmbeddingSidecar(args.socket).serve_forever())
+    except KeyboardInterrupt:
+        logger.info("\n⚠️ Arrêt du sidecar")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Version active des embeddings des versets (champ MongoDB + modèle), partagée par tous les workers."""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+
+from .embedding_codec import DEFAULT_EMBEDDING_FIELD
+
+logger = logging.getLogger(__name__)
+
+# Modèle multilingue recommandé pour le français
+# paraphrase-multilingual-MiniLM-L12-v2 : bon équilibre qualité/vitesse, multilingue
+# all-MiniLM-L6-v2 : plus rapide mais moins bon pour le français
+# (défini ici et non dans embeddings.py pour ne pas charger sentence-transformers/torch
+# dans les modules qui n'encodent pas : index vectoriel, similarité, scripts d'export)
+DEFAULT_MODEL_NAME = "paraphrase-multilingual-MiniLM-L12-v2"
+
+# Collection de configuration et identifiant du document de la version active
+EMBEDDING_VERSIONS_COLLECTION = "embedding_versions"
+ACTIVE_VERSION_ID = "active"
+
+
+@dataclass(frozen=True)
+class EmbeddingVersion:
+    """
+    Champ des ``versets`` qui contient les embeddings, et modèle qui les a produits.
+
+    Deux versions peuvent coexister (ex: ``embedding`` et ``embedding_v2``) : la
+    nouvelle est calculée à côté de l'ancienne, puis activée d'un seul coup par
+    ``set_active_embedding_version`` une fois complète.
+    """
+
+    field: str
+    model: str
+
+    @property
+    def model_field(self) -> str:
+        return f"{self.field}_model"
+
+    @property
+    def hash_field(self) -> str:
+        return f"{self.field}_hash"
+
+    def embedded_filter(self) -> dict:
+        """
+        Filtre des versets dont l'embedding a été produit par ce modèle.
+
+        Les embeddings historiques, sans ``<champ>_model``, sont attribués au modèle
+        de la version : ils étaient calculés avant l'étiquetage.
+        """
+        return {self.field: {"$exists": True}, self.model_field: {"$in": [self.model, None]}}
+
+    def as_dict(self) -> dict:
+        return {"field": self.field, "model": self.model}
+
+
+def default_embedding_version() -> EmbeddingVersion:
+    """Version utilisée tant qu'aucune version n'a été activée dans MongoDB."""
+    return EmbeddingVersion(DEFAULT_EMBEDDING_FIELD, os.getenv("EMBEDDING_MODEL", DEFAULT_MODEL_NAME))
+
+
+def embedding_versions_collection(db: AsyncIOMotorDatabase) -> AsyncIOMotorCollection:
+    return db[EMBEDDING_VERSIONS_COLLECTION]
+
+
+async def get_active_embedding_version(db: AsyncIOMotorDatabase) -> EmbeddingVersion:
+    """Lit la version active dans MongoDB (version par défaut si aucune n'est enregistrée)."""
+    document = await embedding_versions_collection(db).find_one({"_id": ACTIVE_VERSION_ID})
+    if not document or not document.get("field") or not document.get("model"):
+        return default_embedding_version()
+    return EmbeddingVersion(document["field"], document["model"])
+
+
+async def set_active_embedding_version(db: AsyncIOMotorDatabase, version: EmbeddingVersion) -> Optional[EmbeddingVersion]:
+    """
+    Active une version en une seule écriture (atomique) et retourne la précédente.
+
+    Les workers de l'API relisent ce document périodiquement et basculent leurs
+    index vectoriels vers la nouvelle version.
+    """
+    previous = await embedding_versions_collection(db).find_one_and_update(
+        {"_id": ACTIVE_VERSION_ID},
+        {"$set": {"field": version.field, "model": version.model, "activated_at": time.time()}},
+        upsert=True,
+    )
+    if previous and previous.get("field") and previous.get("model"):
+        return EmbeddingVersion(previous["field"], previous["model"])
+    return None
+
+
+async def count_missing_embeddings(
+    verses: AsyncIOMotorCollection, version: EmbeddingVersion, translation_id: Optional[str] = None
+) -> int:
+    """Nombre de versets avec contenu qui n'ont pas encore d'embedding de cette version."""
+    query = {
+        "contenu": {"$nin": [None, ""]},
+        "$nor": [version.embedded_filter()],
+    }
+    if translation_id:
+        query["traduction_id"] = translation_id
+    return await verses.count_documents(query)
+
+
+class ActiveEmbeddingVersion:
+    """
+    Cache de la version active, relue dans MongoDB au plus toutes les ``refresh_seconds``.
+
+    ``current()`` est appelé à chaque recherche : la lecture MongoDB n'a lieu qu'à
+    l'expiration du délai (ou après ``expire()``).
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, refresh_seconds: float = 30.0) -> None:
+        self._db = db
+        self.refresh_seconds = refresh_seconds
+        self._version: Optional[EmbeddingVersion] = None
+        self._checked_at = 0.0
+
+    async def current(self) -> EmbeddingVersion:
+        now = time.monotonic()
+        if self._version is None or now - self._checked_at >= self.refresh_seconds:
+            self._checked_at = now
+            try:
+                version = await get_active_embedding_version(self._db)
+            except Exception as e:
+                logger.warning(f"⚠️ Lecture de la version active des embeddings impossible: {e}")
+                version = self._version or default_embedding_version()
+            if version != self._version:
+                logger.info(f"🔀 Version active des embeddings: {version.field} ({version.model})")
+            self._version = version
+        return self._version
+
+    def expire(self) -> None:
+        """Force la relecture de la version active au prochain appel."""
+        self._checked_at = 0.0
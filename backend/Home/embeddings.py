@@ -9,36 +9,77 @@ from typing import List, Optional
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
+from .embedding_cache import EmbeddingCache, normalize_query_text
+from .embedding_versions import DEFAULT_MODEL_NAME
+from .similarity import top_k_similar
+
 logger = logging.getLogger(__name__)
 
-# Modèle multilingue recommandé pour le français
-# paraphrase-multilingual-MiniLM-L12-v2 : bon équilibre qualité/vitesse, multilingue
-# all-MiniLM-L6-v2 : plus rapide mais moins bon pour le français
-DEFAULT_MODEL_NAME = "paraphrase-multilingual-MiniLM-L12-v2"
+# Backends d'inférence : "torch" (défaut) ou "onnx" (ONNX Runtime, CPU). Pour l'ONNX quantifié
+# int8, EMBEDDING_ONNX_FILE désigne le fichier exporté par scripts/export_onnx_model.py.
+EMBEDDING_BACKENDS = ("torch", "onnx")
 
 
 class EmbeddingService:
     """Service pour générer et comparer les embeddings de texte."""
 
-    def __init__(self, model_name: Optional[str] = None) -> None:
+    def __init__(self, model_name: Optional[str] = None, backend: Optional[str] = None) -> None:
         """
         Initialise le service d'embeddings.
         
         Args:
             model_name: Nom du modèle sentence-transformers à utiliser.
                        Par défaut: paraphrase-multilingual-MiniLM-L12-v2
+            backend: Backend d'inférence ("torch" ou "onnx"). Par défaut: EMBEDDING_BACKEND ou torch
         """
         self.model_name = model_name or os.getenv("EMBEDDING_MODEL", DEFAULT_MODEL_NAME)
+        self.backend = (backend or os.getenv("EMBEDDING_BACKEND", "torch")).lower()
+        if self.backend not in EMBEDDING_BACKENDS:
+            raise ValueError(f"Backend d'embeddings inconnu: {self.backend} (attendu: {EMBEDDING_BACKENDS})")
+        # Modèle ONNX exporté localement (dossier) et fichier à charger (ex: quantifié int8)
+        self.onnx_path = os.getenv("EMBEDDING_ONNX_PATH") or None
+        self.onnx_file = os.getenv("EMBEDDING_ONNX_FILE") or None
         self._model: Optional[SentenceTransformer] = None
-        logger.info(f"🔧 Initialisation du service d'embeddings avec le modèle: {self.model_name}")
+        logger.info(f"🔧 Initialisation du service d'embeddings avec le modèle: {self.model_name} ({self.backend_label})")
+
+        # Cache des embeddings de requêtes : LRU en mémoire (EMBEDDING_CACHE_SIZE, 0 pour
+        # désactiver) + niveau disque optionnel qui survit aux redémarrages (EMBEDDING_CACHE_DIR)
+        self._cache = EmbeddingCache(
+            f"{self.model_name}:{self.backend_label}",
+            max_size=int(os.getenv("EMBEDDING_CACHE_SIZE", "10000")),
+            cache_dir=os.getenv("EMBEDDING_CACHE_DIR") or None,
+        )
+
+    @property
+    def backend_label(self) -> str:
+        """Backend effectif, incluant le fichier ONNX chargé (ex: onnx/model_qint8_avx2.onnx)."""
+        if self.backend == "onnx" and self.onnx_file:
+            return f"onnx:{self.onnx_file}"
+        return self.backend
+
+    def _load_model(self) -> SentenceTransformer:
+        if self.backend == "torch":
+            return SentenceTransformer(self.model_name)
+
+        model_kwargs = {"file_name": self.onnx_file} if self.onnx_file else {}
+        try:
+            return SentenceTransformer(
+                self.onnx_path or self.model_name,
+                backend="onnx",
+                model_kwargs=model_kwargs,
+            )
+        except TypeError as e:
+            raise RuntimeError(
+                "Le backend ONNX nécessite sentence-transformers>=3.2 et optimum[onnxruntime]"
+            ) from e
 
     @property
     def model(self) -> SentenceTransformer:
         """Charge le modèle de manière paresseuse (lazy loading)."""
         if self._model is None:
             try:
-                logger.info(f"📥 Chargement du modèle d'embeddings: {self.model_name}...")
-                self._model = SentenceTransformer(self.model_name)
+                logger.info(f"📥 Chargement du modèle d'embeddings: {self.model_name} ({self.backend_label})...")
+                self._model = self._load_model()
                 logger.info(f"✅ Modèle d'embeddings chargé avec succès")
                 logger.info(f"   Dimension des embeddings: {self._model.get_sentence_embedding_dimension()}")
             except Exception as e:
@@ -46,20 +87,54 @@ class EmbeddingService:
                 raise
         return self._model
 
-    def encode(self, texts: str | List[str], normalize: bool = True) -> np.ndarray:
+    def encode(self, texts: str | List[str], normalize: bool = True, use_cache: bool = True) -> np.ndarray:
         """
         Génère les embeddings pour un ou plusieurs textes.
         
         Args:
             texts: Texte unique ou liste de textes à encoder
             normalize: Si True, normalise les vecteurs (utile pour la similarité cosinus)
+            use_cache: Si True, consulte le cache des requêtes avant le modèle. À désactiver
+                       pour les traitements en masse (versets) qui pollueraient le cache.
             
         Returns:
             Array numpy de shape (1, dim) pour un texte ou (n, dim) pour plusieurs textes
         """
         if isinstance(texts, str):
             texts = [texts]
-        
+
+        if not use_cache or not self._cache.enabled:
+            return self._encode_uncached(texts, normalize)
+
+        cached = [self._cache.get(text, normalize) for text in texts]
+
+        # Textes absents du cache, dédoublonnés selon leur forme normalisée (clé du cache)
+        missing: dict[str, str] = {}
+        for text, vector in zip(texts, cached):
+            if vector is None:
+                missing.setdefault(normalize_query_text(text), text)
+        if not missing:
+            return np.stack(cached)
+
+        # Un seul passage dans le modèle pour tous les textes absents du cache
+        vectors = self._encode_uncached(list(missing.values()), normalize)
+        computed = dict(zip(missing.keys(), vectors))
+        for text, vector in zip(missing.values(), vectors):
+            self._cache.put(text, vector, normalize)
+
+        return np.stack([
+            vector if vector is not None else computed[normalize_query_text(text)]
+            for text, vector in zip(texts, cached)
+        ])
+
+    def get_cached(self, text: str, normalize: bool = True) -> Optional[np.ndarray]:
+        """Embedding (dim,) d'un texte s'il est déjà en cache, sans appeler le modèle."""
+        if not self._cache.enabled:
+            return None
+        return self._cache.get(text, normalize, record_miss=False)
+
+    def _encode_uncached(self, texts: List[str], normalize: bool) -> np.ndarray:
+        """Passage dans le modèle, sans cache."""
         try:
             embeddings = self.model.encode(
                 texts,
@@ -72,6 +147,10 @@ class EmbeddingService:
             logger.error(f"❌ Erreur lors de l'encodage: {e}")
             raise
 
+    def cache_stats(self) -> dict:
+        """Compteurs hits/misses du cache des embeddings de requêtes."""
+        return self._cache.stats()
+
     def compute_similarity(self, embedding1: np.ndarray, embedding2: np.ndarray) -> float:
         """
         Calcule la similarité cosinus entre deux embeddings.
@@ -90,35 +169,52 @@ class EmbeddingService:
     def find_most_similar(
         self,
         query_embedding: np.ndarray,
-        verse_embeddings: List[np.ndarray],
+        verse_embeddings: np.ndarray | List[np.ndarray],
         top_k: int = 10,
+        mask: Optional[np.ndarray] = None,
     ) -> List[tuple[int, float]]:
         """
         Trouve les versets les plus similaires à la requête.
         
         Args:
             query_embedding: Embedding de la requête utilisateur
-            verse_embeddings: Liste des embeddings des versets
+            verse_embeddings: Matrice (n, dim) float32 des embeddings des versets
+                              (une liste de vecteurs est acceptée mais sera empilée)
             top_k: Nombre de résultats à retourner
+            mask: Tableau booléen (n,) des versets autorisés (optionnel)
             
         Returns:
             Liste de tuples (index, score_similarité) triés par score décroissant
         """
-        if not verse_embeddings:
-            return []
+        return self.find_most_similar_batch(
+            np.asarray(query_embedding).reshape(1, -1), verse_embeddings, top_k, mask
+        )[0]
 
-        # Convertir en array numpy pour calcul vectoriel efficace
-        verse_array = np.array(verse_embeddings)
-        
-        # Calculer les similarités (produit scalaire car vecteurs normalisés)
-        similarities = np.dot(verse_array, query_embedding)
-        
-        # Obtenir les indices des top_k meilleurs résultats
-        top_indices = np.argsort(similarities)[::-1][:top_k]
+    def find_most_similar_batch(
+        self,
+        query_embeddings: np.ndarray,
+        verse_embeddings: np.ndarray | List[np.ndarray],
+        top_k: int = 10,
+        mask: Optional[np.ndarray] = None,
+    ) -> List[List[tuple[int, float]]]:
+        """
+        Version batch de ``find_most_similar`` : un seul produit (Q×D) @ (D×N).
         
-        # Retourner les résultats avec leurs scores
-        results = [(int(idx), float(similarities[idx])) for idx in top_indices]
-        return results
+        Args:
+            query_embeddings: Embeddings des requêtes (Q, dim)
+            verse_embeddings: Matrice (n, dim) float32 des embeddings des versets
+            top_k: Nombre de résultats par requête
+            mask: Tableau booléen (n,) des versets autorisés (optionnel)
+            
+        Returns:
+            Une liste de tuples (index, score_similarité) par requête
+        """
+        if not isinstance(verse_embeddings, np.ndarray):
+            if not verse_embeddings:
+                return [[] for _ in range(len(query_embeddings))]
+            verse_embeddings = np.asarray(verse_embeddings, dtype=np.float32)
+
+        return top_k_similar(query_embeddings, verse_embeddings, top_k, mask)
 
     def get_embedding_dimension(self) -> int:
         """Retourne la dimension des embeddings générés par le modèle."""
@@ -127,12 +223,36 @@ class EmbeddingService:
 
 # Instance globale (singleton) pour éviter de recharger le modèle
 _embedding_service: Optional[EmbeddingService] = None
+# Services d'autres modèles (version d'embeddings en cours de bascule), un par modèle
+_model_services: dict[str, EmbeddingService] = {}
 
 
-def get_embedding_service() -> EmbeddingService:
-    """Retourne l'instance globale du service d'embeddings (singleton)."""
+def get_embedding_service(model_name: Optional[str] = None) -> EmbeddingService:
+    """
+    Retourne l'instance globale du service d'embeddings (singleton).
+
+    Si EMBEDDING_SIDECAR_SOCKET pointe vers un socket existant, le service renvoyé
+    délègue l'inférence au sidecar (voir embedding_sidecar) ; sinon le modèle est
+    chargé dans ce processus.
+
+    Args:
+        model_name: Modèle demandé (défaut: EMBEDDING_MODEL). Un modèle différent de celui
+                    du service global a sa propre instance, toujours chargée localement.
+    """
     global _embedding_service
     if _embedding_service is None:
-        _embedding_service = EmbeddingService()
-    return _embedding_service
+        socket_path = os.getenv("EMBEDDING_SIDECAR_SOCKET")
+        if socket_path and os.path.exists(socket_path):
+            from .embedding_sidecar import SidecarEmbeddingService
+
+            _embedding_service = SidecarEmbeddingService(socket_path)
+        else:
+            if socket_path:
+                logger.warning(f"⚠️ Socket du sidecar introuvable ({socket_path}), encodage local")
+            _embedding_service = EmbeddingService()
 
+    if model_name is None or model_name == _embedding_service.model_name:
+        return _embedding_service
+    if model_name not in _model_services:
+        _model_services[model_name] = EmbeddingService(model_name)
+    return _model_services[model_name]
@@ -0,0 +1,118 @@
+"""Score hybride des candidats de la recherche vectorielle, calculé en tableaux NumPy."""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .vector_index import VerseVectorIndex
+
+# Longueurs (caractères) en dessous / au-dessus desquelles un verset est favorisé / pénalisé
+SHORT_VERSE_LENGTH = 100
+LONG_VERSE_LENGTH = 300
+
+
+@dataclass(frozen=True)
+class HybridWeights:
+    """
+    Poids des composantes du score hybride.
+
+    Les valeurs par défaut reproduisent l'ancien score : 70 % vectoriel, 30 %
+    sémantique (dont 60 % émotions/thèmes et 40 % mots-clés), sans a priori de longueur.
+    """
+
+    vector: float = 0.7
+    links: float = 0.18
+    keywords: float = 0.12
+    length: float = 0.0
+
+    @classmethod
+    def from_env(cls) -> "HybridWeights":
+        defaults = cls()
+        return cls(
+            vector=float(os.getenv("HYBRID_WEIGHT_VECTOR", defaults.vector)),
+            links=float(os.getenv("HYBRID_WEIGHT_LINKS", defaults.links)),
+            keywords=float(os.getenv("HYBRID_WEIGHT_KEYWORDS", defaults.keywords)),
+            length=float(os.getenv("HYBRID_WEIGHT_LENGTH", defaults.length)),
+        )
+
+
+@dataclass
+class VectorCandidates:
+    """
+    Lignes d'un index retenues par la recherche vectorielle, avec leurs scores.
+
+    ``documents[i]`` est le verset (contenu, mots-clés) de la ligne ``rows[i]``, lu
+    dans MongoDB pour les seuls k candidats. Après ``rank``, les tableaux sont
+    triés par score combiné décroissant.
+    """
+
+    index: VerseVectorIndex
+    rows: np.ndarray
+    vector_scores: np.ndarray
+    documents: List[dict]
+    combined_scores: Optional[np.ndarray] = None
+    semantic_scores: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @classmethod
+    def from_search(cls, index: VerseVectorIndex, similar_rows: list, documents_by_id: Dict) -> "VectorCandidates":
+        """Candidats de la recherche ; les lignes dont le verset a été supprimé depuis le chargement de l'index sont écartées."""
+        kept = [(row, score) for row, score in similar_rows if index.ids[row] in documents_by_id]
+        rows = np.fromiter((row for row, _ in kept), dtype=np.int64, count=len(kept))
+        scores = np.fromiter((score for _, score in kept), dtype=np.float32, count=len(kept))
+        documents = [documents_by_id[index.ids[row]] for row in rows]
+        return cls(index=index, rows=rows, vector_scores=scores, documents=documents)
+
+    def rank(
+        self,
+        linked_ids: Iterable,
+        keywords: Iterable[str],
+        weights: HybridWeights,
+    ) -> "VectorCandidates":
+        """
+        Calcule le score combiné de tous les candidats et les trie.
+
+        Toutes les composantes sont des tableaux (k,) : similarité vectorielle,
+        appartenance aux versets liés aux émotions/thèmes, proportion des mots-clés
+        de l'analyse contenus dans le texte du verset, et a priori de longueur (+1
+        court, -1 long).
+
+        Les mots-clés gardent la sémantique du classement d'origine (sous-chaîne du
+        contenu, sans casse) : ils ne sont pas tokenisés, le test est fait par
+        ``np.char.find`` sur la matrice (k, termes), sans boucle Python par verset.
+        """
+        rows_by_id = self.index.rows_by_id
+        linked_rows = np.fromiter(
+            (row for row in (rows_by_id.get(verse_id) for verse_id in linked_ids) if row is not None),
+            dtype=np.int64,
+        )
+        links = np.isin(self.rows, linked_rows).astype(np.float32)
+
+        contents = np.array([document.get("contenu") or "" for document in self.documents], dtype=np.str_)
+        terms = np.char.lower(np.array(list(keywords), dtype=np.str_))
+        if len(terms) and len(contents):
+            matches = (np.char.find(np.char.lower(contents)[:, None], terms[None, :]) >= 0).sum(axis=1)
+            keyword_scores = np.minimum(matches / len(terms), 1.0)
+        else:
+            keyword_scores = np.zeros(len(self.rows), dtype=np.float32)
+        lengths = np.char.str_len(contents)
+        length_prior = (lengths < SHORT_VERSE_LENGTH).astype(np.float32) - (lengths > LONG_VERSE_LENGTH)
+
+        semantic = weights.links * links + weights.keywords * keyword_scores + weights.length * length_prior
+        combined = weights.vector * self.vector_scores.astype(np.float64) + semantic
+
+        order = np.argsort(-combined, kind="stable")
+        return VectorCandidates(
+            index=self.index,
+            rows=self.rows[order],
+            vector_scores=self.vector_scores[order],
+            documents=[self.documents[position] for position in order],
+            combined_scores=combined[order].astype(np.float32),
+            semantic_scores=semantic[order].astype(np.float32),
+        )
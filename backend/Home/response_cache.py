@@ -0,0 +1,211 @@
+"""Cache sémantique des recherches de /api/home/search (texte identique ou quasi identique)."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from .embedding_cache import normalize_query_text
+from .schemas import SpiritualContent
+
+if TYPE_CHECKING:
+    from .retriever import VerseDocument
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedAnswer:
+    """
+    Partie d'une réponse réutilisable pour la requête d'une autre personne.
+
+    Seuls le verset choisi et, s'il a été généré sans le message de la personne
+    (stockage partagé du contenu actif), le contenu spirituel sont conservés.
+    L'analyse (résumé, mots-clés) et le contenu personnalisé, propres au message,
+    ne le sont jamais : ils sont recalculés pour chaque requête.
+    """
+
+    verse: "VerseDocument"
+    content: Optional[SpiritualContent] = None
+
+
+@dataclass
+class _Entry:
+    slot: int
+    partition: int
+    answer: CachedAnswer
+    expires_at: float
+
+
+class SemanticResponseCache:
+    """
+    Réponses réutilisables (``CachedAnswer``) indexées par le texte de la requête.
+
+    Une entrée appartient à une partition (traduction, langue, modèle d'embeddings,
+    filtres) : une réponse n'est jamais réutilisée pour une autre traduction ou langue.
+
+    - correspondance exacte : hash du texte normalisé, sans calcul d'embedding ;
+    - quasi-doublon : l'embedding de la requête est comparé (produit scalaire sur une
+      matrice résidente) à ceux des entrées de la même partition ; au-dessus de
+      ``similarity_threshold``, la réponse stockée est réutilisée.
+
+    Les entrées expirent après ``ttl_seconds`` ; au-delà de ``max_size``, la moins
+    récemment utilisée est évincée.
+    """
+
+    def __init__(self, max_size: int = 1000, ttl_seconds: float = 3600.0, similarity_threshold: float = 0.95) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._partitions: dict[str, int] = {}
+        # Matrice des embeddings (une ligne par emplacement), allouée au premier ajout
+        self._embeddings: Optional[np.ndarray] = None
+        self._slot_partitions = np.full(max(max_size, 0), -1, dtype=np.int32)
+        self._slot_expires = np.zeros(max(max_size, 0), dtype=np.float64)
+        self._slot_keys: list[Optional[str]] = [None] * max(max_size, 0)
+        self._free_slots = list(range(max(max_size, 0) - 1, -1, -1))
+        self._exact_hits = 0
+        self._semantic_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @staticmethod
+    def partition_key(translation_id: str, language: str, model_name: str, filters: object = None) -> str:
+        return f"{translation_id}\x00{language}\x00{model_name}\x00{filters!r}"
+
+    def _key(self, partition: str, text: str) -> str:
+        raw = f"{partition}\x00{normalize_query_text(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _partition_id(self, partition: str) -> int:
+        return self._partitions.setdefault(partition, len(self._partitions))
+
+    def _release(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._slot_partitions[entry.slot] = -1
+        self._slot_keys[entry.slot] = None
+        self._free_slots.append(entry.slot)
+
+    def get_exact(self, partition: str, text: str) -> Optional[CachedAnswer]:
+        """Réponse stockée pour exactement ce texte (après normalisation), ou None."""
+        if not self.enabled:
+            return None
+        key = self._key(partition, text)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            self._release(key)
+            self._expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        self._exact_hits += 1
+        return entry.answer
+
+    def get_similar(self, partition: str, embedding: np.ndarray) -> Optional[CachedAnswer]:
+        """Réponse d'une requête quasi identique (similarité cosinus ≥ seuil), ou None."""
+        if not self.enabled:
+            return None
+        partition_id = self._partitions.get(partition)
+        if partition_id is None or self._embeddings is None:
+            self._misses += 1
+            return None
+
+        candidates = (self._slot_partitions == partition_id) & (self._slot_expires > time.time())
+        if not candidates.any():
+            self._misses += 1
+            return None
+        scores = np.where(candidates, self._embeddings @ np.asarray(embedding, dtype=np.float32), -np.inf)
+        slot = int(np.argmax(scores))
+        if scores[slot] < self.similarity_threshold:
+            self._misses += 1
+            return None
+
+        key = self._slot_keys[slot]
+        self._entries.move_to_end(key)
+        self._semantic_hits += 1
+        logger.info(f"♻️ Réponse réutilisée (similarité {scores[slot]:.3f})")
+        return self._entries[key].answer
+
+    def put(self, partition: str, text: str, embedding: np.ndarray, answer: CachedAnswer) -> None:
+        """Stocke la réponse d'une requête (remplace l'entrée existante pour le même texte)."""
+        if not self.enabled:
+            return
+        embedding = np.asarray(embedding, dtype=np.float32)
+        if self._embeddings is None:
+            self._embeddings = np.zeros((self.max_size, embedding.shape[-1]), dtype=np.float32)
+
+        key = self._key(partition, text)
+        if key in self._entries:
+            self._release(key)
+        if not self._free_slots:
+            self._evict_one()
+
+        slot = self._free_slots.pop()
+        partition_id = self._partition_id(partition)
+        expires_at = time.time() + self.ttl_seconds
+        self._embeddings[slot] = embedding
+        self._slot_partitions[slot] = partition_id
+        self._slot_expires[slot] = expires_at
+        self._slot_keys[slot] = key
+        self._entries[key] = _Entry(slot=slot, partition=partition_id, answer=answer, expires_at=expires_at)
+
+    def _evict_one(self) -> None:
+        # Une entrée expirée est libérée en priorité, sinon la moins récemment utilisée
+        expired = np.flatnonzero((self._slot_partitions >= 0) & (self._slot_expires <= time.time()))
+        if len(expired):
+            self._release(self._slot_keys[int(expired[0])])
+            self._expirations += 1
+            return
+        oldest = next(iter(self._entries))
+        self._release(oldest)
+        self._evictions += 1
+
+    def clear(self) -> None:
+        for key in list(self._entries):
+            self._release(key)
+
+    def stats(self) -> dict:
+        lookups = self._exact_hits + self._semantic_hits + self._misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "similarity_threshold": self.similarity_threshold,
+            "exact_hits": self._exact_hits,
+            "semantic_hits": self._semantic_hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "expirations": self._expirations,
+            "hit_rate": round((self._exact_hits + self._semantic_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Instance globale (singleton), partagée par les requêtes du worker
+_response_cache: Optional[SemanticResponseCache] = None
+
+
+def get_response_cache() -> SemanticResponseCache:
+    """Retourne le cache de réponses (RESPONSE_CACHE_SIZE=0 pour le désactiver)."""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = SemanticResponseCache(
+            max_size=int(os.getenv("RESPONSE_CACHE_SIZE", "1000")),
+            ttl_seconds=float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600")),
+            similarity_threshold=float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.95")),
+        )
+    return _response_cache
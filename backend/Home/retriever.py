@@ -2,26 +2,35 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
 import re
 from dataclasses import dataclass
-from typing import Iterable, List, Optional
+from typing import Awaitable, Iterable, List, Optional, TypeVar
 
+import numpy as np
 from bson import ObjectId
 from dotenv import load_dotenv
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
-import numpy as np
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+
+from database import get_database
 
 from .schemas import AnalysisResult
 from .version_mapping import get_translation_id_from_version_name
-from .embeddings import get_embedding_service
+from .embedding_batcher import get_embedding_batcher
+from .embedding_versions import ActiveEmbeddingVersion, EmbeddingVersion, default_embedding_version
+from .hybrid_scoring import LONG_VERSE_LENGTH, SHORT_VERSE_LENGTH, HybridWeights, VectorCandidates
+from .vector_index import VectorIndexRegistry, VerseVectorIndex
+from .verse_filters import VerseFilters
 
 
 logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+T = TypeVar("T")
+
 
 @dataclass
 class VerseDocument:
@@ -40,31 +49,60 @@ class VerseDocument:
 class MongoVerseRetriever:
     """Accès MongoDB pour récupérer les versets pertinents."""
 
-    def __init__(self) -> None:
-        mongo_url = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
-        mongo_db = os.getenv("MONGODB_DATABASE", "parole_du_moment_db")
-
-        logger.info(f"🔌 Connexion à MongoDB: {mongo_url}")
-        logger.info(f"📚 Base de données: {mongo_db}")
-        
-        try:
-            # Créer le client avec un timeout de connexion
-            self._client = AsyncIOMotorClient(
-                mongo_url,
-                serverSelectionTimeoutMS=5000  # Timeout de 5 secondes
-            )
-            self._db = self._client[mongo_db]
-            logger.info("✅ Client MongoDB créé")
-        except Exception as e:
-            logger.error(f"❌ Erreur lors de la connexion à MongoDB: {e}")
-            raise
+    def __init__(self, db: Optional[AsyncIOMotorDatabase] = None) -> None:
+        # Base sur le client MongoDB partagé par tous les services (voir database.py)
+        self._db = db if db is not None else get_database()
+        self._client = self._db.client
+        logger.info(f"📚 Base de données: {self._db.name}")
         
         # Cache pour les noms d'émotions/thèmes (chargé dynamiquement)
         self._emotions_cache: Optional[List[dict]] = None
         self._themes_cache: Optional[List[dict]] = None
         
-        # Service d'embeddings (chargé de manière paresseuse)
-        self._embedding_service = None
+        # Version active des embeddings (champ + modèle), relue périodiquement dans
+        # MongoDB : scripts/activate_embedding_version.py bascule tous les workers
+        self._embedding_version = ActiveEmbeddingVersion(
+            self._db, refresh_seconds=float(os.getenv("EMBEDDING_VERSION_REFRESH_SECONDS", "30"))
+        )
+
+        # Index vectoriels résidents, un par traduction (chargés au premier accès).
+        # EMBEDDING_INDEX_DIR pointe vers les artefacts exportés par
+        # scripts/export_vector_index.py, ouverts en mémoire mappée et partagés
+        # entre les workers uvicorn. VECTOR_SEARCH_BACKEND=ivf active l'index
+        # approximatif construit par scripts/build_ann_index.py. VECTOR_INDEX_SOURCE=canonical
+        # utilise les embeddings canoniques partagés par toutes les traductions.
+        self._vector_indexes = self._create_vector_indexes(default_embedding_version())
+
+        # Score hybride : nombre de candidats vectoriels classés, et poids des composantes
+        self._vector_top_k = int(os.getenv("VECTOR_SEARCH_TOP_K", "20"))
+        self._hybrid_weights = HybridWeights.from_env()
+
+        # Délais (secondes) des étapes exécutées en parallèle par get_best_verse
+        self._vector_search_timeout = float(os.getenv("VECTOR_SEARCH_TIMEOUT", "10"))
+        self._link_lookup_timeout = float(os.getenv("LINK_LOOKUP_TIMEOUT", "3"))
+
+    async def ping(self) -> None:
+        """Vérifie la connexion MongoDB (ouvre le pool de connexions)."""
+        await self._client.admin.command("ping")
+
+    async def warm_up(self, translation_ids: Iterable[str]) -> None:
+        """
+        Charge à l'avance ce que la première recherche chargerait sinon : caches des
+        émotions/thèmes, index vectoriels des traductions données, modèle d'embeddings
+        (avec un encodage factice).
+        """
+        await self._load_collection_cache("emotions")
+        await self._load_collection_cache("themes")
+
+        registry = await self._active_vector_indexes()
+        for translation_id in translation_ids:
+            index = await registry.get(translation_id)
+            if index is None:
+                logger.warning(f"⚠️ Préchargement: pas d'index vectoriel pour {translation_id}")
+                continue
+
+        # Charge le modèle (ou ouvre la connexion au sidecar) et exécute une inférence
+        await get_embedding_batcher(registry.version.model).encode("Préchargement du modèle d'embeddings")
 
     @property
     def verses(self) -> AsyncIOMotorCollection:
@@ -123,7 +161,7 @@ class MongoVerseRetriever:
         # Si pas fourni, utiliser la traduction par défaut selon la langue
         return MongoVerseRetriever._get_default_translation_id(language)
 
-    async def get_best_verse(self, analysis: AnalysisResult, translation_id: Optional[str] = None, language: str = "fr", version_name: Optional[str] = None, user_text: Optional[str] = None) -> Optional[VerseDocument]:
+    async def get_best_verse(self, analysis: AnalysisResult, translation_id: Optional[str] = None, language: str = "fr", version_name: Optional[str] = None, user_text: Optional[str] = None, filters: Optional[VerseFilters] = None, vector_search: Optional[Awaitable[Optional[VectorCandidates]]] = None) -> Optional[VerseDocument]:
         """
         Retourne le verset le plus pertinent selon l'analyse fournie.
         Utilise la recherche vectorielle (embeddings) en priorité, puis combine avec les autres méthodes.
@@ -134,58 +172,52 @@ class MongoVerseRetriever:
             language: Langue de l'utilisateur
             version_name: Nom de la version biblique
             user_text: Texte original de l'utilisateur (pour recherche vectorielle)
+            filters: Restriction des versets candidats (livres, testament, émotions/thèmes liés)
+            vector_search: Recherche vectorielle déjà lancée (voir ``search_vector_candidates``),
+                           utilisée à la place d'une nouvelle recherche
         """
         
         # Normaliser le translation_id
         normalized_translation_id = self._normalize_translation_id(translation_id, language, version_name)
         logger.info(f"🔍 Recherche de verset avec analysis: emotions={analysis.emotions}, themes={analysis.themes}, keywords={analysis.keywords}")
         logger.info(f"📖 Filtre traduction: {normalized_translation_id}")
+        if filters is not None and filters.is_empty:
+            filters = None
+        if filters is not None:
+            logger.info(f"🎯 Filtres: {filters}")
 
         # Construire le texte de requête pour la recherche vectorielle
         query_text = user_text or analysis.summary or " ".join(analysis.keywords)
         
-        # STRATÉGIE 0: Recherche vectorielle (prioritaire)
-        vector_results = await self._vector_search(query_text, normalized_translation_id, top_k=20)
-        
-        # Calculer les IDs des versets liés aux émotions/thèmes pour score hybride
-        verse_ids: List[ObjectId] = []
-
-        try:
-            emotion_ids = await self._find_ids_by_name(self.emotions, analysis.emotions, "emotions")
-            logger.info(f"📊 Emotions trouvées: {len(emotion_ids)} IDs (recherche: {analysis.emotions})")
-        except Exception as e:
-            logger.warning(f"⚠️ Erreur lors de la recherche d'émotions: {e}")
-            emotion_ids = []
-
-        try:
-            theme_ids = await self._find_ids_by_name(self.themes, analysis.themes, "themes")
-            logger.info(f"📊 Thèmes trouvés: {len(theme_ids)} IDs (recherche: {analysis.themes})")
-        except Exception as e:
-            logger.warning(f"⚠️ Erreur lors de la recherche de thèmes: {e}")
-            theme_ids = []
-
-        if emotion_ids:
-            linked_verse_ids = await self._find_verse_ids_by_link(
-                self.verses_emotions, "emotion_id", emotion_ids
-            )
-            logger.info(f"📖 Versets liés aux émotions: {len(linked_verse_ids)}")
-            verse_ids.extend(linked_verse_ids)
-
-        if theme_ids:
-            linked_verse_ids = await self._find_verse_ids_by_link(
-                self.verses_themes, "theme_id", theme_ids
-            )
-            logger.info(f"📖 Versets liés aux thèmes: {len(linked_verse_ids)}")
-            verse_ids.extend(linked_verse_ids)
+        # STRATÉGIE 0: Recherche vectorielle (prioritaire), et en parallèle les IDs des
+        # versets liés aux émotions/thèmes pour le score hybride. Les étapes sont
+        # indépendantes : chacune a son délai, et un échec n'interrompt pas les autres.
+        if vector_search is None:
+            vector_search = self.search_vector_candidates(query_text, normalized_translation_id, filters=filters)
+        vector_candidates, emotion_verse_ids, theme_verse_ids = await asyncio.gather(
+            vector_search,
+            self._run_stage(
+                "émotions",
+                self._find_linked_verse_ids(self.emotions, analysis.emotions, "emotions", self.verses_emotions, "emotion_id"),
+                self._link_lookup_timeout,
+                [],
+            ),
+            self._run_stage(
+                "thèmes",
+                self._find_linked_verse_ids(self.themes, analysis.themes, "themes", self.verses_themes, "theme_id"),
+                self._link_lookup_timeout,
+                [],
+            ),
+        )
 
-        verse_ids = list(dict.fromkeys(verse_ids))
+        verse_ids: List[ObjectId] = list(dict.fromkeys(emotion_verse_ids + theme_verse_ids))
         logger.info(f"📚 Total de versets uniques par émotions/thèmes: {len(verse_ids)}")
 
         # Si on a des résultats vectoriels, les combiner avec les scores d'émotions/thèmes
-        if vector_results:
-            logger.info(f"✅ Recherche vectorielle: {len(vector_results)} versets trouvés")
+        if vector_candidates:
             # Combiner les scores vectoriels avec les correspondances émotions/thèmes
-            scored_results = self._combine_scores(vector_results, verse_ids, analysis)
+            ranked = self._combine_scores(vector_candidates, verse_ids, analysis)
+            scored_results = self._ranked_verses(ranked)
             if scored_results:
                 best_result = scored_results[0]
                 logger.info(f"✅ Verset sélectionné (recherche vectorielle): {best_result.get('ref_unique', 'N/A')}")
@@ -218,6 +250,10 @@ class MongoVerseRetriever:
         
         # Filtre de traduction à ajouter à toutes les requêtes
         translation_filter = {"traduction_id": normalized_translation_id}
+        # Les filtres livres/testament s'appliquent aussi aux stratégies de repli
+        # (les filtres émotions/thèmes ne portent que sur la recherche vectorielle)
+        if filters is not None:
+            translation_filter.update(filters.mongo_filter())
 
         # Stratégie 1: Recherche par verse_ids ET recherche textuelle (si disponible)
         if verse_ids and search_terms:
@@ -324,183 +360,237 @@ class MongoVerseRetriever:
             verse=best.get("numero"),
         )
 
-    async def _vector_search(self, query_text: str, translation_id: str, top_k: int = 20) -> List[dict]:
+    def _create_vector_indexes(self, version: EmbeddingVersion) -> VectorIndexRegistry:
+        nprobe = os.getenv("VECTOR_IVF_NPROBE")
+        return VectorIndexRegistry(
+            self.verses,
+            index_dir=os.getenv("EMBEDDING_INDEX_DIR") or None,
+            version=version,
+            search_backend=os.getenv("VECTOR_SEARCH_BACKEND", "exact").lower(),
+            nprobe=int(nprobe) if nprobe else None,
+            source=os.getenv("VECTOR_INDEX_SOURCE", "verses").lower(),
+        )
+
+    async def _active_vector_indexes(self) -> VectorIndexRegistry:
+        """
+        Registre des index de la version active des embeddings.
+
+        Quand la version change, un nouveau registre remplace l'ancien d'un coup : les
+        recherches en cours terminent avec l'ancien index (et l'ancien modèle), les
+        suivantes chargent les index de la nouvelle version.
+        """
+        version = await self._embedding_version.current()
+        if version != self._vector_indexes.version:
+            logger.info(
+                f"🔀 Bascule des index vectoriels: {self._vector_indexes.version.field} → {version.field} ({version.model})"
+            )
+            self._vector_indexes = self._create_vector_indexes(version)
+        return self._vector_indexes
+
+    async def get_vector_index(self, translation_id: str) -> Optional[VerseVectorIndex]:
+        """Retourne l'index vectoriel résident de la traduction (chargé si nécessaire)."""
+        registry = await self._active_vector_indexes()
+        return await registry.get(translation_id)
+
+    async def reload_vector_index(self, translation_id: str) -> Optional[VerseVectorIndex]:
+        """Recharge l'index vectoriel d'une traduction depuis MongoDB."""
+        registry = await self._active_vector_indexes()
+        return await registry.reload(translation_id)
+
+    def invalidate_vector_index(self, translation_id: Optional[str] = None) -> None:
+        """Invalide l'index vectoriel d'une traduction, ou de toutes si non précisée."""
+        self._vector_indexes.invalidate(translation_id)
+        if translation_id is None:
+            # Relire aussi la version active (bascule immédiate après activation)
+            self._embedding_version.expire()
+
+    def vector_index_stats(self) -> dict:
+        """Statistiques des index vectoriels chargés."""
+        return self._vector_indexes.stats()
+
+    async def active_embedding_model(self) -> str:
+        """Modèle d'embeddings de la version active (celui des requêtes vectorielles)."""
+        registry = await self._active_vector_indexes()
+        return registry.version.model
+
+    async def embed_query(self, query_text: str) -> np.ndarray:
+        """Embedding d'une requête avec le modèle actif (mis en cache, regroupé avec les requêtes concurrentes)."""
+        return await get_embedding_batcher(await self.active_embedding_model()).encode(query_text)
+
+    async def search_vector_candidates(
+        self,
+        query_text: str,
+        translation_id: Optional[str] = None,
+        language: str = "fr",
+        version_name: Optional[str] = None,
+        filters: Optional[VerseFilters] = None,
+    ) -> Optional[VectorCandidates]:
+        """
+        Recherche vectorielle seule (avec son délai), sans l'analyse du texte.
+
+        Elle ne dépend que du texte utilisateur : search_home la lance pendant
+        l'analyse par le LLM, puis la passe à ``get_best_verse`` pour le score hybride.
+        """
+        normalized_translation_id = self._normalize_translation_id(translation_id, language, version_name)
+        if filters is not None and filters.is_empty:
+            filters = None
+        return await self._run_stage(
+            "recherche vectorielle",
+            self._vector_search(query_text, normalized_translation_id, filters=filters),
+            self._vector_search_timeout,
+            None,
+        )
+
+    async def _vector_search(self, query_text: str, translation_id: str, top_k: Optional[int] = None, filters: Optional[VerseFilters] = None) -> Optional[VectorCandidates]:
         """
         Recherche vectorielle des versets les plus pertinents.
         
         Args:
             query_text: Texte de la requête utilisateur
             translation_id: ID de traduction pour filtrer
-            top_k: Nombre de résultats à retourner
+            top_k: Nombre de candidats à retourner (défaut: VECTOR_SEARCH_TOP_K)
+            filters: Restriction des versets candidats, appliquée en masque sur l'index
             
         Returns:
-            Liste de dictionnaires contenant les versets avec leur score de similarité
+            Candidats (lignes de l'index et scores de similarité), ou None
         """
         try:
-            # Charger le service d'embeddings de manière paresseuse
-            if self._embedding_service is None:
-                self._embedding_service = get_embedding_service()
-            
-            # Générer l'embedding de la requête
-            query_embedding = self._embedding_service.encode(query_text)
+            # Index résident de la traduction (matrice float32 chargée une seule fois)
+            registry = await self._active_vector_indexes()
+            # Le chargement de l'index continue même si la recherche est abandonnée
+            # (délai dépassé) : la requête suivante le trouvera en mémoire
+            index = await asyncio.shield(registry.get(translation_id))
+            if index is None or len(index) == 0:
+                return None
+
+            # Masque des lignes autorisées par les filtres (mis en cache par l'index)
+            mask = None
+            if filters is not None:
+                if filters.needs_links:
+                    await asyncio.shield(registry.ensure_links(index))
+                mask = index.filter_mask(filters)
+                if not mask.any():
+                    logger.info("ℹ️ Aucun verset de l'index ne correspond aux filtres")
+                    return None
+
+            # Générer l'embedding de la requête avec le modèle de l'index (hors boucle
+            # d'événements, regroupé avec les requêtes concurrentes)
+            embedding_batcher = get_embedding_batcher(registry.version.model)
+            query_embedding = await embedding_batcher.encode(query_text)
             
-            # Récupérer tous les versets de la traduction avec leurs embeddings
-            # Note: Les embeddings doivent être pré-calculés et stockés dans MongoDB
+            # Un seul produit matrice-vecteur sur l'index résident
+            similar_rows = index.search(query_embedding, top_k=top_k or self._vector_top_k, mask=mask)
+            if not similar_rows:
+                return None
+
+            # Contenu des seuls k candidats (score hybride et verset retenu), lu pendant l'analyse
+            candidate_ids = [index.ids[row] for row, _ in similar_rows]
             cursor = self.verses.find(
-                {"traduction_id": translation_id, "embedding": {"$exists": True}},
-                {
-                    "contenu": 1,
-                    "ref_unique": 1,
-                    "mots_cles": 1,
-                    "traduction_id": 1,
-                    "livre_id": 1,
-                    "chapitre": 1,
-                    "numero": 1,
-                    "embedding": 1,
-                }
-            )
-            
-            all_verses = await cursor.to_list(length=None)
-            
-            if not all_verses:
-                logger.warning("⚠️ Aucun verset avec embedding trouvé. Exécutez le script de pré-calcul des embeddings.")
-                return []
-            
-            # Extraire les embeddings et calculer les similarités
-            verse_embeddings = []
-            verse_data = []
-            
-            for verse in all_verses:
-                embedding = verse.get("embedding")
-                if embedding is not None:
-                    # Convertir la liste MongoDB en numpy array
-                    embedding_array = np.array(embedding)
-                    verse_embeddings.append(embedding_array)
-                    # Retirer l'embedding du dict pour économiser la mémoire
-                    verse_without_embedding = {k: v for k, v in verse.items() if k != "embedding"}
-                    verse_data.append(verse_without_embedding)
-            
-            if not verse_embeddings:
-                logger.warning("⚠️ Aucun embedding valide trouvé dans les versets.")
-                return []
-            
-            # Trouver les versets les plus similaires
-            similar_indices = self._embedding_service.find_most_similar(
-                query_embedding[0],  # Prendre le premier (et seul) embedding de la requête
-                verse_embeddings,
-                top_k=top_k
+                {"_id": {"$in": candidate_ids}},
+                {"contenu": 1, "mots_cles": 1},
             )
-            
-            # Construire les résultats avec les scores
-            results = []
-            for idx, score in similar_indices:
-                verse_result = verse_data[idx].copy()
-                verse_result["vector_score"] = score
-                results.append(verse_result)
-            
-            logger.info(f"✅ Recherche vectorielle: {len(results)} versets trouvés (score max: {results[0]['vector_score']:.3f})")
-            return results
+            documents_by_id = {doc["_id"]: doc for doc in await cursor.to_list(length=len(candidate_ids))}
+
+            candidates = VectorCandidates.from_search(index, similar_rows, documents_by_id)
+            if not len(candidates):
+                return None
+            logger.info(f"✅ Recherche vectorielle: {len(candidates)} versets trouvés (score max: {candidates.vector_scores[0]:.3f})")
+            return candidates
             
         except Exception as e:
             logger.error(f"❌ Erreur lors de la recherche vectorielle: {e}")
             logger.exception("Détails de l'erreur:")
-            return []
+            return None
 
-    def _combine_scores(self, vector_results: List[dict], verse_ids: List[ObjectId], analysis: AnalysisResult) -> List[dict]:
+    def _combine_scores(self, candidates: VectorCandidates, verse_ids: List[ObjectId], analysis: AnalysisResult) -> VectorCandidates:
         """
         Combine les scores vectoriels avec les correspondances émotions/thèmes.
         
-        Score final = score_vectoriel * 0.7 + score_emotions_themes * 0.3
+        Score final = vectoriel * w_vector + émotions/thèmes * w_links
+                      + mots-clés * w_keywords + a priori de longueur * w_length
+        (poids HYBRID_WEIGHT_*, par défaut 0.7 / 0.18 / 0.12 / 0)
         
         Args:
-            vector_results: Résultats de la recherche vectorielle avec scores
+            candidates: Candidats de la recherche vectorielle
             verse_ids: IDs des versets liés aux émotions/thèmes
             analysis: Analyse du texte utilisateur
             
         Returns:
-            Liste de résultats triés par score combiné décroissant
+            Candidats triés par score combiné décroissant
         """
-        verse_ids_set = set(verse_ids)
-        search_terms_lower = [term.lower() for term in analysis.keywords]
-        
-        scored_results = []
-        
-        for verse in vector_results:
-            verse_id = verse.get("_id")
-            vector_score = verse.get("vector_score", 0.0)
-            
-            # Score pour correspondance émotions/thèmes (0.0 à 1.0)
-            emotion_theme_score = 1.0 if verse_id in verse_ids_set else 0.0
-            
-            # Score pour correspondance avec mots-clés dans le contenu
-            contenu = verse.get("contenu", "").lower()
-            keyword_matches = sum(1 for term in search_terms_lower if term in contenu)
-            keyword_score = min(keyword_matches / max(len(search_terms_lower), 1), 1.0)
-            
-            # Score combiné émotions/thèmes + mots-clés
-            semantic_score = (emotion_theme_score * 0.6 + keyword_score * 0.4)
-            
-            # Score final: 70% vectoriel + 30% sémantique
-            final_score = vector_score * 0.7 + semantic_score * 0.3
-            
-            verse["combined_score"] = final_score
-            verse["vector_score"] = vector_score
-            verse["semantic_score"] = semantic_score
-            scored_results.append(verse)
-        
-        # Trier par score combiné décroissant
-        scored_results.sort(key=lambda x: x.get("combined_score", 0.0), reverse=True)
+        ranked = candidates.rank(verse_ids, analysis.keywords, self._hybrid_weights)
         
-        logger.info(f"📊 Scores combinés calculés pour {len(scored_results)} versets")
-        if scored_results:
-            logger.info(f"   Meilleur score: {scored_results[0].get('combined_score', 0.0):.3f} "
-                       f"(vectoriel: {scored_results[0].get('vector_score', 0.0):.3f}, "
-                       f"sémantique: {scored_results[0].get('semantic_score', 0.0):.3f})")
+        logger.info(f"📊 Scores combinés calculés pour {len(ranked)} versets")
+        if len(ranked):
+            logger.info(f"   Meilleur score: {ranked.combined_scores[0]:.3f} "
+                       f"(vectoriel: {ranked.vector_scores[0]:.3f}, "
+                       f"sémantique: {ranked.semantic_scores[0]:.3f})")
         
-        return scored_results
+        return ranked
+
+    @staticmethod
+    def _ranked_verses(ranked: VectorCandidates, limit: int = 5) -> List[dict]:
+        """Versets des ``limit`` premiers candidats classés (dans l'ordre), avec leurs scores."""
+        index = ranked.index
+        results = []
+        for position, row in enumerate(ranked.rows[:limit]):
+            document = ranked.documents[position]
+            verse_result = index.row_metadata(int(row))
+            verse_result["contenu"] = document.get("contenu", "")
+            verse_result["mots_cles"] = document.get("mots_cles", [])
+            verse_result["vector_score"] = float(ranked.vector_scores[position])
+            if ranked.combined_scores is not None:
+                verse_result["combined_score"] = float(ranked.combined_scores[position])
+                verse_result["semantic_score"] = float(ranked.semantic_scores[position])
+            results.append(verse_result)
+        return results
 
     @staticmethod
     def _select_best_verse(results: List[dict], search_terms: List[str]) -> dict:
-        """Sélectionne le meilleur verset basé sur la pertinence avec les termes de recherche."""
+        """
+        Sélectionne le meilleur verset basé sur la pertinence avec les termes de recherche.
+
+        Réservé aux stratégies de repli (au plus 10 versets) : le calcul reste en Python
+        pour garder la sémantique d'origine (mots complets comptés par terme, sous-chaînes,
+        mots-clés inclus l'un dans l'autre), qu'un score vectorisé ne reproduirait pas.
+        """
         if not results:
             return {}
         
         if len(results) == 1:
             return results[0]
         
+        search_terms_lower = [term.lower() for term in search_terms]
+
+        # Expressions des mots complets, compilées une fois pour tous les versets
+        word_patterns = [re.compile(r'\b' + re.escape(term) + r'\b', re.IGNORECASE) for term in search_terms_lower]
+
         # Si plusieurs résultats, choisir celui qui correspond le mieux
         best_score = -1
         best_verse = results[0]
         
-        search_terms_lower = [term.lower() for term in search_terms]
-        
         for verse in results:
-            score = 0
             contenu = verse.get("contenu", "").lower()
             mots_cles = [kw.lower() if isinstance(kw, str) else str(kw).lower() for kw in verse.get("mots_cles", [])]
             
             # Bonus pour chaque terme trouvé dans le contenu (score plus élevé pour les mots complets)
-            for term in search_terms_lower:
-                # Recherche du mot complet (avec limites de mot)
-                word_pattern = re.compile(r'\b' + re.escape(term) + r'\b', re.IGNORECASE)
-                matches = word_pattern.findall(contenu)
-                score += len(matches) * 2  # Bonus pour correspondance exacte de mot
-            
+            score = 0
+            for term, word_pattern in zip(search_terms_lower, word_patterns):
+                score += len(word_pattern.findall(contenu)) * 2  # Bonus pour correspondance exacte de mot
                 # Recherche partielle (moins de points)
                 if term in contenu:
                     score += 1
             
             # Bonus supplémentaire pour les mots-clés correspondants (plus pertinents)
-            for term in search_terms_lower:
-                for mot_cle in mots_cles:
-                    if term in mot_cle or mot_cle in term:
-                        score += 3  # Les mots-clés sont très pertinents
+            score += 3 * sum(
+                1 for term in search_terms_lower for mot_cle in mots_cles if term in mot_cle or mot_cle in term
+            )
             
             # Bonus pour les versets courts (plus impactants)
             longueur = len(contenu)
-            if longueur < 100:
+            if longueur < SHORT_VERSE_LENGTH:
                 score += 1
-            elif longueur > 300:
+            elif longueur > LONG_VERSE_LENGTH:
                 score -= 1  # Pénalité pour les versets très longs
             
             if score > best_score:
@@ -654,6 +744,73 @@ class MongoVerseRetriever:
         # Retirer les doublons
         return list(dict.fromkeys(found_ids))
 
+    async def build_filters(
+        self,
+        books: Optional[Iterable[str]] = None,
+        testament: Optional[str] = None,
+        emotions: Optional[Iterable[str]] = None,
+        themes: Optional[Iterable[str]] = None,
+    ) -> Optional[VerseFilters]:
+        """
+        Construit les filtres de recherche à partir des critères de la requête.
+
+        Les émotions et thèmes sont donnés par nom et résolus en identifiants ; un nom
+        qui ne correspond à rien est ignoré (avec un avertissement) plutôt que de vider
+        la recherche. Lève ValueError si le testament est inconnu.
+        """
+        emotion_ids = await self._resolve_filter_ids(self.emotions, emotions, "emotions")
+        theme_ids = await self._resolve_filter_ids(self.themes, themes, "themes")
+        filters = VerseFilters.create(books, testament, emotion_ids, theme_ids)
+        return None if filters.is_empty else filters
+
+    async def _resolve_filter_ids(
+        self, collection: AsyncIOMotorCollection, names: Optional[Iterable[str]], collection_name: str
+    ) -> List[ObjectId]:
+        """Identifiants des noms demandés : correspondance exacte, sinon matching approché."""
+        names = [name.strip() for name in names or () if name and name.strip()]
+        if not names:
+            return []
+
+        cached_items = await self._load_collection_cache(collection_name)
+        by_name = {item.get("nom", "").lower().strip(): item["_id"] for item in cached_items if item.get("_id")}
+
+        found_ids: List[ObjectId] = []
+        for name in names:
+            exact_id = by_name.get(name.lower())
+            ids = [exact_id] if exact_id is not None else await self._find_ids_by_name(collection, [name], collection_name)
+            if not ids:
+                logger.warning(f"⚠️ Filtre {collection_name} '{name}' introuvable, critère ignoré")
+            found_ids.extend(ids)
+        return list(dict.fromkeys(found_ids))
+
+    @staticmethod
+    async def _run_stage(name: str, stage: Awaitable[T], timeout: float, default: T) -> T:
+        """Exécute une étape de la recherche avec un délai ; en cas d'échec, retourne ``default``."""
+        try:
+            return await asyncio.wait_for(stage, timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ Étape '{name}' abandonnée après {timeout:.1f}s")
+        except Exception as e:
+            logger.warning(f"⚠️ Erreur lors de l'étape '{name}': {e}")
+        return default
+
+    async def _find_linked_verse_ids(
+        self,
+        collection: AsyncIOMotorCollection,
+        names: Iterable[str],
+        collection_name: str,
+        links: AsyncIOMotorCollection,
+        field_name: str,
+    ) -> List[ObjectId]:
+        """IDs des émotions (ou thèmes) correspondant aux noms, puis des versets qui leur sont liés."""
+        ids = await self._find_ids_by_name(collection, names, collection_name)
+        logger.info(f"📊 {collection_name}: {len(ids)} IDs trouvés (recherche: {list(names or [])})")
+        if not ids:
+            return []
+        verse_ids = await self._find_verse_ids_by_link(links, field_name, ids)
+        logger.info(f"📖 Versets liés ({collection_name}): {len(verse_ids)}")
+        return verse_ids
+
     async def _find_verse_ids_by_link(
         self,
         collection: AsyncIOMotorCollection,
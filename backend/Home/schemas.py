@@ -4,10 +4,26 @@ from __future__ import annotations
 
 from typing import List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 
-class AnalysisResult(BaseModel):
+class _DegradableModel(BaseModel):
+    """Résultat qui peut provenir d'un repli local (heuristiques) au lieu de Groq."""
+
+    # Hors schéma : ni exposé par l'API, ni demandé au LLM (with_structured_output)
+    _degraded: bool = PrivateAttr(default=False)
+
+    @property
+    def degraded(self) -> bool:
+        """Résultat de repli : la réponse qui le contient n'est pas mise en cache."""
+        return self._degraded
+
+    def mark_degraded(self):
+        self._degraded = True
+        return self
+
+
+class AnalysisResult(_DegradableModel):
     """Résultat de l'analyse IA du texte utilisateur."""
 
     emotions: List[str] = Field(default_factory=list)
@@ -18,7 +34,7 @@ class AnalysisResult(BaseModel):
     )
 
 
-class SpiritualContent(BaseModel):
+class SpiritualContent(_DegradableModel):
     """Contenu spirituel généré à partir du verset."""
 
     explanation: str
@@ -55,6 +71,26 @@ class VerseRequest(BaseModel):
         default=True,
         description="Inclure ou non les détails d'analyse dans la réponse",
     )
+    books: Optional[List[str]] = Field(
+        default=None,
+        description="Restreindre la recherche à ces livres (abréviations, ex: ['ps', 'pr'])",
+    )
+    testament: Optional[str] = Field(
+        default=None,
+        description="Restreindre la recherche à un testament ('ancien' ou 'nouveau')",
+    )
+    emotions: Optional[List[str]] = Field(
+        default=None,
+        description="Ne retenir que les versets liés à l'une de ces émotions (noms)",
+    )
+    themes: Optional[List[str]] = Field(
+        default=None,
+        description="Ne retenir que les versets liés à l'un de ces thèmes (noms)",
+    )
+    use_cache: bool = Field(
+        default=True,
+        description="Autoriser la réutilisation d'une réponse à un message identique ou très proche",
+    )
 
 
 class VerseResponse(BaseModel):
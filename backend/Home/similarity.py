@@ -0,0 +1,80 @@
+"""Sélection vectorisée des top-k par similarité cosinus (produit scalaire)."""
+
+from __future__ import annotations
+
+from typing import List, Optional
+
+import numpy as np
+
+# En dessous de cette proportion de lignes retenues par le masque, on extrait les
+# lignes avant le produit matriciel plutôt que de masquer les scores après coup.
+_MASK_GATHER_RATIO = 0.5
+
+
+def top_k_similar(
+    query_embeddings: np.ndarray,
+    matrix: np.ndarray,
+    top_k: int = 10,
+    mask: Optional[np.ndarray] = None,
+    row_map: Optional[np.ndarray] = None,
+) -> List[List[tuple[int, float]]]:
+    """
+    Retourne, pour chaque requête, les ``top_k`` lignes de ``matrix`` les plus similaires.
+
+    Un seul produit (Q×D) @ (D×N) est effectué pour tout le batch, puis une sélection
+    partielle (``np.argpartition``) ne trie que les ``top_k`` meilleurs scores.
+
+    Args:
+        query_embeddings: Requête (D,) ou batch de requêtes (Q, D), normalisées
+        matrix: Matrice (N, D) float32 des embeddings des versets
+        top_k: Nombre de résultats par requête
+        mask: Tableau booléen (N,) des lignes autorisées (optionnel)
+        row_map: Indirection (N,) vers les lignes d'une matrice partagée : la ligne
+            candidate ``i`` est ``matrix[row_map[i]]`` (optionnel, voir canonical_embeddings)
+
+    Returns:
+        Une liste par requête de tuples (ligne, score_similarité) triés par score décroissant
+    """
+    queries = np.asarray(query_embeddings, dtype=np.float32)
+    if queries.ndim == 1:
+        queries = queries[None, :]
+
+    rows: Optional[np.ndarray] = None
+    candidates = matrix
+    if mask is not None:
+        mask = np.asarray(mask, dtype=bool)
+        if mask.sum() < _MASK_GATHER_RATIO * len(mask):
+            rows = np.flatnonzero(mask)
+            candidates = matrix[rows if row_map is None else row_map[rows]]
+
+    n_rows = len(row_map) if row_map is not None and rows is None else candidates.shape[0]
+    if n_rows == 0 or top_k <= 0:
+        return [[] for _ in range(len(queries))]
+
+    scores = (candidates @ queries.T).T  # (Q, N)
+    if row_map is not None and rows is None:
+        # Produit sur toute la matrice partagée puis lecture des scores par indirection
+        scores = scores[:, row_map]
+    if mask is not None and rows is None:
+        scores = np.where(mask[None, :], scores, -np.inf)
+
+    k = min(top_k, n_rows)
+    if k < n_rows:
+        best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        best = np.broadcast_to(np.arange(n_rows), (len(queries), n_rows))
+    best_scores = np.take_along_axis(scores, best, axis=1)
+    order = np.argsort(-best_scores, axis=1, kind="stable")
+    best = np.take_along_axis(best, order, axis=1)
+    best_scores = np.take_along_axis(best_scores, order, axis=1)
+
+    if rows is not None:
+        best = rows[best]
+
+    results: List[List[tuple[int, float]]] = []
+    for query_best, query_scores in zip(best, best_scores):
+        finite = np.isfinite(query_scores)
+        results.append(
+            [(int(idx), float(score)) for idx, score in zip(query_best[finite], query_scores[finite])]
+        )
+    return results
@@ -0,0 +1,607 @@
+"""Index vectoriel résident des versets, une instance par traduction."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from .ann_index import IVFFlatIndex
+from .embedding_codec import DEFAULT_EMBEDDING_FIELD, decode_embeddings, embedding_projection
+from .embedding_versions import EmbeddingVersion, default_embedding_version
+from .similarity import top_k_similar
+from .verse_filters import BOOK_TESTAMENTS, VerseFilters
+
+logger = logging.getLogger(__name__)
+
+# Version du format des artefacts sur disque (matrice .npy + fichier .json de métadonnées).
+# À incrémenter si la structure des fichiers change : les anciens artefacts seront ignorés.
+INDEX_FORMAT_VERSION = 1
+
+# Origine des embeddings d'un index : ceux de chaque verset (défaut) ou les embeddings
+# canoniques partagés par toutes les traductions (voir canonical_embeddings)
+VECTOR_INDEX_SOURCES = ("verses", "canonical")
+
+# Nombre de masques de filtres gardés en cache par index
+_MASK_CACHE_SIZE = 128
+
+# Nombre d'identifiants de versets par requête ``$in`` lors du chargement des liens
+_LINKS_CHUNK_SIZE = 5000
+
+
+def _artifact_stem(translation_id: str, field: str) -> str:
+    # Le champ historique garde ses noms de fichiers ; les autres versions ont les leurs
+    if field == DEFAULT_EMBEDDING_FIELD:
+        return f"{translation_id}.v{INDEX_FORMAT_VERSION}"
+    return f"{translation_id}.{field}.v{INDEX_FORMAT_VERSION}"
+
+
+def artifact_paths(
+    directory: str | Path, translation_id: str, field: str = DEFAULT_EMBEDDING_FIELD
+) -> tuple[Path, Path]:
+    """Chemins (matrice, métadonnées) de l'artefact d'une traduction."""
+    stem = _artifact_stem(translation_id, field)
+    directory = Path(directory)
+    return directory / f"{stem}.npy", directory / f"{stem}.json"
+
+
+def ann_artifact_path(directory: str | Path, translation_id: str, field: str = DEFAULT_EMBEDDING_FIELD) -> Path:
+    """Chemin de l'index IVF d'une traduction, à côté de sa matrice d'embeddings."""
+    return Path(directory) / f"{_artifact_stem(translation_id, field)}.ivf.npz"
+
+
+@dataclass
+class VerseVectorIndex:
+    """
+    Matrice d'embeddings float32 contiguë d'une traduction et ses métadonnées.
+
+    La ligne ``i`` de ``embeddings`` correspond au verset ``ids[i]`` ; les autres
+    tableaux sont parallèles à la matrice. Si ``embedding_rows`` est fourni, la
+    matrice est partagée (embeddings canoniques) et le verset ``ids[i]`` a pour
+    embedding ``embeddings[embedding_rows[i]]``. Si ``ann`` est fourni, la recherche
+    passe par l'index approximatif au lieu de comparer toutes les lignes.
+
+    Chaque ligne porte aussi des attributs compacts (code du livre, du testament,
+    et bitsets des émotions/thèmes liés, chargés à la demande) à partir desquels
+    les filtres de recherche deviennent des masques booléens, mis en cache.
+    """
+
+    translation_id: str
+    embeddings: np.ndarray
+    ids: List[ObjectId]
+    refs: List[str]
+    livre_ids: List[Optional[str]]
+    chapitres: np.ndarray
+    numeros: np.ndarray
+    # Ligne de ``embeddings`` de chaque verset quand la matrice est partagée entre traductions
+    embedding_rows: Optional[np.ndarray] = None
+    ann: Optional[IVFFlatIndex] = None
+    nprobe: Optional[int] = None
+    version: Optional[EmbeddingVersion] = None
+    loaded_at: float = field(default_factory=time.time)
+    # Bitsets (np.packbits) des lignes liées à chaque émotion / thème (voir attach_links)
+    emotion_bits: Optional[Dict[ObjectId, np.ndarray]] = field(default=None, repr=False)
+    theme_bits: Optional[Dict[ObjectId, np.ndarray]] = field(default=None, repr=False)
+    book_codes: np.ndarray = field(init=False, repr=False)
+    testament_codes: np.ndarray = field(init=False, repr=False)
+    _book_vocabulary: Dict[str, int] = field(init=False, repr=False)
+    _masks: OrderedDict = field(init=False, repr=False)
+    _rows_by_id: Optional[Dict[ObjectId, int]] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        books = np.asarray([book or "" for book in self.livre_ids], dtype=object)
+        vocabulary, codes = np.unique(books, return_inverse=True) if len(books) else ([], np.empty(0, dtype=np.int64))
+        self._book_vocabulary = {book: code for code, book in enumerate(vocabulary)}
+        self.book_codes = codes.astype(np.int16)
+        book_testaments = np.asarray([BOOK_TESTAMENTS.get(book, -1) for book in vocabulary], dtype=np.int8)
+        self.testament_codes = book_testaments[codes] if len(codes) else np.empty(0, dtype=np.int8)
+        self._masks = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def rows_by_id(self) -> Dict[ObjectId, int]:
+        """Ligne de chaque verset (construit au premier appel)."""
+        if self._rows_by_id is None:
+            self._rows_by_id = {verse_id: row for row, verse_id in enumerate(self.ids)}
+        return self._rows_by_id
+
+    @property
+    def links_loaded(self) -> bool:
+        return self.emotion_bits is not None and self.theme_bits is not None
+
+    def attach_links(
+        self, emotion_rows: Dict[ObjectId, Iterable[int]], theme_rows: Dict[ObjectId, Iterable[int]]
+    ) -> None:
+        """Enregistre, pour chaque émotion / thème, le bitset des lignes qui lui sont liées."""
+
+        def pack(rows_by_target: Dict[ObjectId, Iterable[int]]) -> Dict[ObjectId, np.ndarray]:
+            packed = {}
+            for target_id, rows in rows_by_target.items():
+                bits = np.zeros(len(self), dtype=bool)
+                bits[np.fromiter(rows, dtype=np.int64)] = True
+                packed[target_id] = np.packbits(bits)
+            return packed
+
+        self.emotion_bits = pack(emotion_rows)
+        self.theme_bits = pack(theme_rows)
+        self._masks.clear()
+
+    def _link_mask(self, bits_by_target: Optional[Dict[ObjectId, np.ndarray]], target_ids: Iterable[ObjectId]) -> np.ndarray:
+        if bits_by_target is None:
+            raise RuntimeError("Liens émotions/thèmes non chargés pour cet index (voir VectorIndexRegistry.ensure_links)")
+        packed = np.zeros((len(self) + 7) // 8, dtype=np.uint8)
+        for target_id in target_ids:
+            bits = bits_by_target.get(target_id)
+            if bits is not None:
+                packed |= bits
+        return np.unpackbits(packed, count=len(self)).astype(bool)
+
+    def filter_mask(self, filters: Optional[VerseFilters]) -> Optional[np.ndarray]:
+        """
+        Masque booléen (n,) des lignes retenues par les filtres (None : aucune restriction).
+
+        Les masques sont calculés à partir des attributs par ligne (aucune requête
+        MongoDB) et gardés en cache pour les filtres récurrents.
+        """
+        if filters is None or filters.is_empty:
+            return None
+        mask = self._masks.get(filters)
+        if mask is not None:
+            self._masks.move_to_end(filters)
+            return mask
+
+        mask = np.ones(len(self), dtype=bool)
+        books = filters.allowed_books()
+        if books is not None:
+            codes = [self._book_vocabulary[book] for book in books if book in self._book_vocabulary]
+            mask &= np.isin(self.book_codes, codes)
+        if filters.emotion_ids:
+            mask &= self._link_mask(self.emotion_bits, filters.emotion_ids)
+        if filters.theme_ids:
+            mask &= self._link_mask(self.theme_bits, filters.theme_ids)
+
+        mask.setflags(write=False)
+        self._masks[filters] = mask
+        while len(self._masks) > _MASK_CACHE_SIZE:
+            self._masks.popitem(last=False)
+        return mask
+
+    @property
+    def dimension(self) -> int:
+        return int(self.embeddings.shape[1]) if self.embeddings.ndim == 2 else 0
+
+    @property
+    def shares_embeddings(self) -> bool:
+        return self.embedding_rows is not None
+
+    @property
+    def nbytes(self) -> int:
+        """Taille de la matrice (partagée avec d'autres index si ``shares_embeddings``)."""
+        if self.embedding_rows is not None:
+            return int(self.embeddings.nbytes + self.embedding_rows.nbytes)
+        return int(self.embeddings.nbytes)
+
+    def row_embeddings(self) -> np.ndarray:
+        """Matrice (n, dim) dont la ligne ``i`` est l'embedding du verset ``ids[i]`` (copie si partagée)."""
+        if self.embedding_rows is not None:
+            return self.embeddings[self.embedding_rows]
+        return self.embeddings
+
+    @property
+    def search_backend(self) -> str:
+        return "ivf" if self.ann is not None else "exact"
+
+    def search(
+        self, query_embedding: np.ndarray, top_k: int = 20, mask: Optional[np.ndarray] = None
+    ) -> List[tuple[int, float]]:
+        """
+        Retourne les lignes les plus proches de la requête.
+
+        Args:
+            query_embedding: Embedding normalisé de la requête (dim,)
+            top_k: Nombre de résultats à retourner
+            mask: Tableau booléen (n,) des lignes autorisées (voir ``filter_mask``)
+
+        Returns:
+            Liste de tuples (ligne, score_similarité) triés par score décroissant
+        """
+        if len(self) == 0:
+            return []
+
+        if self.ann is not None:
+            results = self.ann.search(self.embeddings, query_embedding, top_k, self.nprobe, mask)
+            # Filtre très sélectif : les listes explorées peuvent ne pas contenir assez de
+            # lignes autorisées, la recherche exacte sur les lignes du masque est alors exhaustive
+            if mask is None or len(results) >= top_k:
+                return results
+
+        return top_k_similar(query_embedding, self.embeddings, top_k, mask, row_map=self.embedding_rows)[0]
+
+    def row_metadata(self, row: int) -> dict:
+        """Métadonnées du verset à la ligne ``row`` (format document MongoDB)."""
+        return {
+            "_id": self.ids[row],
+            "ref_unique": self.refs[row],
+            "traduction_id": self.translation_id,
+            "livre_id": self.livre_ids[row],
+            "chapitre": int(self.chapitres[row]),
+            "numero": int(self.numeros[row]),
+        }
+
+    def save(
+        self,
+        directory: str | Path,
+        model_name: Optional[str] = None,
+        field: str = DEFAULT_EMBEDDING_FIELD,
+        source: str = "verses",
+    ) -> Path:
+        """
+        Exporte l'index sur disque (matrice float32 ``.npy`` + métadonnées ``.json``).
+
+        Les fichiers sont écrits dans des fichiers temporaires puis renommés, afin
+        qu'un worker ne lise jamais un artefact partiellement écrit.
+
+        Returns:
+            Chemin de la matrice écrite
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        matrix_path, meta_path = artifact_paths(directory, self.translation_id, field)
+
+        tmp_matrix = matrix_path.with_name(matrix_path.name + ".tmp")
+        with open(tmp_matrix, "wb") as f:
+            np.save(f, np.ascontiguousarray(self.row_embeddings(), dtype=np.float32))
+
+        metadata = {
+            "format_version": INDEX_FORMAT_VERSION,
+            "translation_id": self.translation_id,
+            "model": model_name,
+            "field": field,
+            "source": source,
+            "count": len(self),
+            "dimension": self.dimension,
+            "created_at": time.time(),
+            "ids": [str(verse_id) for verse_id in self.ids],
+            "refs": self.refs,
+            "livre_ids": self.livre_ids,
+            "chapitres": self.chapitres.tolist(),
+            "numeros": self.numeros.tolist(),
+        }
+        tmp_meta = meta_path.with_name(meta_path.name + ".tmp")
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(metadata, f, ensure_ascii=False)
+
+        os.replace(tmp_matrix, matrix_path)
+        os.replace(tmp_meta, meta_path)
+        return matrix_path
+
+    @classmethod
+    def load_from_disk(
+        cls,
+        directory: str | Path,
+        translation_id: str,
+        model_name: Optional[str] = None,
+        field: str = DEFAULT_EMBEDDING_FIELD,
+        source: str = "verses",
+    ) -> Optional["VerseVectorIndex"]:
+        """
+        Ouvre l'artefact d'une traduction en mémoire mappée (``np.memmap``).
+
+        Les pages de la matrice sont partagées via le cache du système entre tous
+        les processus qui ouvrent le même fichier : la mémoire ne croît pas avec le
+        nombre de workers.
+
+        Returns:
+            L'index, ou None si l'artefact est absent, incomplet ou d'un autre modèle
+        """
+        matrix_path, meta_path = artifact_paths(directory, translation_id, field)
+        if not matrix_path.exists() or not meta_path.exists():
+            return None
+
+        with open(meta_path, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+
+        if metadata.get("format_version") != INDEX_FORMAT_VERSION:
+            logger.warning(f"⚠️ Artefact {meta_path} d'un format différent, ignoré")
+            return None
+        if model_name and metadata.get("model") and metadata["model"] != model_name:
+            logger.warning(
+                f"⚠️ Artefact {meta_path} calculé avec le modèle {metadata['model']} "
+                f"(modèle actif: {model_name}), ignoré"
+            )
+            return None
+        if metadata.get("source", "verses") != source:
+            logger.warning(
+                f"⚠️ Artefact {meta_path} construit depuis les embeddings {metadata.get('source')} "
+                f"(source active: {source}), ignoré"
+            )
+            return None
+
+        embeddings = np.load(matrix_path, mmap_mode="r")
+        if embeddings.shape[0] != metadata.get("count"):
+            logger.warning(f"⚠️ Artefact {matrix_path} incohérent avec ses métadonnées, ignoré")
+            return None
+
+        return cls(
+            translation_id=translation_id,
+            embeddings=embeddings,
+            ids=[ObjectId(verse_id) for verse_id in metadata["ids"]],
+            refs=metadata["refs"],
+            livre_ids=metadata["livre_ids"],
+            chapitres=np.asarray(metadata["chapitres"], dtype=np.int32),
+            numeros=np.asarray(metadata["numeros"], dtype=np.int32),
+        )
+
+    @classmethod
+    def from_documents(
+        cls, translation_id: str, documents: List[dict], field: str = DEFAULT_EMBEDDING_FIELD
+    ) -> "VerseVectorIndex":
+        """Construit l'index à partir de documents ``versets`` contenant un embedding."""
+        documents = [doc for doc in documents if doc.get(field) is not None]
+        ids: List[ObjectId] = [doc["_id"] for doc in documents]
+        refs: List[str] = [doc.get("ref_unique", "") for doc in documents]
+        livre_ids: List[Optional[str]] = [doc.get("livre_id") for doc in documents]
+        chapitres = [doc.get("chapitre") or 0 for doc in documents]
+        numeros = [doc.get("numero") or 0 for doc in documents]
+
+        # Tableaux BSON ou BinData float16/int8 (voir embedding_codec)
+        embeddings = decode_embeddings(documents, field)
+
+        return cls(
+            translation_id=translation_id,
+            embeddings=embeddings,
+            ids=ids,
+            refs=refs,
+            livre_ids=livre_ids,
+            chapitres=np.asarray(chapitres, dtype=np.int32),
+            numeros=np.asarray(numeros, dtype=np.int32),
+        )
+
+
+class VectorIndexRegistry:
+    """
+    Registre des index vectoriels par traduction.
+
+    Chaque index est chargé une seule fois puis réutilisé par toutes les requêtes,
+    jusqu'à un appel explicite à ``reload`` ou ``invalidate``. Si ``index_dir`` est
+    fourni, l'artefact exporté sur disque est ouvert en mémoire mappée en priorité ;
+    MongoDB n'est lu que si aucun artefact valide n'existe. Avec ``search_backend="ivf"``,
+    l'index IVF construit hors ligne à côté de l'artefact est utilisé s'il existe.
+
+    Un registre sert une seule version d'embeddings (champ + modèle) : changer de
+    version revient à créer un nouveau registre. Avec ``source="canonical"``, les
+    index sont construits à partir des embeddings canoniques (un par verset, partagés
+    entre traductions), chargés une seule fois pour toutes les traductions.
+    """
+
+    def __init__(
+        self,
+        verses: AsyncIOMotorCollection,
+        index_dir: Optional[str] = None,
+        version: Optional[EmbeddingVersion] = None,
+        search_backend: str = "exact",
+        nprobe: Optional[int] = None,
+        source: str = "verses",
+    ) -> None:
+        if source not in VECTOR_INDEX_SOURCES:
+            raise ValueError(f"Source d'index vectoriel inconnue: {source} (attendu: {VECTOR_INDEX_SOURCES})")
+        self._verses = verses
+        self._index_dir = index_dir
+        self.version = version or default_embedding_version()
+        self.source = source
+        self._canonical = None
+        self._search_backend = search_backend
+        self._nprobe = nprobe
+        self._indexes: Dict[str, VerseVectorIndex] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _lock_for(self, translation_id: str) -> asyncio.Lock:
+        lock = self._locks.get(translation_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[translation_id] = lock
+        return lock
+
+    async def get(self, translation_id: str) -> Optional[VerseVectorIndex]:
+        """Retourne l'index de la traduction, en le chargeant au premier appel."""
+        index = self._indexes.get(translation_id)
+        if index is not None:
+            return index
+
+        async with self._lock_for(translation_id):
+            # Un autre appel concurrent a pu charger l'index pendant l'attente
+            index = self._indexes.get(translation_id)
+            if index is None:
+                index = await self._load(translation_id)
+                if index is not None:
+                    self._indexes[translation_id] = index
+            return index
+
+    async def reload(self, translation_id: str) -> Optional[VerseVectorIndex]:
+        """Recharge l'index depuis MongoDB et remplace l'ancien une fois prêt."""
+        # Les embeddings canoniques sont relus eux aussi (ils ont pu être recalculés)
+        self._invalidate_canonical()
+        async with self._lock_for(translation_id):
+            index = await self._load(translation_id)
+            if index is None:
+                self._indexes.pop(translation_id, None)
+            else:
+                self._indexes[translation_id] = index
+            return index
+
+    def invalidate(self, translation_id: Optional[str] = None) -> None:
+        """Oublie l'index d'une traduction (ou de toutes) ; il sera rechargé au prochain accès."""
+        self._invalidate_canonical()
+        if translation_id is None:
+            self._indexes.clear()
+            logger.info("🗑️ Tous les index vectoriels ont été invalidés")
+        else:
+            self._indexes.pop(translation_id, None)
+            logger.info(f"🗑️ Index vectoriel invalidé pour la traduction: {translation_id}")
+
+    def _invalidate_canonical(self) -> None:
+        # Les index déjà chargés gardent leur matrice ; les prochains chargements relisent la collection
+        if self._canonical is not None:
+            self._canonical.invalidate()
+
+    def stats(self) -> Dict[str, dict]:
+        """Résumé des index chargés (taille, dimension, date de chargement)."""
+        return {
+            translation_id: {
+                "rows": len(index),
+                "dimension": index.dimension,
+                "bytes": index.nbytes,
+                "memory_mapped": isinstance(index.embeddings, np.memmap),
+                "shared_embeddings": index.shares_embeddings,
+                "search_backend": index.search_backend,
+                "field": self.version.field,
+                "model": self.version.model,
+                "source": self.source,
+                "loaded_at": index.loaded_at,
+            }
+            for translation_id, index in self._indexes.items()
+        }
+
+    async def ensure_links(self, index: VerseVectorIndex) -> None:
+        """Charge (une fois) les bitsets émotions/thèmes de l'index, nécessaires à ces filtres."""
+        if index.links_loaded:
+            return
+        async with self._lock_for(f"{index.translation_id}:links"):
+            if index.links_loaded:
+                return
+            started = time.perf_counter()
+            emotion_rows = await self._load_links(index, "versets_emotions", "emotion_id")
+            theme_rows = await self._load_links(index, "versets_themes", "theme_id")
+            index.attach_links(emotion_rows, theme_rows)
+            logger.info(
+                f"🔗 Liens chargés pour {index.translation_id}: {len(emotion_rows)} émotions, "
+                f"{len(theme_rows)} thèmes en {time.perf_counter() - started:.2f}s"
+            )
+
+    async def _load_links(self, index: VerseVectorIndex, collection_name: str, field_name: str) -> Dict[ObjectId, List[int]]:
+        links = self._verses.database[collection_name]
+        rows_by_id = index.rows_by_id
+        rows_by_target: Dict[ObjectId, List[int]] = {}
+        for start in range(0, len(index.ids), _LINKS_CHUNK_SIZE):
+            cursor = links.find(
+                {"verset_id": {"$in": index.ids[start : start + _LINKS_CHUNK_SIZE]}},
+                {"_id": 0, "verset_id": 1, field_name: 1},
+            )
+            async for link in cursor:
+                row = rows_by_id.get(link.get("verset_id"))
+                if row is not None and link.get(field_name) is not None:
+                    rows_by_target.setdefault(link[field_name], []).append(row)
+        return rows_by_target
+
+    async def _load(self, translation_id: str) -> Optional[VerseVectorIndex]:
+        if self._index_dir:
+            started = time.perf_counter()
+            try:
+                index = VerseVectorIndex.load_from_disk(
+                    self._index_dir, translation_id, self.version.model, self.version.field, self.source
+                )
+            except Exception as e:
+                logger.error(f"❌ Erreur lors de l'ouverture de l'artefact {translation_id}: {e}")
+                index = None
+            if index is not None:
+                index.version = self.version
+                if self._search_backend == "ivf":
+                    self._attach_ann(index)
+                elapsed = time.perf_counter() - started
+                logger.info(
+                    f"📦 Index vectoriel mappé depuis {self._index_dir} pour {translation_id}: "
+                    f"{len(index)} versets en {elapsed:.3f}s"
+                )
+                return index
+
+        if self._search_backend == "ivf":
+            logger.warning(
+                f"⚠️ Recherche IVF demandée mais aucun artefact sur disque pour {translation_id}, "
+                "utilisation de la recherche exacte"
+            )
+        if self.source == "canonical":
+            return await self._load_from_canonical(translation_id)
+        return await load_index_from_mongo(self._verses, translation_id, self.version)
+
+    async def _load_from_canonical(self, translation_id: str) -> Optional[VerseVectorIndex]:
+        from .canonical_embeddings import CANONICAL_COLLECTION, CanonicalEmbeddingsCache, load_index_from_canonical
+
+        if self._canonical is None:
+            self._canonical = CanonicalEmbeddingsCache(self._verses.database[CANONICAL_COLLECTION], self.version)
+        canonical = await self._canonical.get()
+        if canonical is None:
+            return None
+        return await load_index_from_canonical(self._verses, translation_id, canonical)
+
+    def _attach_ann(self, index: VerseVectorIndex) -> None:
+        path = ann_artifact_path(self._index_dir, index.translation_id, self.version.field)
+        try:
+            ann = IVFFlatIndex.load(path)
+        except Exception as e:
+            logger.error(f"❌ Erreur lors du chargement de l'index IVF {path}: {e}")
+            ann = None
+
+        if ann is None:
+            logger.warning(f"⚠️ Index IVF absent ({path}), utilisation de la recherche exacte")
+            return
+        if ann.n_rows != len(index):
+            logger.warning(f"⚠️ Index IVF {path} incohérent avec l'artefact, utilisation de la recherche exacte")
+            return
+
+        index.ann = ann
+        index.nprobe = self._nprobe
+        logger.info(
+            f"🧭 Index IVF chargé pour {index.translation_id}: {ann.n_lists} listes, "
+            f"nprobe={self._nprobe or ann.nprobe}"
+        )
+
+
+async def load_index_from_mongo(
+    verses: AsyncIOMotorCollection, translation_id: str, version: Optional[EmbeddingVersion] = None
+) -> Optional[VerseVectorIndex]:
+    """
+    Construit l'index d'une traduction à partir des embeddings stockés dans MongoDB.
+
+    Seuls les embeddings produits par le modèle de ``version`` sont chargés (voir
+    ``EmbeddingVersion.embedded_filter``).
+    """
+    version = version or default_embedding_version()
+    started = time.perf_counter()
+    cursor = verses.find(
+        {"traduction_id": translation_id, **version.embedded_filter()},
+        {
+            "ref_unique": 1,
+            "livre_id": 1,
+            "chapitre": 1,
+            "numero": 1,
+            **embedding_projection(version.field),
+        },
+    )
+    documents = await cursor.to_list(length=None)
+    if not documents:
+        logger.warning(
+            f"⚠️ Aucun verset avec embedding pour la traduction {translation_id}. "
+            "Exécutez le script de pré-calcul des embeddings."
+        )
+        return None
+
+    index = VerseVectorIndex.from_documents(translation_id, documents, version.field)
+    index.version = version
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"📦 Index vectoriel chargé pour {translation_id}: {len(index)} versets, "
+        f"{index.nbytes / 1e6:.1f} Mo en {elapsed:.2f}s"
+    )
+    return index
@@ -0,0 +1,94 @@
+"""Filtres de recherche (livres, testament, émotions/thèmes liés) appliqués en masque sur l'index vectoriel."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+from bson import ObjectId
+
+from schema.mongodb_schema import BIBLE_BOOKS
+
+# Testaments, dans l'ordre de leur code dans l'index (-1 : livre inconnu)
+TESTAMENTS = ("ancien_testament", "nouveau_testament")
+
+_TESTAMENT_ALIASES = {
+    "ancien_testament": "ancien_testament",
+    "ancien": "ancien_testament",
+    "at": "ancien_testament",
+    "ot": "ancien_testament",
+    "old": "ancien_testament",
+    "nouveau_testament": "nouveau_testament",
+    "nouveau": "nouveau_testament",
+    "nt": "nouveau_testament",
+    "new": "nouveau_testament",
+}
+
+# Abréviation du livre → code du testament
+BOOK_TESTAMENTS: Dict[str, int] = {
+    book["abreviation"]: code
+    for code, testament in enumerate(TESTAMENTS)
+    for book in BIBLE_BOOKS[testament]
+}
+
+
+def normalize_testament(testament: Optional[str]) -> Optional[str]:
+    """Nom canonique d'un testament (``ancien_testament`` / ``nouveau_testament``), ou None."""
+    if not testament:
+        return None
+    normalized = _TESTAMENT_ALIASES.get(testament.lower().strip())
+    if normalized is None:
+        raise ValueError(f"Testament inconnu: {testament} (attendu: ancien ou nouveau)")
+    return normalized
+
+
+@dataclass(frozen=True)
+class VerseFilters:
+    """
+    Restriction des versets candidats. Les critères se cumulent (ET) ; à l'intérieur
+    d'un critère, les valeurs sont alternatives (OU) : ``books=("ps", "pr")`` garde les
+    Psaumes et les Proverbes.
+    """
+
+    books: Tuple[str, ...] = ()
+    testament: Optional[str] = None
+    emotion_ids: Tuple[ObjectId, ...] = ()
+    theme_ids: Tuple[ObjectId, ...] = ()
+
+    @classmethod
+    def create(
+        cls,
+        books: Optional[Iterable[str]] = None,
+        testament: Optional[str] = None,
+        emotion_ids: Optional[Iterable[ObjectId]] = None,
+        theme_ids: Optional[Iterable[ObjectId]] = None,
+    ) -> "VerseFilters":
+        return cls(
+            books=tuple(sorted({book.lower().strip() for book in books or () if book and book.strip()})),
+            testament=normalize_testament(testament),
+            emotion_ids=tuple(sorted(set(emotion_ids or ()))),
+            theme_ids=tuple(sorted(set(theme_ids or ()))),
+        )
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.books or self.testament or self.emotion_ids or self.theme_ids)
+
+    @property
+    def needs_links(self) -> bool:
+        return bool(self.emotion_ids or self.theme_ids)
+
+    def allowed_books(self) -> Optional[Tuple[str, ...]]:
+        """Livres autorisés par les critères livres + testament (None : pas de restriction)."""
+        if not self.books and not self.testament:
+            return None
+        books = self.books or tuple(BOOK_TESTAMENTS)
+        if self.testament:
+            code = TESTAMENTS.index(self.testament)
+            books = tuple(book for book in books if BOOK_TESTAMENTS.get(book) == code)
+        return books
+
+    def mongo_filter(self) -> dict:
+        """Équivalent MongoDB des critères livres/testament (recherches de repli hors index)."""
+        books = self.allowed_books()
+        return {"livre_id": {"$in": list(books)}} if books is not None else {}
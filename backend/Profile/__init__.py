@@ -7,6 +7,8 @@ from datetime import datetime
 
 from fastapi import APIRouter, HTTPException, Query
 
+from database import get_database
+
 from .schemas import (
     BibleVersionsResponse,
     LanguageItem,
@@ -30,7 +32,7 @@ def get_service() -> ProfileService:
     global _service
     if _service is None:
         try:
-            _service = ProfileService()
+            _service = ProfileService(get_database())
             logger.info("✅ ProfileService initialisé avec succès")
         except Exception as e:
             logger.error(f"❌ Erreur lors de l'initialisation de ProfileService: {e}")
@@ -3,13 +3,14 @@
 from __future__ import annotations
 
 import logging
-import os
 from datetime import datetime, timedelta
 from typing import Optional
 
 from bson import ObjectId
 from dotenv import load_dotenv
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+
+from database import get_database
 
 from .schemas import ProfilePreferences, ProfileStats
 
@@ -39,23 +40,15 @@ LANGUAGE_NAMES = {
 class ProfileService:
     """Service pour gérer les profils utilisateur dans MongoDB."""
 
-    def __init__(self) -> None:
-        mongo_url = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
-        mongo_db = os.getenv("MONGODB_DATABASE", "parole_du_moment_db")
-
-        logger.info(f"🔌 Connexion ProfileService à MongoDB: {mongo_url}")
-        logger.info(f"📚 Base de données: {mongo_db}")
+    def __init__(self, db: Optional[AsyncIOMotorDatabase] = None) -> None:
+        # Base sur le client MongoDB partagé par tous les services (voir database.py)
+        self._db = db if db is not None else get_database()
+        self._client = self._db.client
+        logger.info(f"📚 ProfileService sur la base: {self._db.name}")
 
-        try:
-            self._client = AsyncIOMotorClient(
-                mongo_url,
-                serverSelectionTimeoutMS=5000,
-            )
-            self._db = self._client[mongo_db]
-            logger.info("✅ Client MongoDB créé pour ProfileService")
-        except Exception as e:
-            logger.error(f"❌ Erreur lors de la connexion MongoDB: {e}")
-            raise
+    async def ping(self) -> None:
+        """Vérifie la connexion MongoDB (ouvre le pool de connexions)."""
+        await self._client.admin.command("ping")
 
     @property
     def profiles(self) -> AsyncIOMotorCollection:
@@ -2,16 +2,29 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import logging
 import os
+from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from Home import router as home_router
+from Home.circuit_breaker import circuit_breaker_stats
+from Home.content_store import get_content_store
+from Home.embedding_batcher import get_embedding_batcher
+from Home.embeddings import get_embedding_service
+from Home.response_cache import get_response_cache
 from Profile import router as profile_router
 from Assistant import router as assistant_router
+from Assistant.prompts import get_prompt_registry
+from database import close_mongo_client, get_mongo_client, mongo_pool_stats
+from http_client import close_llm_http_client, llm_http_pool_stats
+from warmup import WarmupState, run_warmup, warmup_enabled
 
 load_dotenv()
 
@@ -20,10 +33,36 @@ logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
 logger = logging.getLogger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Ouvre le client MongoDB partagé, et le ferme à l'arrêt.
+
+    Avec WARMUP_ON_STARTUP=true, précharge modèles, connexions MongoDB, caches et
+    index en tâche de fond : ``/health`` répond tout de suite, ``/ready`` seulement
+    une fois le préchargement terminé.
+    """
+    # Client MongoDB partagé par tous les services (un seul pool par worker)
+    get_mongo_client()
+    state = WarmupState(warmup_enabled())
+    app.state.warmup = state
+    task = asyncio.create_task(run_warmup(state)) if state.enabled else None
+    try:
+        yield
+    finally:
+        if task is not None and not task.done():
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        await close_llm_http_client()
+        close_mongo_client()
+
+
 app = FastAPI(
     title="Parole du Moment API",
     version="1.0.0",
     description="API Spirituelle - Home (LangChain + MongoDB)",
+    lifespan=lifespan,
 )
 
 
@@ -41,6 +80,28 @@ async def health_check() -> dict[str, str]:
     return {"status": "ok", "service": "home"}
 
 
+@app.get("/ready", tags=["health"])
+async def readiness_check() -> JSONResponse:
+    """Disponibilité : 503 tant que le préchargement n'est pas terminé."""
+    state: WarmupState = app.state.warmup
+    return JSONResponse(status_code=200 if state.ready else 503, content=state.as_dict())
+
+
+@app.get("/metrics", tags=["health"])
+async def metrics() -> dict:
+    """Compteurs internes (caches, pools) pour le monitoring."""
+    return {
+        "embedding_cache": get_embedding_service().cache_stats(),
+        "embedding_batcher": get_embedding_batcher().stats(),
+        "mongo": mongo_pool_stats(),
+        "llm_http": llm_http_pool_stats(),
+        "response_cache": get_response_cache().stats(),
+        "content_store": get_content_store().stats(),
+        "circuit_breakers": circuit_breaker_stats(),
+        "assistant_prompt": get_prompt_registry().stats(),
+    }
+
+
 app.include_router(home_router)
 app.include_router(profile_router)
 app.include_router(assistant_router)
@@ -0,0 +1,149 @@
+"""Client MongoDB partagé par tous les services (un seul pool de connexions par worker)."""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Variables d'environnement → options du client (entiers, en millisecondes pour les délais)
+_INT_OPTIONS = {
+    "MONGODB_MAX_POOL_SIZE": "maxPoolSize",
+    "MONGODB_MIN_POOL_SIZE": "minPoolSize",
+    "MONGODB_MAX_IDLE_TIME_MS": "maxIdleTimeMS",
+    "MONGODB_WAIT_QUEUE_TIMEOUT_MS": "waitQueueTimeoutMS",
+    "MONGODB_CONNECT_TIMEOUT_MS": "connectTimeoutMS",
+    "MONGODB_SOCKET_TIMEOUT_MS": "socketTimeoutMS",
+    "MONGODB_SERVER_SELECTION_TIMEOUT_MS": "serverSelectionTimeoutMS",
+}
+
+
+def mongo_client_options() -> dict:
+    """
+    Options du client lues dans l'environnement.
+
+    Seules les variables définies sont transmises (valeurs par défaut de pymongo
+    sinon), à l'exception du délai de sélection du serveur, gardé à 5 s.
+    MONGODB_COMPRESSORS (ex: ``zstd,snappy``) active la compression réseau ; un
+    algorithme dont le module Python (``zstandard``, ``python-snappy``) n'est pas
+    installé est ignoré par pymongo avec un avertissement.
+    """
+    options: dict = {"serverSelectionTimeoutMS": 5000}
+    for env_name, option in _INT_OPTIONS.items():
+        value = os.getenv(env_name)
+        if value:
+            options[option] = int(value)
+    compressors = os.getenv("MONGODB_COMPRESSORS")
+    if compressors:
+        options["compressors"] = compressors
+    return options
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Compteurs d'utilisation des pools de connexions (un par serveur MongoDB)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pools: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {
+                "open": 0,
+                "in_use": 0,
+                "waiting": 0,
+                "checkouts": 0,
+                "checkout_failures": 0,
+                "cleared": 0,
+            }
+        )
+
+    def _update(self, event, **deltas: int) -> None:
+        address = "%s:%s" % event.address
+        with self._lock:
+            pool = self._pools[address]
+            for key, delta in deltas.items():
+                pool[key] += delta
+
+    def pool_created(self, event) -> None:
+        self._update(event)
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        self._update(event, cleared=1)
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_created(self, event) -> None:
+        self._update(event, open=1)
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_closed(self, event) -> None:
+        self._update(event, open=-1)
+
+    def connection_check_out_started(self, event) -> None:
+        self._update(event, waiting=1)
+
+    def connection_check_out_failed(self, event) -> None:
+        self._update(event, waiting=-1, checkout_failures=1)
+
+    def connection_checked_out(self, event) -> None:
+        self._update(event, waiting=-1, in_use=1, checkouts=1)
+
+    def connection_checked_in(self, event) -> None:
+        self._update(event, in_use=-1)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {address: dict(pool) for address, pool in self._pools.items()}
+
+
+# Client partagé (singleton) et compteurs de ses pools
+_client: Optional[AsyncIOMotorClient] = None
+_pool_metrics = PoolMetrics()
+
+
+def get_mongo_client() -> AsyncIOMotorClient:
+    """Retourne le client MongoDB partagé (créé au premier appel)."""
+    global _client
+    if _client is None:
+        mongo_url = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
+        options = mongo_client_options()
+        logger.info(f"🔌 Connexion à MongoDB: {mongo_url} ({options})")
+        _client = AsyncIOMotorClient(mongo_url, event_listeners=[_pool_metrics], **options)
+    return _client
+
+
+def get_database(name: Optional[str] = None) -> AsyncIOMotorDatabase:
+    """Base de données applicative (MONGODB_DATABASE par défaut) sur le client partagé."""
+    return get_mongo_client()[name or os.getenv("MONGODB_DATABASE", "parole_du_moment_db")]
+
+
+def close_mongo_client() -> None:
+    """Ferme le client partagé et ses connexions (arrêt de l'application)."""
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+        logger.info("🔌 Client MongoDB fermé")
+
+
+def mongo_pool_stats() -> dict:
+    """Options du client et utilisation des pools, pour ``/metrics``."""
+    return {
+        "connected": _client is not None,
+        "options": mongo_client_options(),
+        "pools": _pool_metrics.stats(),
+    }
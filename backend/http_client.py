@@ -0,0 +1,213 @@
+"""Client HTTP asynchrone partagé par les clients LLM (Groq, Ollama) : un seul pool de connexions par worker."""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Événements httpcore qui marquent la fin de l'attente d'une connexion du pool
+_CONNECT_EVENT = "connection.connect_tcp.started"
+_TLS_EVENT = "connection.start_tls.started"
+_SEND_EVENTS = ("http11.send_request_headers.started", "http2.send_request_headers.started")
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+def http2_available() -> bool:
+    """HTTP/2 nécessite le module ``h2`` (``pip install httpx[http2]``)."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def llm_http_timeout() -> httpx.Timeout:
+    """
+    Délais des appels LLM (secondes).
+
+    Ils sont aussi à passer en ``timeout`` à ``ChatOpenAI`` : sans cela, le client
+    OpenAI remplace ceux du client HTTP par une absence de délai.
+    """
+    return httpx.Timeout(
+        connect=_env_float("LLM_HTTP_CONNECT_TIMEOUT", 5.0),
+        read=_env_float("LLM_HTTP_READ_TIMEOUT", 60.0),
+        write=_env_float("LLM_HTTP_WRITE_TIMEOUT", 10.0),
+        pool=_env_float("LLM_HTTP_POOL_TIMEOUT", 10.0),
+    )
+
+
+def llm_http_limits() -> httpx.Limits:
+    """Taille du pool et durée de vie des connexions inactives (keep-alive)."""
+    return httpx.Limits(
+        max_connections=int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "20")),
+        keepalive_expiry=_env_float("LLM_HTTP_KEEPALIVE_EXPIRY", 30.0),
+    )
+
+
+def llm_http2_requested() -> bool:
+    return os.getenv("LLM_HTTP2", "true").lower() in ("1", "true", "yes")
+
+
+def llm_http2_enabled() -> bool:
+    """HTTP/2 (multiplexage sur une connexion TLS) si LLM_HTTP2 est actif et ``h2`` installé."""
+    return llm_http2_requested() and http2_available()
+
+
+class HttpPoolMetrics:
+    """
+    Compteurs par hôte : requêtes, connexions ouvertes (TCP, TLS), réutilisations et
+    temps d'attente d'une connexion du pool.
+
+    L'attente est mesurée du début de la requête jusqu'au premier événement httpcore
+    (ouverture d'une connexion ou envoi des en-têtes sur une connexion réutilisée).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: {
+                "requests": 0,
+                "in_flight": 0,
+                "errors": 0,
+                "connections_opened": 0,
+                "tls_handshakes": 0,
+                "reused": 0,
+                "pool_wait_total_ms": 0.0,
+                "pool_wait_max_ms": 0.0,
+            }
+        )
+
+    def _update(self, host: str, **deltas: float) -> None:
+        with self._lock:
+            counters = self._hosts[host]
+            for key, delta in deltas.items():
+                counters[key] += delta
+
+    def request_started(self, host: str) -> None:
+        self._update(host, requests=1, in_flight=1)
+
+    def request_finished(self, host: str, failed: bool) -> None:
+        self._update(host, in_flight=-1, errors=int(failed))
+
+    def connection_acquired(self, host: str, wait_ms: float, reused: bool) -> None:
+        with self._lock:
+            counters = self._hosts[host]
+            counters["pool_wait_total_ms"] += wait_ms
+            counters["pool_wait_max_ms"] = max(counters["pool_wait_max_ms"], wait_ms)
+            counters["reused" if reused else "connections_opened"] += 1
+
+    def tls_handshake(self, host: str) -> None:
+        self._update(host, tls_handshakes=1)
+
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            hosts = {}
+            for host, counters in self._hosts.items():
+                acquired = counters["reused"] + counters["connections_opened"]
+                hosts[host] = {
+                    **counters,
+                    "pool_wait_total_ms": round(counters["pool_wait_total_ms"], 3),
+                    "pool_wait_max_ms": round(counters["pool_wait_max_ms"], 3),
+                    "pool_wait_avg_ms": round(counters["pool_wait_total_ms"] / acquired, 3) if acquired else 0.0,
+                }
+            return hosts
+
+
+class _InstrumentedTransport(httpx.AsyncHTTPTransport):
+    """Transport httpx qui alimente ``HttpPoolMetrics`` via l'extension ``trace`` de httpcore."""
+
+    def __init__(self, metrics: HttpPoolMetrics, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._metrics = metrics
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.netloc.decode("ascii")
+        started = time.perf_counter()
+        acquired = False
+        previous_trace = request.extensions.get("trace")
+
+        async def trace(event_name: str, info: dict) -> None:
+            nonlocal acquired
+            if not acquired and (event_name == _CONNECT_EVENT or event_name in _SEND_EVENTS):
+                acquired = True
+                wait_ms = (time.perf_counter() - started) * 1000
+                self._metrics.connection_acquired(host, wait_ms, reused=event_name != _CONNECT_EVENT)
+            elif event_name == _TLS_EVENT:
+                self._metrics.tls_handshake(host)
+            if previous_trace is not None:
+                await previous_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+        self._metrics.request_started(host)
+        failed = True
+        try:
+            response = await super().handle_async_request(request)
+            failed = False
+            return response
+        finally:
+            self._metrics.request_finished(host, failed)
+
+
+# Client partagé (singleton) et compteurs de son pool
+_client: Optional[httpx.AsyncClient] = None
+_pool_metrics = HttpPoolMetrics()
+
+
+def get_llm_http_client() -> httpx.AsyncClient:
+    """Retourne le client HTTP partagé des LLM (créé au premier appel)."""
+    global _client
+    if _client is None:
+        limits = llm_http_limits()
+        http2 = llm_http2_enabled()
+        if llm_http2_requested() and not http2:
+            logger.info("ℹ️ Module h2 absent : les appels LLM restent en HTTP/1.1 (pip install httpx[http2])")
+        _client = httpx.AsyncClient(
+            transport=_InstrumentedTransport(_pool_metrics, limits=limits, http2=http2),
+            timeout=llm_http_timeout(),
+        )
+        logger.info(
+            f"🔌 Client HTTP des LLM: {limits.max_connections} connexions max, "
+            f"{limits.max_keepalive_connections} en keep-alive, HTTP/2 {'actif' if http2 else 'inactif'}"
+        )
+    return _client
+
+
+async def close_llm_http_client() -> None:
+    """Ferme le client partagé et ses connexions (arrêt de l'application)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        logger.info("🔌 Client HTTP des LLM fermé")
+
+
+def llm_http_pool_stats() -> dict:
+    """Configuration du client et utilisation du pool, pour ``/metrics``."""
+    limits = llm_http_limits()
+    timeout = llm_http_timeout()
+    return {
+        "connected": _client is not None,
+        "http2": llm_http2_enabled(),
+        "limits": {
+            "max_connections": limits.max_connections,
+            "max_keepalive_connections": limits.max_keepalive_connections,
+            "keepalive_expiry": limits.keepalive_expiry,
+        },
+        "timeouts": {"connect": timeout.connect, "read": timeout.read, "write": timeout.write, "pool": timeout.pool},
+        "hosts": _pool_metrics.stats(),
+    }
@@ -75,9 +75,38 @@ MONGODB_SCHEMA = {
             "ref_unique": "string",
             "mots_cles": ["string"],  # Mots-clés extraits pour la recherche
             "longueur": "number",     # Longueur du verset
+            "embedding": "array | BinData",  # Embedding du contenu (voir Home/embedding_codec.py)
+            "embedding_model": "string",     # Modèle ayant produit l'embedding
+            "embedding_hash": "string",      # Empreinte du contenu encodé
             "created_at": "datetime"
         }
     },
+
+    # Collection: versets_canoniques (un embedding par verset, partagé entre traductions)
+    "versets_canoniques": {
+        "indexes": [],
+        "sample_document": {
+            "_id": "string",               # Clé canonique livre_id.chapitre.numero (ex: gn.1.1)
+            "livre_id": "string",
+            "chapitre": "number",
+            "numero": "number",
+            "embedding": "array | BinData",
+            "embedding_model": "string",
+            "embedding_hash": "string",    # Empreinte du texte pivot encodé
+            "source_translation": "string"  # Traduction pivot, ou "mean"
+        }
+    },
+
+    # Collection: embedding_versions (version active des embeddings : champ + modèle)
+    "embedding_versions": {
+        "indexes": [],
+        "sample_document": {
+            "_id": "active",
+            "field": "string",   # Ex: embedding, embedding_v2
+            "model": "string",
+            "activated_at": "number"
+        }
+    },
     
     # Collection: themes
     "themes": {
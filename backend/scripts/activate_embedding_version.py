@@ -0,0 +1,106 @@
+"""Script pour activer une version d'embeddings (champ + modèle) une fois calculée pour tous les versets."""
+
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+# Ajouter le dossier backend au path pour les imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from Home.embedding_versions import (
+    EmbeddingVersion,
+    count_missing_embeddings,
+    get_active_embedding_version,
+    set_active_embedding_version,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Charger le .env depuis le dossier backend
+env_path = backend_dir / ".env"
+if env_path.exists():
+    load_dotenv(dotenv_path=env_path)
+else:
+    load_dotenv()
+
+
+async def activate_embedding_version(version: EmbeddingVersion, force: bool = False) -> bool:
+    """
+    Active ``version`` si chaque verset avec contenu a un embedding de ce modèle.
+
+    Args:
+        version: Version à activer
+        force: Si True, active même si des versets n'ont pas encore d'embedding
+
+    Returns:
+        True si la version a été activée
+    """
+    mongo_url = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
+    mongo_db = os.getenv("MONGODB_DATABASE", "parole_du_moment_db")
+    client = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=5000)
+    db = client[mongo_db]
+
+    try:
+        current = await get_active_embedding_version(db)
+        logger.info(f"📌 Version active: {current.field} ({current.model})")
+        if current == version:
+            logger.info("✅ Cette version est déjà active")
+            return True
+
+        verses = db["versets"]
+        translation_ids = await verses.distinct("traduction_id")
+        incomplete = {}
+        for translation_id in translation_ids:
+            missing = await count_missing_embeddings(verses, version, translation_id)
+            if missing:
+                incomplete[translation_id] = missing
+
+        if incomplete:
+            for translation_id, missing in sorted(incomplete.items()):
+                logger.warning(f"⚠️ {translation_id}: {missing} versets sans embedding {version.field} ({version.model})")
+            if not force:
+                logger.error("❌ Version incomplète, non activée (--force pour passer outre)")
+                return False
+
+        previous = await set_active_embedding_version(db, version)
+        logger.info(f"🔀 Version activée: {version.field} ({version.model})")
+        if previous:
+            logger.info(f"   Précédente: {previous.field} ({previous.model}), conservée pour un retour arrière")
+        logger.info(
+            "   Les workers basculent à la prochaine relecture (EMBEDDING_VERSION_REFRESH_SECONDS) "
+            "ou immédiatement via POST /api/home/index/reload."
+        )
+        return True
+    finally:
+        client.close()
+
+
+async def main():
+    """Point d'entrée principal."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Active une version d'embeddings pour la recherche vectorielle")
+    parser.add_argument("--field", type=str, required=True, help="Champ des embeddings (ex: embedding_v2)")
+    parser.add_argument("--model", type=str, required=True, help="Modèle qui a produit ces embeddings")
+    parser.add_argument("--force", action="store_true", help="Active même si des versets n'ont pas d'embedding")
+
+    args = parser.parse_args()
+
+    try:
+        activated = await activate_embedding_version(EmbeddingVersion(args.field, args.model), args.force)
+    except Exception as e:
+        logger.exception(f"❌ Erreur fatale: {e}")
+        sys.exit(1)
+    if not activated:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
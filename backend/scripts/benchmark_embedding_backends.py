@@ -0,0 +1,124 @@
+"""
+Vérifie la parité et mesure la latence d'un backend d'embeddings face au backend torch.
+
+La parité est la similarité cosinus entre les embeddings torch et ceux du backend
+évalué, sur un échantillon de versets. Le script sort en erreur (code 1) si la
+moyenne passe sous --min-cosine, pour servir de garde-fou avant un déploiement.
+
+Ce contrôle n'est exécuté par aucune suite automatique : il est à lancer à la main
+avant d'activer EMBEDDING_BACKEND=onnx et après chaque nouvel export du modèle.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+# Ajouter le dossier backend au path pour les imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from Home.embeddings import EmbeddingService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Charger le .env depuis le dossier backend
+env_path = backend_dir / ".env"
+if env_path.exists():
+    load_dotenv(dotenv_path=env_path)
+else:
+    load_dotenv()
+
+
+async def sample_verses(translation_id: str, sample_size: int) -> List[str]:
+    """Tire un échantillon aléatoire de contenus de versets depuis MongoDB."""
+    mongo_url = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
+    mongo_db = os.getenv("MONGODB_DATABASE", "parole_du_moment_db")
+    client = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=5000)
+    try:
+        cursor = client[mongo_db]["versets"].aggregate([
+            {"$match": {"traduction_id": translation_id}},
+            {"$sample": {"size": sample_size}},
+            {"$project": {"contenu": 1}},
+        ])
+        return [doc["contenu"] for doc in await cursor.to_list(length=sample_size) if doc.get("contenu")]
+    finally:
+        client.close()
+
+
+def _latency(service: EmbeddingService, texts: List[str], batch_size: int) -> str:
+    single = []
+    for text in texts[:50]:
+        started = time.perf_counter()
+        service.encode(text, use_cache=False)
+        single.append(time.perf_counter() - started)
+    started = time.perf_counter()
+    for start in range(0, len(texts), batch_size):
+        service.encode(texts[start : start + batch_size], use_cache=False)
+    per_text = (time.perf_counter() - started) / len(texts)
+    p50, p95 = np.percentile(np.asarray(single) * 1000, [50, 95])
+    return f"requête seule p50={p50:.1f}ms p95={p95:.1f}ms | batch {batch_size}: {per_text * 1000:.2f}ms/texte"
+
+
+def compare(texts: List[str], candidate_backend: str, batch_size: int, min_cosine: float) -> bool:
+    reference = EmbeddingService(backend="torch")
+    candidate = EmbeddingService(backend=candidate_backend)
+    logger.info(f"📊 {len(texts)} versets — torch vs {candidate.backend_label}")
+
+    expected = reference.encode(texts, use_cache=False)
+    actual = candidate.encode(texts, use_cache=False)
+    cosines = np.sum(expected * actual, axis=1) / (
+        np.linalg.norm(expected, axis=1) * np.linalg.norm(actual, axis=1)
+    )
+    logger.info(
+        f"   Parité cosinus: moyenne={cosines.mean():.4f} min={cosines.min():.4f} "
+        f"p01={np.percentile(cosines, 1):.4f}"
+    )
+
+    logger.info(f"   torch: {_latency(reference, texts, batch_size)}")
+    logger.info(f"   {candidate.backend_label}: {_latency(candidate, texts, batch_size)}")
+
+    if cosines.mean() < min_cosine:
+        logger.error(f"❌ Parité insuffisante: {cosines.mean():.4f} < {min_cosine}")
+        return False
+    logger.info("✅ Parité OK")
+    return True
+
+
+def main():
+    """Point d'entrée principal."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Parité et latence d'un backend d'embeddings face à torch")
+    parser.add_argument("--backend", type=str, default=os.getenv("EMBEDDING_BACKEND", "onnx"), help="Backend évalué (défaut: onnx)")
+    parser.add_argument("--translation", type=str, default="lsg", help="Traduction échantillonnée (défaut: lsg)")
+    parser.add_argument("--sample", type=int, default=500, help="Nombre de versets échantillonnés (défaut: 500)")
+    parser.add_argument("--texts-file", type=str, default=None, help="Fichier de textes (un par ligne) à la place de MongoDB")
+    parser.add_argument("--batch-size", type=int, default=32, help="Taille des batches pour la latence (défaut: 32)")
+    parser.add_argument("--min-cosine", type=float, default=0.99, help="Cosinus moyen minimal accepté (défaut: 0.99)")
+
+    args = parser.parse_args()
+
+    if args.texts_file:
+        with open(args.texts_file, "r", encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+    else:
+        texts = asyncio.run(sample_verses(args.translation, args.sample))
+    if not texts:
+        logger.error("❌ Aucun texte à comparer")
+        sys.exit(1)
+
+    if not compare(texts, args.backend, args.batch_size, args.min_cosine):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Benchmarks de la recherche vectorielle.
+
+- Sur un artefact exporté : recall@k / latence de la recherche IVF face à la recherche exacte.
+- Sur des matrices synthétiques (--synthetic-rows) : sélection top-k historique
+  (liste de vecteurs + argsort complet) face à la sélection vectorisée (argpartition, batch).
+"""
+
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+# Ajouter le dossier backend au path pour les imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from Home.ann_index import IVFFlatIndex
+from Home.similarity import top_k_similar
+from Home.vector_index import VerseVectorIndex, ann_artifact_path
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Charger le .env depuis le dossier backend
+env_path = backend_dir / ".env"
+if env_path.exists():
+    load_dotenv(dotenv_path=env_path)
+else:
+    load_dotenv()
+
+
+def _load_queries(index: VerseVectorIndex, n_queries: int, queries_file: Optional[str], seed: int) -> np.ndarray:
+    """Requêtes réelles (fichier texte, une par ligne) ou versets bruités tirés de l'index."""
+    if queries_file:
+        from Home.embeddings import get_embedding_service
+
+        with open(queries_file, "r", encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+        return get_embedding_service().encode(texts).astype(np.float32)
+
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(index), min(n_queries, len(index)), replace=False)
+    queries = np.asarray(index.embeddings[rows], dtype=np.float32)
+    queries = queries + rng.normal(scale=0.05, size=queries.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def _percentiles(latencies: List[float]) -> str:
+    p50, p95 = np.percentile(np.asarray(latencies) * 1000, [50, 95])
+    return f"p50={p50:.2f}ms p95={p95:.2f}ms"
+
+
+def benchmark(index_dir: str, translation_id: str, nprobes: List[int], top_k: int, n_queries: int, queries_file: Optional[str], seed: int) -> None:
+    index = VerseVectorIndex.load_from_disk(index_dir, translation_id)
+    if index is None:
+        raise FileNotFoundError(f"Aucun artefact pour {translation_id} dans {index_dir}")
+
+    ann = IVFFlatIndex.load(ann_artifact_path(index_dir, translation_id))
+    if ann is None:
+        raise FileNotFoundError(f"Aucun index IVF pour {translation_id}. Lancez scripts/build_ann_index.py.")
+
+    queries = _load_queries(index, n_queries, queries_file, seed)
+    logger.info(f"📊 {translation_id}: {len(index)} versets, {ann.n_lists} listes, {len(queries)} requêtes, top_k={top_k}")
+
+    exact_results = []
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        exact_results.append({row for row, _ in index.search(query, top_k)})
+        latencies.append(time.perf_counter() - started)
+    logger.info(f"   exact          recall@{top_k}=1.000 {_percentiles(latencies)}")
+
+    for nprobe in nprobes:
+        recalls = []
+        latencies = []
+        for query, expected in zip(queries, exact_results):
+            started = time.perf_counter()
+            found = ann.search(index.embeddings, query, top_k, nprobe)
+            latencies.append(time.perf_counter() - started)
+            recalls.append(len(expected & {row for row, _ in found}) / max(len(expected), 1))
+        logger.info(f"   ivf nprobe={nprobe:<4} recall@{top_k}={np.mean(recalls):.3f} {_percentiles(latencies)}")
+
+
+def _legacy_top_k(query: np.ndarray, vectors: List[np.ndarray], top_k: int) -> List[tuple[int, float]]:
+    """Ancienne implémentation de find_most_similar (référence du benchmark)."""
+    verse_array = np.array(vectors)
+    similarities = np.dot(verse_array, query)
+    top_indices = np.argsort(similarities)[::-1][:top_k]
+    return [(int(idx), float(similarities[idx])) for idx in top_indices]
+
+
+def _timed(function, repeats: int) -> List[float]:
+    latencies = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def benchmark_top_k(rows_list: List[int], dimension: int, top_k: int, batch_size: int, repeats: int, seed: int) -> None:
+    """Compare les sélections top-k sur des matrices synthétiques de différentes tailles."""
+    rng = np.random.default_rng(seed)
+    for n_rows in rows_list:
+        matrix = rng.standard_normal((n_rows, dimension), dtype=np.float32)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        queries = matrix[rng.choice(n_rows, batch_size, replace=False)]
+        vectors = list(matrix)
+
+        logger.info(f"📊 {n_rows} lignes × {dimension} dimensions, top_k={top_k}")
+        latencies = _timed(lambda: _legacy_top_k(queries[0], vectors, top_k), repeats)
+        logger.info(f"   liste + argsort          {_percentiles(latencies)}")
+        latencies = _timed(lambda: top_k_similar(queries[0], matrix, top_k), repeats)
+        logger.info(f"   matrice + argpartition   {_percentiles(latencies)}")
+        latencies = _timed(lambda: top_k_similar(queries, matrix, top_k), repeats)
+        per_query = [latency / batch_size for latency in latencies]
+        logger.info(f"   batch de {batch_size:<3} (par requête) {_percentiles(per_query)}")
+
+
+def main():
+    """Point d'entrée principal."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare la recherche IVF à la recherche exacte (recall@k, latence)")
+    parser.add_argument("--translation", type=str, help="ID de traduction (benchmark IVF sur artefact)")
+    parser.add_argument(
+        "--synthetic-rows",
+        type=int,
+        nargs="+",
+        help="Benchmark top-k sur matrices synthétiques de ces tailles (ex: 31000 500000)",
+    )
+    parser.add_argument("--dimension", type=int, default=384, help="Dimension des vecteurs synthétiques (défaut: 384)")
+    parser.add_argument("--batch-size", type=int, default=16, help="Taille du batch de requêtes synthétiques (défaut: 16)")
+    parser.add_argument("--repeats", type=int, default=20, help="Répétitions par mesure synthétique (défaut: 20)")
+    parser.add_argument("--index-dir", type=str, default=os.getenv("EMBEDDING_INDEX_DIR"), help="Dossier des artefacts (défaut: EMBEDDING_INDEX_DIR)")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32], help="Valeurs de nprobe à évaluer")
+    parser.add_argument("--top-k", type=int, default=20, help="k du recall@k (défaut: 20)")
+    parser.add_argument("--queries", type=int, default=200, help="Nombre de requêtes synthétiques (défaut: 200)")
+    parser.add_argument("--queries-file", type=str, default=None, help="Fichier de requêtes réelles (une par ligne), encodées avec le modèle")
+    parser.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+    if args.synthetic_rows:
+        benchmark_top_k(args.synthetic_rows, args.dimension, args.top_k, args.batch_size, args.repeats, args.seed)
+        if not args.translation:
+            return
+    if not args.translation:
+        parser.error("--translation ou --synthetic-rows est requis")
+    if not args.index_dir:
+        parser.error("--index-dir est requis si EMBEDDING_INDEX_DIR n'est pas défini")
+
+    benchmark(args.index_dir, args.translation, args.nprobe, args.top_k, args.queries, args.queries_file, args.seed)
+
+
+if __name__ == "__main__":
+    main()
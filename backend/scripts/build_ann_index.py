@@ -0,0 +1,96 @@
+"""Script pour construire hors ligne l'index IVF-flat d'une traduction à partir de son artefact."""
+
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Ajouter le dossier backend au path pour les imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from Home.ann_index import IVFFlatIndex
+from Home.embedding_codec import DEFAULT_EMBEDDING_FIELD
+from Home.vector_index import VerseVectorIndex, ann_artifact_path
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Charger le .env depuis le dossier backend
+env_path = backend_dir / ".env"
+if env_path.exists():
+    load_dotenv(dotenv_path=env_path)
+else:
+    load_dotenv()
+
+
+def build_ann_index(
+    index_dir: str,
+    translation_id: str,
+    n_lists: int = None,
+    nprobe: int = 8,
+    n_iter: int = 20,
+    field: str = DEFAULT_EMBEDDING_FIELD,
+) -> Path:
+    """
+    Construit l'index IVF d'une traduction et l'écrit à côté de sa matrice d'embeddings.
+
+    Args:
+        index_dir: Dossier des artefacts (EMBEDDING_INDEX_DIR)
+        translation_id: Traduction à indexer
+        n_lists: Nombre de listes IVF (défaut: 4 * sqrt(nombre de versets))
+        nprobe: Nombre de listes explorées par défaut (point de fonctionnement choisi via le benchmark)
+        n_iter: Nombre d'itérations du k-means
+        field: Champ des embeddings de l'artefact (version exportée)
+    """
+    index = VerseVectorIndex.load_from_disk(index_dir, translation_id, field=field)
+    if index is None:
+        raise FileNotFoundError(
+            f"Aucun artefact pour {translation_id} dans {index_dir}. "
+            "Lancez d'abord scripts/export_vector_index.py."
+        )
+
+    started = time.perf_counter()
+    ann = IVFFlatIndex.build(index.embeddings, n_lists=n_lists, nprobe=nprobe, n_iter=n_iter)
+    path = ann.save(ann_artifact_path(index_dir, translation_id, field))
+    logger.info(
+        f"✅ Index IVF {translation_id}: {ann.n_lists} listes, nprobe={ann.nprobe}, "
+        f"{len(index)} versets en {time.perf_counter() - started:.1f}s → {path}"
+    )
+    return path
+
+
+def main():
+    """Point d'entrée principal."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Construit l'index IVF-flat (recherche approximative) d'une traduction")
+    parser.add_argument("--translation", type=str, required=True, action="append", help="ID de traduction (répétable)")
+    parser.add_argument(
+        "--index-dir",
+        type=str,
+        default=os.getenv("EMBEDDING_INDEX_DIR"),
+        help="Dossier des artefacts (défaut: EMBEDDING_INDEX_DIR)",
+    )
+    parser.add_argument("--n-lists", type=int, default=None, help="Nombre de listes (défaut: 4 * sqrt(n))")
+    parser.add_argument("--nprobe", type=int, default=8, help="Listes explorées par défaut à la recherche (défaut: 8)")
+    parser.add_argument("--n-iter", type=int, default=20, help="Itérations du k-means (défaut: 20)")
+    parser.add_argument("--field", type=str, default=DEFAULT_EMBEDDING_FIELD, help="Champ des embeddings (défaut: embedding)")
+
+    args = parser.parse_args()
+    if not args.index_dir:
+        parser.error("--index-dir est requis si EMBEDDING_INDEX_DIR n'est pas défini")
+
+    try:
+        for translation_id in args.translation:
+            build_ann_index(args.index_dir, translation_id, args.n_lists, args.nprobe, args.n_iter, args.field)
+    except Exception as e:
+        logger.exception(f"❌ Erreur fatale: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Compare la recherche vectorielle avec les embeddings de chaque traduction et avec les embeddings
+canoniques (partagés), sur un jeu de requêtes.
+
+Pour chaque traduction et chaque requête, les top-k versets des deux index sont comparés par
+référence canonique (livre.chapitre.numéro) : recouvrement@k, accord sur le premier verset et
+écart du meilleur score.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import List
+
+import numpy as np
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+# Ajouter le dossier backend au path pour les imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from Home.canonical_embeddings import (
+    CANONICAL_COLLECTION,
+    CanonicalEmbeddings,
+    canonical_key,
+    load_index_from_canonical,
+)
+from Home.embedding_versions import get_active_embedding_version
+from Home.embeddings import get_embedding_service
+from Home.similarity import top_k_similar
+from Home.vector_index import VerseVectorIndex, load_index_from_mongo
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Charger le .env depuis le dossier backend
+env_path = backend_dir / ".env"
+if env_path.exists():
+    load_dotenv(dotenv_path=env_path)
+else:
+    load_dotenv()
+
+# Requêtes par défaut, proches de ce que saisissent les utilisateurs
+DEFAULT_QUERIES = [
+    "Je me sens seul et abandonné",
+    "J'ai peur de l'avenir",
+    "Je suis reconnaissant pour ma famille",
+    "Je traverse un deuil difficile",
+    "J'ai besoin de force pour continuer",
+    "Je suis en colère contre quelqu'un qui m'a blessé",
+    "Je cherche la paix intérieure",
+    "Je doute de ma foi",
+    "I feel anxious and cannot sleep",
+    "I need hope in a hard season",
+    "I want to forgive but it is hard",
+    "Me siento cansado y sin esperanza",
+]
+
+
+def _keys(index: VerseVectorIndex, rows: List[tuple]) -> List[str]:
+    return [
+        canonical_key(index.livre_ids[row], index.chapitres[row], index.numeros[row])
+        for row, _ in rows
+    ]
+
+
+def compare_indexes(
+    per_verse: VerseVectorIndex, canonical: VerseVectorIndex, query_embeddings: np.ndarray, top_k: int
+) -> dict:
+    """Recouvrement des top-k des deux index pour chaque requête."""
+    expected = top_k_similar(query_embeddings, per_verse.embeddings, top_k)
+    actual = top_k_similar(query_embeddings, canonical.embeddings, top_k)
+
+    overlaps, top1, score_deltas = [], [], []
+    for expected_rows, actual_rows in zip(expected, actual):
+        expected_keys = _keys(per_verse, expected_rows)
+        actual_keys = _keys(canonical, actual_rows)
+        overlaps.append(len(set(expected_keys) & set(actual_keys)) / max(len(expected_keys), 1))
+        top1.append(bool(expected_keys) and bool(actual_keys) and expected_keys[0] == actual_keys[0])
+        if expected_rows and actual_rows:
+            score_deltas.append(actual_rows[0][1] - expected_rows[0][1])
+
+    return {
+        "overlap": float(np.mean(overlaps)),
+        "top1_agreement": float(np.mean(top1)),
+        "top1_score_delta": float(np.mean(score_deltas)) if score_deltas else 0.0,
+    }
+
+
+async def compare(translation_ids: List[str], queries: List[str], top_k: int) -> None:
+    mongo_url = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
+    mongo_db = os.getenv("MONGODB_DATABASE", "parole_du_moment_db")
+    client = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=5000)
+    db = client[mongo_db]
+    verses = db["versets"]
+
+    try:
+        version = await get_active_embedding_version(db)
+        canonical = await CanonicalEmbeddings.load(db[CANONICAL_COLLECTION], version)
+        if canonical is None:
+            return
+
+        query_embeddings = get_embedding_service(version.model).encode(queries, use_cache=False)
+        logger.info(f"📊 {len(queries)} requêtes, top-{top_k}, version {version.field} ({version.model})")
+
+        per_verse_rows = 0
+        for translation_id in translation_ids:
+            per_verse = await load_index_from_mongo(verses, translation_id, version)
+            canonical_index = await load_index_from_canonical(verses, translation_id, canonical)
+            if per_verse is None or canonical_index is None:
+                logger.warning(f"⚠️ {translation_id}: index manquant, comparaison impossible")
+                continue
+            per_verse_rows += len(per_verse)
+            result = compare_indexes(per_verse, canonical_index, query_embeddings, top_k)
+            logger.info(
+                f"   {translation_id}: recouvrement@{top_k}={result['overlap']:.2f} "
+                f"accord top-1={result['top1_agreement']:.2f} "
+                f"écart score top-1={result['top1_score_delta']:+.3f}"
+            )
+
+        if per_verse_rows:
+            logger.info(
+                f"💾 Embeddings: {per_verse_rows} par traduction contre {len(canonical)} canoniques "
+                f"(÷{per_verse_rows / len(canonical):.1f} en calcul et stockage)"
+            )
+    finally:
+        client.close()
+
+
+def main():
+    """Point d'entrée principal."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare les embeddings par traduction et les embeddings canoniques")
+    parser.add_argument(
+        "--translation",
+        type=str,
+        action="append",
+        help="Traduction comparée (répétable ; défaut: lsg et kjv)",
+    )
+    parser.add_argument("--queries-file", type=str, default=None, help="Fichier de requêtes (une par ligne)")
+    parser.add_argument("--top-k", type=int, default=10, help="Nombre de versets comparés par requête (défaut: 10)")
+
+    args = parser.parse_args()
+
+    queries = DEFAULT_QUERIES
+    if args.queries_file:
+        with open(args.queries_file, "r", encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+
+    try:
+        asyncio.run(compare(args.translation or ["lsg", "kjv"], queries, args.top_k))
+    except Exception as e:
+        logger.exception(f"❌ Erreur fatale: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""
+Script pour calculer les embeddings canoniques : un vecteur par verset (livre, chapitre, numéro),
+partagé par toutes les traductions (VECTOR_INDEX_SOURCE=canonical côté API).
+
+Deux stratégies :
+- ``pivot`` : encode le texte d'une traduction pivot (ex: lsg) ; les versets absents du pivot
+  sont complétés par les pivots suivants (``--pivot lsg --pivot kjv``). Un seul encodage par
+  verset au lieu d'un par traduction.
+- ``mean`` : moyenne (renormalisée) des embeddings déjà calculés pour chaque traduction.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from tqdm import tqdm
+
+# Ajouter le dossier backend au path pour les imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from Home.canonical_embeddings import CANONICAL_COLLECTION, CANONICAL_STRATEGIES, canonical_key
+from Home.embedding_codec import DEFAULT_EMBEDDING_FIELD, EMBEDDING_FORMATS, content_hash, embedding_update
+from Home.embedding_versions import EmbeddingVersion
+from Home.embeddings import DEFAULT_MODEL_NAME
+from Home.vector_index import load_index_from_mongo
+from scripts.compute_embeddings import BatchEncoder
+from scripts.export_vector_index import export_vector_indexes
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Charger le .env depuis le dossier backend
+env_path = backend_dir / ".env"
+if env_path.exists():
+    load_dotenv(dotenv_path=env_path)
+else:
+    load_dotenv()
+
+
+def _canonical_update(
+    key: str, vector: np.ndarray, storage_format: str, version: EmbeddingVersion, text_hash: Optional[str], source: dict
+) -> UpdateOne:
+    livre_id, chapitre, numero = key.rsplit(".", 2)
+    update = embedding_update(vector, storage_format, version.field, version.model, text_hash)
+    update["$set"].update({"livre_id": livre_id, "chapitre": int(chapitre), "numero": int(numero), **source})
+    if text_hash is None:
+        # Moyenne : pas de texte source, l'empreinte d'un calcul pivot précédent ne s'applique plus
+        update.setdefault("$unset", {})[version.hash_field] = ""
+    return UpdateOne({"_id": key}, update, upsert=True)
+
+
+async def compute_from_pivots(
+    verses_collection,
+    canonical_collection,
+    pivots: List[str],
+    version: EmbeddingVersion,
+    encoder: BatchEncoder,
+    storage_format: str,
+    batch_size: int,
+) -> int:
+    """Encode le texte des traductions pivots, le premier pivot qui contient un verset l'emporte."""
+    # Étiquettes existantes : un verset canonique déjà calculé depuis le même texte est ignoré
+    existing: Dict[str, tuple] = {}
+    async for document in canonical_collection.find(
+        {}, {version.model_field: 1, version.hash_field: 1, "source_translation": 1}
+    ):
+        existing[document["_id"]] = (
+            document.get(version.model_field),
+            document.get(version.hash_field),
+            document.get("source_translation"),
+        )
+
+    covered: set = set()
+    written = 0
+    for pivot in pivots:
+        query = {"traduction_id": pivot}
+        total = await verses_collection.count_documents(query)
+        logger.info(f"📖 Pivot {pivot}: {total} versets")
+
+        pending: List[tuple] = []
+
+        async def flush() -> None:
+            nonlocal written
+            pending.sort(key=lambda item: len(item[1]))
+            vectors = await encoder.encode([text for _, text, _ in pending])
+            operations = [
+                _canonical_update(key, vector, storage_format, version, text_hash, {"source_translation": pivot})
+                for (key, _, text_hash), vector in zip(pending, vectors)
+            ]
+            await canonical_collection.bulk_write(operations, ordered=False)
+            written += len(operations)
+            pending.clear()
+
+        with tqdm(total=total, desc=f"Pivot {pivot}") as pbar:
+            cursor = verses_collection.find(
+                query, {"livre_id": 1, "chapitre": 1, "numero": 1, "contenu": 1}
+            ).batch_size(batch_size)
+            async for verse in cursor:
+                pbar.update(1)
+                contenu = (verse.get("contenu") or "").strip()
+                key = canonical_key(verse.get("livre_id"), verse.get("chapitre"), verse.get("numero"))
+                if not contenu or key in covered:
+                    continue
+                covered.add(key)
+                text_hash = content_hash(contenu)
+                if existing.get(key) == (version.model, text_hash, pivot):
+                    continue
+                pending.append((key, contenu, text_hash))
+                if len(pending) >= batch_size:
+                    await flush()
+            if pending:
+                await flush()
+
+    logger.info(f"📊 Versets canoniques couverts par les pivots: {len(covered)}")
+    return written
+
+
+async def compute_from_mean(
+    verses_collection,
+    canonical_collection,
+    translation_ids: List[str],
+    version: EmbeddingVersion,
+    storage_format: str,
+    batch_size: int,
+) -> int:
+    """Moyenne des embeddings existants de chaque traduction, par verset canonique."""
+    rows: Dict[str, int] = {}
+    sums = np.zeros((0, 0), dtype=np.float32)
+    counts = np.zeros(0, dtype=np.int32)
+
+    for translation_id in translation_ids:
+        index = await load_index_from_mongo(verses_collection, translation_id, version)
+        if index is None:
+            continue
+        keys = [
+            canonical_key(livre_id, chapitre, numero)
+            for livre_id, chapitre, numero in zip(index.livre_ids, index.chapitres, index.numeros)
+        ]
+        for key in keys:
+            rows.setdefault(key, len(rows))
+        if len(rows) > len(sums):
+            # Nouveaux versets canoniques : agrandir les accumulateurs
+            grown = np.zeros((len(rows), index.dimension), dtype=np.float32)
+            grown[: len(sums)] = sums
+            sums = grown
+            counts = np.concatenate([counts, np.zeros(len(rows) - len(counts), dtype=np.int32)])
+
+        matrix_rows = np.fromiter((rows[key] for key in keys), dtype=np.int64, count=len(keys))
+        np.add.at(sums, matrix_rows, np.asarray(index.embeddings, dtype=np.float32))
+        np.add.at(counts, matrix_rows, 1)
+        logger.info(f"➕ {translation_id}: {len(index)} embeddings ajoutés à la moyenne")
+
+    if not rows:
+        logger.warning("⚠️ Aucun embedding par traduction à moyenner. Lancez d'abord scripts/compute_embeddings.py.")
+        return 0
+
+    norms = np.linalg.norm(sums, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    means = sums / norms
+
+    keys = list(rows)
+    written = 0
+    for start in tqdm(range(0, len(keys), batch_size), desc="Écriture"):
+        operations = [
+            _canonical_update(
+                key, means[rows[key]], storage_format, version, None,
+                {"source_translation": "mean", "translations_count": int(counts[rows[key]])},
+            )
+            for key in keys[start : start + batch_size]
+        ]
+        await canonical_collection.bulk_write(operations, ordered=False)
+        written += len(operations)
+    return written
+
+
+async def compute_canonical_embeddings(
+    strategy: str = "pivot",
+    pivots: Optional[List[str]] = None,
+    translation_ids: Optional[List[str]] = None,
+    batch_size: int = 256,
+    storage_format: str = "array",
+    field: str = DEFAULT_EMBEDDING_FIELD,
+    model_name: Optional[str] = None,
+    workers: int = 1,
+    export_dir: Optional[str] = None,
+):
+    """
+    Calcule et stocke les embeddings canoniques dans la collection ``versets_canoniques``.
+
+    Args:
+        strategy: "pivot" (encode le texte des traductions pivots) ou "mean" (moyenne des traductions)
+        pivots: Traductions pivots, par ordre de priorité (stratégie pivot, défaut: lsg)
+        translation_ids: Traductions moyennées (stratégie mean, défaut: toutes)
+        batch_size: Nombre de versets encodés et écrits par batch
+        storage_format: Format du champ embedding (array, float16 ou int8)
+        field: Champ des embeddings (défaut: embedding)
+        model_name: Modèle à utiliser (défaut: EMBEDDING_MODEL)
+        workers: Nombre de processus d'encodage (stratégie pivot)
+        export_dir: Si fourni, exporte ensuite les index canoniques de chaque traduction
+    """
+    mongo_url = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
+    mongo_db = os.getenv("MONGODB_DATABASE", "parole_du_moment_db")
+
+    logger.info(f"🔌 Connexion à MongoDB: {mongo_url}")
+    client = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=5000)
+    db = client[mongo_db]
+    verses_collection = db["versets"]
+    canonical_collection = db[CANONICAL_COLLECTION]
+
+    try:
+        if strategy == "pivot":
+            encoder = BatchEncoder(workers, model_name)
+            version = EmbeddingVersion(field, encoder.model_name)
+            logger.info(f"🏷️ Champ: {version.field}, modèle: {version.model}, pivots: {', '.join(pivots or ['lsg'])}")
+            try:
+                written = await compute_from_pivots(
+                    verses_collection, canonical_collection, pivots or ["lsg"], version, encoder,
+                    storage_format, batch_size,
+                )
+            finally:
+                encoder.close()
+        else:
+            version = EmbeddingVersion(field, model_name or os.getenv("EMBEDDING_MODEL", DEFAULT_MODEL_NAME))
+            translation_ids = translation_ids or await verses_collection.distinct(
+                "traduction_id", version.embedded_filter()
+            )
+            logger.info(f"🏷️ Champ: {version.field}, modèle: {version.model}, moyenne de: {', '.join(translation_ids)}")
+            written = await compute_from_mean(
+                verses_collection, canonical_collection, translation_ids, version, storage_format, batch_size
+            )
+
+        total = await canonical_collection.count_documents(version.embedded_filter())
+        logger.info("=" * 60)
+        logger.info("✅ Embeddings canoniques calculés!")
+        logger.info(f"   Écrits: {written}")
+        logger.info(f"   Total ({version.field}, {version.model}): {total}")
+        logger.info("   Activez-les avec VECTOR_INDEX_SOURCE=canonical")
+        logger.info("=" * 60)
+
+        if export_dir:
+            await export_vector_indexes(verses_collection, export_dir, None, version, source="canonical")
+    finally:
+        client.close()
+
+
+async def main():
+    """Point d'entrée principal."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Calcule un embedding par verset canonique, partagé entre traductions")
+    parser.add_argument("--strategy", type=str, choices=CANONICAL_STRATEGIES, default="pivot", help="pivot (défaut) ou mean")
+    parser.add_argument(
+        "--pivot",
+        type=str,
+        action="append",
+        help="Traduction pivot (répétable, par ordre de priorité ; défaut: lsg)",
+    )
+    parser.add_argument(
+        "--translation",
+        type=str,
+        action="append",
+        help="Traduction moyennée (stratégie mean, répétable ; défaut: toutes)",
+    )
+    parser.add_argument("--batch-size", type=int, default=256, help="Versets encodés et écrits par batch (défaut: 256)")
+    parser.add_argument("--workers", type=int, default=1, help="Nombre de processus d'encodage (défaut: 1)")
+    parser.add_argument("--field", type=str, default=DEFAULT_EMBEDDING_FIELD, help="Champ des embeddings (défaut: embedding)")
+    parser.add_argument("--model", type=str, default=None, help="Modèle sentence-transformers (défaut: EMBEDDING_MODEL)")
+    parser.add_argument(
+        "--storage-format",
+        type=str,
+        choices=EMBEDDING_FORMATS,
+        default=os.getenv("EMBEDDING_STORAGE_FORMAT", "array"),
+        help="Format de stockage des embeddings: array, float16 ou int8",
+    )
+    parser.add_argument(
+        "--export-dir",
+        type=str,
+        default=None,
+        help="Exporte ensuite les index canoniques de chaque traduction dans ce dossier (voir EMBEDDING_INDEX_DIR)",
+    )
+
+    args = parser.parse_args()
+
+    try:
+        await compute_canonical_embeddings(
+            strategy=args.strategy,
+            pivots=args.pivot,
+            translation_ids=args.translation,
+            batch_size=args.batch_size,
+            storage_format=args.storage_format,
+            field=args.field,
+            model_name=args.model,
+            workers=args.workers,
+            export_dir=args.export_dir,
+        )
+    except KeyboardInterrupt:
+        logger.info("\n⚠️ Interruption par l'utilisateur")
+    except Exception as e:
+        logger.exception(f"❌ Erreur fatale: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
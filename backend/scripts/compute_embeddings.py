@@ -1,21 +1,33 @@
 """Script pour pré-calculer et stocker les embeddings de tous les versets dans MongoDB."""
 
 import asyncio
+import json
 import logging
+import multiprocessing
 import os
 import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
+import numpy as np
+from bson import ObjectId
 from dotenv import load_dotenv
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 from tqdm import tqdm
 
 # Ajouter le dossier backend au path pour les imports
 backend_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_dir))
 
-from Home.embeddings import get_embedding_service
+from Home.embedding_codec import DEFAULT_EMBEDDING_FIELD, EMBEDDING_FORMATS, content_hash, embedding_update
+from Home.embedding_versions import EmbeddingVersion
+from Home.embeddings import EmbeddingService, get_embedding_service
+from scripts.export_vector_index import export_vector_indexes
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -28,107 +40,324 @@ else:
     load_dotenv()
 
 
-async def compute_and_store_embeddings(translation_id: Optional[str] = None, batch_size: int = 100):
+# --- Encodage multi-processus -------------------------------------------------
+
+# Service d'embeddings propre à chaque processus d'encodage (--workers > 1)
+_worker_service: Optional[EmbeddingService] = None
+
+
+def _init_worker(model_name: str, backend: str, threads: int) -> None:
+    """Charge le modèle une fois par processus et partage les cœurs entre processus."""
+    global _worker_service
+    try:
+        import torch
+
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _worker_service = EmbeddingService(model_name, backend)
+
+
+def _encode_in_worker(texts: List[str]) -> np.ndarray:
+    return _worker_service.encode(texts, use_cache=False)
+
+
+class BatchEncoder:
+    """Encode des batches de textes, dans un thread (1 worker) ou un pool de processus."""
+
+    def __init__(self, workers: int = 1, model_name: Optional[str] = None) -> None:
+        self.workers = max(1, workers)
+        self._service = get_embedding_service(model_name)
+        self.model_name = self._service.model_name
+        self._pool: Optional[ProcessPoolExecutor] = None
+        if self.workers > 1:
+            threads = max(1, (os.cpu_count() or self.workers) // self.workers)
+            # "spawn" : torch ne supporte pas un fork après initialisation de ses threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_name, self._service.backend, threads),
+            )
+            logger.info(f"🧵 Encodage réparti sur {self.workers} processus ({threads} threads chacun)")
+
+    def dimension(self) -> int:
+        return self._service.get_embedding_dimension()
+
+    async def encode(self, texts: List[str]) -> np.ndarray:
+        if self._pool is None:
+            return await asyncio.to_thread(self._service.encode, texts, True, False)
+        return await asyncio.get_running_loop().run_in_executor(self._pool, _encode_in_worker, texts)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+
+
+# --- Point de reprise -----------------------------------------------------------
+
+
+def default_checkpoint_path(translation_id: Optional[str], field: str = DEFAULT_EMBEDDING_FIELD) -> Path:
+    return backend_dir / f".compute_embeddings.{translation_id or 'all'}.{field}.checkpoint.json"
+
+
+def load_checkpoint(path: Path, run: dict) -> Optional[ObjectId]:
+    """Retourne le dernier _id écrit lors d'un passage interrompu, s'il est compatible."""
+    if not path.exists():
+        return None
+    try:
+        checkpoint = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Point de reprise illisible ({path}), ignoré: {e}")
+        return None
+    if any(checkpoint.get(key) != value for key, value in run.items()):
+        logger.warning(f"⚠️ Point de reprise {path} créé avec d'autres paramètres ({checkpoint}), ignoré")
+        return None
+    logger.info(
+        f"⏩ Reprise après le verset {checkpoint['last_id']} "
+        f"({checkpoint.get('updated', 0)} versets déjà calculés, {checkpoint.get('updated_at')})"
+    )
+    return ObjectId(checkpoint["last_id"])
+
+
+def save_checkpoint(path: Path, last_id: ObjectId, run: dict, updated: int) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(
+        json.dumps({
+            **run,
+            "last_id": str(last_id),
+            "updated": updated,
+            "updated_at": datetime.utcnow().isoformat(),
+        }),
+        encoding="utf-8",
+    )
+    os.replace(tmp_path, path)
+
+
+# --- Pipeline lecture → encodage → écriture --------------------------------------
+
+
+async def _read_batches(verses_collection, query: dict, projection: dict, batch_size: int):
+    """Parcourt les versets par _id croissant et les regroupe par batches."""
+    batch: list = []
+    cursor = verses_collection.find(query, projection).sort("_id", 1).batch_size(batch_size)
+    async for verse in cursor:
+        batch.append(verse)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def _hand_off(queue: asyncio.Queue, item, writer: asyncio.Task) -> None:
+    """Transmet un batch à l'écrivain, en remontant son erreur s'il s'est arrêté."""
+    put = asyncio.ensure_future(queue.put(item))
+    await asyncio.wait({put, writer}, return_when=asyncio.FIRST_COMPLETED)
+    if not put.done():
+        put.cancel()
+        writer.result()
+
+
+async def compute_and_store_embeddings(
+    translation_id: Optional[str] = None,
+    batch_size: int = 256,
+    export_dir: Optional[str] = None,
+    storage_format: str = "array",
+    workers: int = 1,
+    checkpoint_path: Optional[str] = None,
+    restart: bool = False,
+    field: str = DEFAULT_EMBEDDING_FIELD,
+    model_name: Optional[str] = None,
+    incremental: bool = False,
+):
     """
-    Calcule et stocke les embeddings pour tous les versets dans MongoDB.
-    
+    Calcule et stocke les embeddings des versets qui n'en ont pas encore.
+
+    Chaque embedding est étiqueté avec le modèle qui l'a produit (``<champ>_model``)
+    et l'empreinte du contenu encodé (``<champ>_hash``). En mode incrémental, tous
+    les versets sont parcourus et seuls ceux dont le modèle ou l'empreinte ne
+    correspondent plus (texte modifié, changement de modèle) sont recalculés.
+    Avec ``field`` (ex: embedding_v2), une nouvelle version est calculée à côté de
+    l'actuelle, puis activée par scripts/activate_embedding_version.py.
+
+    Les versets sont lus par batches (ordre des _id), triés par longueur pour limiter
+    le padding, encodés en un seul appel au modèle par batch puis écrits par
+    ``bulk_write`` non ordonné. L'encodage du batch suivant se fait pendant l'écriture
+    du précédent. Après chaque écriture, le dernier _id est enregistré dans un point
+    de reprise : un passage interrompu reprend là où il s'était arrêté.
+
     Args:
         translation_id: Si fourni, ne traiter que cette traduction. Sinon, traiter toutes les traductions.
-        batch_size: Nombre de versets à traiter par batch
+        batch_size: Nombre de versets encodés et écrits par batch
+        export_dir: Si fourni, exporte ensuite les index vectoriels sur disque dans ce dossier
+        storage_format: Format du champ embedding (array, float16 ou int8, voir Home.embedding_codec)
+        workers: Nombre de processus d'encodage (1 = encodage dans un thread du processus courant)
+        checkpoint_path: Fichier du point de reprise (défaut: backend/.compute_embeddings.<traduction>.checkpoint.json)
+        restart: Si True, ignore le point de reprise existant
+        field: Champ MongoDB des embeddings (défaut: embedding)
+        model_name: Modèle à utiliser (défaut: EMBEDDING_MODEL)
+        incremental: Si True, recalcule aussi les embeddings périmés (autre modèle ou contenu modifié)
     """
     mongo_url = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
     mongo_db = os.getenv("MONGODB_DATABASE", "parole_du_moment_db")
-    
+
     logger.info(f"🔌 Connexion à MongoDB: {mongo_url}")
     logger.info(f"📚 Base de données: {mongo_db}")
-    
+
     client = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=5000)
     db = client[mongo_db]
     verses_collection = db["versets"]
-    
+
     # Initialiser le service d'embeddings
-    embedding_service = get_embedding_service()
-    embedding_dim = embedding_service.get_embedding_dimension()
+    encoder = BatchEncoder(workers, model_name)
+    version = EmbeddingVersion(field, encoder.model_name)
+    embedding_dim = encoder.dimension()
     logger.info(f"✅ Service d'embeddings initialisé (dimension: {embedding_dim})")
-    
-    # Construire la requête
-    query = {}
+    logger.info(f"🏷️ Champ: {version.field}, modèle: {version.model}{' (mode incrémental)' if incremental else ''}")
+
+    # Construire la requête : sans le mode incrémental, seuls les versets sans embedding
+    # sont lus ; sinon tous, l'étiquette de chaque embedding étant vérifiée ci-dessous
+    projection = {"_id": 1, "contenu": 1}
+    if incremental:
+        query = {}
+        projection.update({version.model_field: 1, version.hash_field: 1})
+    else:
+        query = {field: {"$exists": False}}
     if translation_id:
         query["traduction_id"] = translation_id
         logger.info(f"📖 Traitement uniquement de la traduction: {translation_id}")
     else:
         logger.info("📖 Traitement de toutes les traductions")
-    
+
+    checkpoint_file = Path(checkpoint_path) if checkpoint_path else default_checkpoint_path(translation_id, field)
+    run = {
+        "field": field,
+        "model": version.model,
+        "storage_format": storage_format,
+        "incremental": incremental,
+    }
+    last_id = None if restart else load_checkpoint(checkpoint_file, run)
+    if last_id is not None:
+        query["_id"] = {"$gt": last_id}
+
     # Compter le nombre total de versets
     total_count = await verses_collection.count_documents(query)
     logger.info(f"📊 Nombre total de versets à traiter: {total_count}")
-    
+
     if total_count == 0:
-        logger.warning("⚠️ Aucun verset trouvé avec les critères spécifiés")
+        logger.info("✅ Aucun verset sans embedding")
+        checkpoint_file.unlink(missing_ok=True)
+        encoder.close()
+        client.close()
         return
-    
-    # Traiter par batches
-    processed = 0
+
     skipped = 0
+    up_to_date = 0
     updated = 0
-    
+    failed = 0
+
+    async def write_batches(queue: asyncio.Queue, pbar: tqdm) -> None:
+        nonlocal updated, failed
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            batch_last_id, batch_count, verses, embeddings = item
+            if verses:
+                operations = [
+                    UpdateOne(
+                        {"_id": verse["_id"]},
+                        embedding_update(embedding, storage_format, field, version.model, verse["hash"]),
+                    )
+                    for verse, embedding in zip(verses, embeddings)
+                ]
+                try:
+                    result = await verses_collection.bulk_write(operations, ordered=False)
+                    updated += result.modified_count
+                except BulkWriteError as e:
+                    errors = e.details.get("writeErrors", [])
+                    failed += len(errors)
+                    updated += e.details.get("nModified", 0)
+                    logger.error(f"❌ {len(errors)} écritures en échec dans le batch se terminant par {batch_last_id}")
+            save_checkpoint(checkpoint_file, batch_last_id, run, updated)
+            pbar.update(batch_count)
+
+    # Batches en cours d'encodage : au moins un d'avance sur l'écriture, un par processus
+    max_in_flight = max(2, encoder.workers * 2)
+    pending: deque = deque()
+    write_queue: asyncio.Queue = asyncio.Queue(maxsize=2)
+
     with tqdm(total=total_count, desc="Calcul des embeddings") as pbar:
-        async for verse in verses_collection.find(query, {"_id": 1, "contenu": 1, "embedding": 1}):
-            verse_id = verse["_id"]
-            contenu = verse.get("contenu", "")
-            
-            # Vérifier si l'embedding existe déjà
-            existing_embedding = verse.get("embedding")
-            if existing_embedding is not None:
-                skipped += 1
-                pbar.update(1)
-                continue
-            
-            if not contenu or not contenu.strip():
-                logger.warning(f"⚠️ Verset {verse_id} sans contenu, ignoré")
-                skipped += 1
-                pbar.update(1)
-                continue
-            
-            try:
-                # Générer l'embedding
-                embedding = embedding_service.encode(contenu)
-                # Convertir en liste pour MongoDB (numpy array n'est pas sérialisable directement)
-                embedding_list = embedding[0].tolist()
-                
-                # Mettre à jour le document dans MongoDB
-                await verses_collection.update_one(
-                    {"_id": verse_id},
-                    {"$set": {"embedding": embedding_list}}
+        writer = asyncio.create_task(write_batches(write_queue, pbar))
+
+        async def drain_one() -> None:
+            batch_last_id, batch_count, verses, encoding = pending.popleft()
+            embeddings = await encoding if encoding is not None else []
+            await _hand_off(write_queue, (batch_last_id, batch_count, verses, embeddings), writer)
+
+        try:
+            async for batch in _read_batches(verses_collection, query, projection, batch_size):
+                verses = [verse for verse in batch if (verse.get("contenu") or "").strip()]
+                skipped += len(batch) - len(verses)
+                for verse in verses:
+                    verse["hash"] = content_hash(verse["contenu"])
+                if incremental:
+                    stale = [
+                        verse for verse in verses
+                        if verse.get(version.model_field) != version.model
+                        or verse.get(version.hash_field) != verse["hash"]
+                    ]
+                    up_to_date += len(verses) - len(stale)
+                    verses = stale
+                # Textes de longueurs proches côte à côte : moins de padding dans le modèle
+                verses.sort(key=lambda verse: len(verse["contenu"]))
+                encoding = (
+                    asyncio.ensure_future(encoder.encode([verse["contenu"] for verse in verses]))
+                    if verses
+                    else None
                 )
-                
-                updated += 1
-                processed += 1
-                
-                # Log tous les 100 versets
-                if processed % 100 == 0:
-                    logger.info(f"✅ {processed} versets traités ({updated} mis à jour, {skipped} ignorés)")
-                
-            except Exception as e:
-                logger.error(f"❌ Erreur lors du traitement du verset {verse_id}: {e}")
-                skipped += 1
-            
-            pbar.update(1)
-    
+                pending.append((batch[-1]["_id"], len(batch), verses, encoding))
+                while len(pending) >= max_in_flight:
+                    await drain_one()
+
+            while pending:
+                await drain_one()
+            await _hand_off(write_queue, None, writer)
+            await writer
+        finally:
+            for _, _, _, encoding in pending:
+                if encoding is not None:
+                    encoding.cancel()
+            if not writer.done():
+                writer.cancel()
+            encoder.close()
+
+    # Passage complet : le point de reprise n'est plus utile
+    checkpoint_file.unlink(missing_ok=True)
+
     logger.info("=" * 60)
     logger.info("✅ Traitement terminé!")
-    logger.info(f"   Total traité: {processed}")
     logger.info(f"   Mis à jour: {updated}")
-    logger.info(f"   Ignorés (déjà calculés ou erreurs): {skipped}")
+    if incremental:
+        logger.info(f"   Déjà à jour: {up_to_date}")
+    logger.info(f"   Ignorés (sans contenu): {skipped}")
+    if failed:
+        logger.info(f"   Écritures en échec: {failed} (relancez le script pour les reprendre)")
     logger.info("=" * 60)
-    
+
+    if export_dir:
+        await export_vector_indexes(
+            verses_collection, export_dir, [translation_id] if translation_id else None, version
+        )
+
     client.close()
 
 
 async def main():
     """Point d'entrée principal."""
     import argparse
-    
+
     parser = argparse.ArgumentParser(description="Pré-calcule les embeddings pour tous les versets")
     parser.add_argument(
         "--translation",
@@ -138,25 +367,78 @@ async def main():
     parser.add_argument(
         "--batch-size",
         type=int,
-        default=100,
-        help="Taille des batches pour le traitement (défaut: 100)",
+        default=256,
+        help="Nombre de versets encodés et écrits par batch (défaut: 256)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Nombre de processus d'encodage (défaut: 1). Chaque processus charge sa copie du modèle.",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        default=None,
+        help="Fichier du point de reprise (défaut: backend/.compute_embeddings.<traduction>.checkpoint.json)",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore le point de reprise et reparcourt tous les versets sans embedding",
+    )
+    parser.add_argument(
+        "--field",
+        type=str,
+        default=DEFAULT_EMBEDDING_FIELD,
+        help="Champ des embeddings (défaut: embedding). Ex: embedding_v2 pour calculer une nouvelle version à côté.",
+    )
+    parser.add_argument(
+        "--model",
+        type=str,
+        default=None,
+        help="Modèle sentence-transformers (défaut: EMBEDDING_MODEL)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Recalcule aussi les embeddings périmés (contenu modifié ou autre modèle)",
+    )
+    parser.add_argument(
+        "--storage-format",
+        type=str,
+        choices=EMBEDDING_FORMATS,
+        default=os.getenv("EMBEDDING_STORAGE_FORMAT", "array"),
+        help="Format de stockage des embeddings: array (tableau BSON), float16 ou int8 (BinData compact)",
+    )
+    parser.add_argument(
+        "--export-dir",
+        type=str,
+        default=None,
+        help="Exporte ensuite les index vectoriels (.npy + .json) dans ce dossier (voir EMBEDDING_INDEX_DIR)",
     )
-    
+
     args = parser.parse_args()
-    
+
     try:
         await compute_and_store_embeddings(
             translation_id=args.translation,
-            batch_size=args.batch_size
+            batch_size=args.batch_size,
+            export_dir=args.export_dir,
+            storage_format=args.storage_format,
+            workers=args.workers,
+            checkpoint_path=args.checkpoint,
+            restart=args.restart,
+            field=args.field,
+            model_name=args.model,
+            incremental=args.incremental,
         )
     except KeyboardInterrupt:
-        logger.info("\n⚠️ Interruption par l'utilisateur")
+        logger.info("\n⚠️ Interruption par l'utilisateur (relancez le script pour reprendre)")
     except Exception as e:
         logger.exception(f"❌ Erreur fatale: {e}")
         sys.exit(1)
 
 
 if __name__ == "__main__":
-    from typing import Optional
     asyncio.run(main())
-
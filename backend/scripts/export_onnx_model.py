@@ -0,0 +1,86 @@
+"""Script pour exporter le modèle d'embeddings au format ONNX (optionnellement quantifié int8)."""
+
+import logging
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Ajouter le dossier backend au path pour les imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from Home.embeddings import DEFAULT_MODEL_NAME
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Charger le .env depuis le dossier backend
+env_path = backend_dir / ".env"
+if env_path.exists():
+    load_dotenv(dotenv_path=env_path)
+else:
+    load_dotenv()
+
+# Configurations de quantification dynamique supportées par sentence-transformers
+QUANTIZATION_CONFIGS = ("arm64", "avx2", "avx512", "avx512_vnni")
+
+
+def export_onnx_model(model_name: str, output_dir: str, quantize: str = None) -> Path:
+    """
+    Exporte le modèle en ONNX dans ``output_dir`` (utilisable via EMBEDDING_ONNX_PATH).
+
+    Args:
+        model_name: Nom du modèle sentence-transformers
+        output_dir: Dossier de destination
+        quantize: Configuration de quantification int8 dynamique (ex: avx2), ou None
+
+    Returns:
+        Chemin du fichier ONNX à charger (relatif à output_dir, pour EMBEDDING_ONNX_FILE)
+    """
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    logger.info(f"📥 Export ONNX du modèle {model_name}...")
+    model = SentenceTransformer(model_name, backend="onnx")
+    model.save_pretrained(output_dir)
+    onnx_file = Path("onnx") / "model.onnx"
+
+    if quantize:
+        logger.info(f"🔧 Quantification dynamique int8 ({quantize})...")
+        export_dynamic_quantized_onnx_model(model, quantize, output_dir)
+        onnx_file = Path("onnx") / f"model_qint8_{quantize}.onnx"
+
+    logger.info(f"✅ Modèle exporté dans {output_dir}")
+    logger.info(f"   EMBEDDING_BACKEND=onnx")
+    logger.info(f"   EMBEDDING_ONNX_PATH={output_dir}")
+    logger.info(f"   EMBEDDING_ONNX_FILE={onnx_file.as_posix()}")
+    return onnx_file
+
+
+def main():
+    """Point d'entrée principal."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Exporte le modèle d'embeddings en ONNX (CPU)")
+    parser.add_argument("--model", type=str, default=os.getenv("EMBEDDING_MODEL", DEFAULT_MODEL_NAME), help="Modèle à exporter")
+    parser.add_argument("--output-dir", type=str, required=True, help="Dossier de destination")
+    parser.add_argument(
+        "--quantize",
+        type=str,
+        choices=QUANTIZATION_CONFIGS,
+        default=None,
+        help="Quantification int8 dynamique pour ce jeu d'instructions CPU",
+    )
+
+    args = parser.parse_args()
+
+    try:
+        export_onnx_model(args.model, args.output_dir, args.quantize)
+    except Exception as e:
+        logger.exception(f"❌ Erreur fatale: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
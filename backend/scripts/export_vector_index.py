@@ -0,0 +1,143 @@
+"""Script pour exporter les index vectoriels des versets sur disque (artefacts mémoire mappée)."""
+
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+# Ajouter le dossier backend au path pour les imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from Home.canonical_embeddings import CANONICAL_COLLECTION, CanonicalEmbeddings, load_index_from_canonical
+from Home.embedding_versions import EmbeddingVersion, get_active_embedding_version
+from Home.vector_index import VECTOR_INDEX_SOURCES, load_index_from_mongo
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Charger le .env depuis le dossier backend
+env_path = backend_dir / ".env"
+if env_path.exists():
+    load_dotenv(dotenv_path=env_path)
+else:
+    load_dotenv()
+
+
+async def export_vector_indexes(
+    verses_collection,
+    output_dir: str,
+    translation_ids: Optional[List[str]] = None,
+    version: Optional[EmbeddingVersion] = None,
+    source: str = "verses",
+) -> List[Path]:
+    """
+    Exporte l'index vectoriel de chaque traduction dans ``output_dir``.
+
+    Args:
+        verses_collection: Collection MongoDB ``versets``
+        output_dir: Dossier de destination (EMBEDDING_INDEX_DIR côté API)
+        translation_ids: Traductions à exporter. Si None, toutes celles qui ont des embeddings.
+        version: Version d'embeddings exportée (défaut: version active dans MongoDB)
+        source: "verses" (embeddings de chaque verset) ou "canonical" (embeddings canoniques partagés)
+
+    Returns:
+        Liste des matrices écrites
+    """
+    if version is None:
+        version = await get_active_embedding_version(verses_collection.database)
+    logger.info(f"🏷️ Version exportée: {version.field} ({version.model})")
+
+    canonical = None
+    if source == "canonical":
+        canonical = await CanonicalEmbeddings.load(verses_collection.database[CANONICAL_COLLECTION], version)
+        if canonical is None:
+            return []
+
+    if not translation_ids:
+        translation_ids = await verses_collection.distinct(
+            "traduction_id", {} if canonical is not None else version.embedded_filter()
+        )
+    logger.info(f"📖 Traductions à exporter: {', '.join(translation_ids) or 'aucune'}")
+
+    written: List[Path] = []
+    for translation_id in translation_ids:
+        if canonical is not None:
+            index = await load_index_from_canonical(verses_collection, translation_id, canonical)
+        else:
+            index = await load_index_from_mongo(verses_collection, translation_id, version)
+        if index is None:
+            continue
+        path = index.save(output_dir, model_name=version.model, field=version.field, source=source)
+        logger.info(f"💾 {translation_id}: {len(index)} versets exportés vers {path}")
+        written.append(path)
+
+    return written
+
+
+async def main():
+    """Point d'entrée principal."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Exporte les embeddings des versets en artefacts .npy partagés entre workers"
+    )
+    parser.add_argument(
+        "--translation",
+        type=str,
+        action="append",
+        help="ID de traduction à exporter (répétable). Si non fourni, exporte toutes les traductions.",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=str,
+        default=os.getenv("EMBEDDING_INDEX_DIR"),
+        help="Dossier de destination (défaut: EMBEDDING_INDEX_DIR)",
+    )
+
+    parser.add_argument(
+        "--field",
+        type=str,
+        default=None,
+        help="Champ des embeddings à exporter (défaut: version active). Nécessite --model.",
+    )
+    parser.add_argument("--model", type=str, default=None, help="Modèle des embeddings de --field")
+    parser.add_argument(
+        "--source",
+        type=str,
+        choices=VECTOR_INDEX_SOURCES,
+        default=os.getenv("VECTOR_INDEX_SOURCE", "verses"),
+        help="Embeddings exportés: verses (par verset) ou canonical (partagés entre traductions)",
+    )
+
+    args = parser.parse_args()
+    if bool(args.field) != bool(args.model):
+        parser.error("--field et --model vont ensemble")
+    if not args.output_dir:
+        parser.error("--output-dir est requis si EMBEDDING_INDEX_DIR n'est pas défini")
+
+    mongo_url = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
+    mongo_db = os.getenv("MONGODB_DATABASE", "parole_du_moment_db")
+    client = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=5000)
+
+    try:
+        version = EmbeddingVersion(args.field, args.model) if args.field else None
+        await export_vector_indexes(
+            client[mongo_db]["versets"], args.output_dir, args.translation, version, args.source
+        )
+    except KeyboardInterrupt:
+        logger.info("\n⚠️ Interruption par l'utilisateur")
+    except Exception as e:
+        logger.exception(f"❌ Erreur fatale: {e}")
+        sys.exit(1)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+"""Script de migration des embeddings existants vers un autre format de stockage (BinData float16/int8)."""
+
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from tqdm import tqdm
+
+# Ajouter le dossier backend au path pour les imports
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from Home.embedding_codec import (
+    DEFAULT_EMBEDDING_FIELD,
+    EMBEDDING_FORMATS,
+    decode_embeddings,
+    embedding_projection,
+    embedding_update,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Charger le .env depuis le dossier backend
+env_path = backend_dir / ".env"
+if env_path.exists():
+    load_dotenv(dotenv_path=env_path)
+else:
+    load_dotenv()
+
+
+async def migrate_embeddings(
+    storage_format: str,
+    translation_id: Optional[str] = None,
+    batch_size: int = 1000,
+    field: str = DEFAULT_EMBEDDING_FIELD,
+):
+    """
+    Réécrit les embeddings qui ne sont pas encore au format demandé.
+
+    Args:
+        storage_format: Format cible (array, float16 ou int8)
+        translation_id: Si fourni, ne migrer que cette traduction
+        batch_size: Nombre de versets réécrits par bulk_write
+        field: Champ des embeddings à migrer (défaut: embedding)
+    """
+    mongo_url = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
+    mongo_db = os.getenv("MONGODB_DATABASE", "parole_du_moment_db")
+
+    logger.info(f"🔌 Connexion à MongoDB: {mongo_url}")
+    client = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=5000)
+    verses_collection = client[mongo_db]["versets"]
+
+    format_field = f"{field}_format"
+    query = {field: {"$exists": True}}
+    if storage_format == "array":
+        query[format_field] = {"$exists": True}
+    else:
+        query[format_field] = {"$ne": storage_format}
+    if translation_id:
+        query["traduction_id"] = translation_id
+
+    total_count = await verses_collection.count_documents(query)
+    logger.info(f"📊 Versets à migrer vers {storage_format}: {total_count}")
+    if total_count == 0:
+        client.close()
+        return
+
+    migrated = 0
+
+    async def flush(documents: list) -> None:
+        nonlocal migrated
+        vectors = decode_embeddings(documents, field)
+        operations = [
+            UpdateOne({"_id": document["_id"]}, embedding_update(vector, storage_format, field))
+            for document, vector in zip(documents, vectors)
+        ]
+        await verses_collection.bulk_write(operations, ordered=False)
+        migrated += len(operations)
+
+    batch: list = []
+    with tqdm(total=total_count, desc=f"Migration {storage_format}") as pbar:
+        cursor = verses_collection.find(query, {"_id": 1, **embedding_projection(field)}).batch_size(batch_size)
+        async for document in cursor:
+            batch.append(document)
+            if len(batch) >= batch_size:
+                await flush(batch)
+                pbar.update(len(batch))
+                batch = []
+        if batch:
+            await flush(batch)
+            pbar.update(len(batch))
+
+    logger.info(f"✅ Migration terminée: {migrated} versets réécrits au format {storage_format}")
+    logger.info("   Pensez à réexporter les index (scripts/export_vector_index.py) ou à les recharger.")
+    client.close()
+
+
+async def main():
+    """Point d'entrée principal."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Migre le format de stockage des embeddings des versets")
+    parser.add_argument("--format", type=str, choices=EMBEDDING_FORMATS, required=True, help="Format cible")
+    parser.add_argument("--translation", type=str, help="ID de traduction spécifique à migrer (ex: lsg)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Taille des batches d'écriture (défaut: 1000)")
+    parser.add_argument("--field", type=str, default=DEFAULT_EMBEDDING_FIELD, help="Champ des embeddings (défaut: embedding)")
+
+    args = parser.parse_args()
+
+    try:
+        await migrate_embeddings(args.format, args.translation, args.batch_size, args.field)
+    except KeyboardInterrupt:
+        logger.info("\n⚠️ Interruption par l'utilisateur")
+    except Exception as e:
+        logger.exception(f"❌ Erreur fatale: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
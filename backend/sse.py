@@ -0,0 +1,27 @@
+"""Réponses Server-Sent Events (text/event-stream) pour les endpoints en streaming."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, AsyncIterator
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+# Désactive la mise en tampon des proxys (nginx) et des caches intermédiaires
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",
+}
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Sérialise un événement SSE ; ``data`` (dict, modèle Pydantic...) est encodé en JSON sur une ligne."""
+    payload = json.dumps(jsonable_encoder(data), ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """Réponse HTTP qui transmet les événements au fur et à mesure de leur production."""
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
@@ -0,0 +1,136 @@
+"""Préchargement au démarrage (modèles, MongoDB, caches, index) et état de disponibilité."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Délai entre deux tentatives quand une étape échoue (MongoDB pas encore joignable...)
+DEFAULT_RETRY_DELAY_SECONDS = 10.0
+
+
+def warmup_enabled() -> bool:
+    return os.getenv("WARMUP_ON_STARTUP", "false").lower() in ("1", "true", "yes")
+
+
+def warmup_translations() -> List[str]:
+    """Traductions dont l'index est préchargé (WARMUP_TRANSLATIONS, défaut: traduction française)."""
+    from Home.retriever import MongoVerseRetriever
+
+    raw = os.getenv("WARMUP_TRANSLATIONS")
+    if not raw:
+        return [MongoVerseRetriever._get_default_translation_id("fr")]
+    return [translation_id.strip().lower() for translation_id in raw.split(",") if translation_id.strip()]
+
+
+class WarmupState:
+    """
+    Avancement du préchargement, exposé par ``/ready``.
+
+    Sans préchargement (WARMUP_ON_STARTUP désactivé), l'application est prête
+    immédiatement : tout est chargé à la première requête, comme avant.
+    """
+
+    def __init__(self, enabled: bool) -> None:
+        self.enabled = enabled
+        self.status = "pending" if enabled else "disabled"
+        self.steps: dict[str, float] = {}
+        self.error: Optional[str] = None
+        self.attempts = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status in ("ready", "disabled")
+
+    def as_dict(self) -> dict:
+        return {
+            "status": self.status,
+            "ready": self.ready,
+            "steps": self.steps,
+            "attempts": self.attempts,
+            "error": self.error,
+            "duration": (
+                round(self.finished_at - self.started_at, 3)
+                if self.started_at is not None and self.finished_at is not None
+                else None
+            ),
+        }
+
+
+async def _ping_mongo() -> None:
+    from Assistant import get_conversation_service
+    from Home import get_retriever
+    from Profile import get_service
+
+    await asyncio.gather(
+        get_retriever().ping(),
+        get_conversation_service().ping(),
+        get_service().ping(),
+    )
+
+
+async def _init_chains() -> None:
+    from Assistant import get_chains as get_assistant_chains
+    from Home import get_chains as get_home_chains
+
+    get_home_chains()
+    get_assistant_chains()
+
+
+async def _warm_up_retriever() -> None:
+    from Home import get_retriever
+
+    await get_retriever().warm_up(warmup_translations())
+
+
+# Étapes du préchargement, dans l'ordre
+WARMUP_STEPS: List[tuple[str, Callable[[], Awaitable[None]]]] = [
+    ("mongo", _ping_mongo),
+    ("chains", _init_chains),
+    ("retriever", _warm_up_retriever),
+]
+
+
+async def run_warmup(state: WarmupState, retry_delay: Optional[float] = None) -> None:
+    """
+    Exécute les étapes du préchargement. Une étape qui échoue est retentée après
+    ``retry_delay`` secondes (WARMUP_RETRY_DELAY) ; les étapes déjà réussies ne sont
+    pas rejouées.
+    """
+    if retry_delay is None:
+        retry_delay = float(os.getenv("WARMUP_RETRY_DELAY", DEFAULT_RETRY_DELAY_SECONDS))
+
+    state.status = "running"
+    state.started_at = time.perf_counter()
+    logger.info("🔥 Préchargement de l'application...")
+
+    for name, step in WARMUP_STEPS:
+        while True:
+            state.attempts += 1
+            started = time.perf_counter()
+            try:
+                await step()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                state.status = "failed"
+                state.error = f"{name}: {e}"
+                logger.error(f"❌ Préchargement ({name}) en échec, nouvelle tentative dans {retry_delay:.0f}s: {e}")
+                await asyncio.sleep(retry_delay)
+                state.status = "running"
+                continue
+            state.steps[name] = round(time.perf_counter() - started, 3)
+            logger.info(f"✅ Préchargement ({name}) en {state.steps[name]:.2f}s")
+            break
+
+    state.error = None
+    state.status = "ready"
+    state.finished_at = time.perf_counter()
+    logger.info(f"✅ Application prête ({state.finished_at - state.started_at:.2f}s de préchargement)")